@@ -0,0 +1,102 @@
+"""
+XenForo Forum Archiver - Categorizer Benchmark
+
+Measures category scoring throughput on synthetic posts.
+
+Usage:
+    python benchmarks/benchmark_categorizer.py --posts 1000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.categorizer import ContentCategorizer
+from tests.test_categorizer import reference_category_score
+import config
+
+
+WORDS = (
+    "the a this that post forum thread reply quote thanks anyone else "
+    "review tested benchmark guide how install setup news update release "
+    "question help issue video photo screenshot gallery Python Linux Ubuntu "
+    "Windows driver kernel performance battery screen camera price shipping"
+).split()
+
+
+def make_posts(count: int, seed: int = 42) -> list:
+    """
+    Builds synthetic posts.
+    
+    Texts are drawn from a fixed pool so a million posts share their strings
+    and fit in memory.
+    """
+    rng = random.Random(seed)
+    pool = [
+        (
+            ' '.join(rng.choices(WORDS, k=rng.randint(3, 10))),
+            ' '.join(rng.choices(WORDS, k=rng.randint(20, 400)))
+        )
+        for _ in range(2000)
+    ]
+    return [
+        {'title': title, 'content_text': content}
+        for title, content in (pool[rng.randrange(len(pool))] for _ in range(count))
+    ]
+
+
+def bench(label: str, func, posts: list) -> float:
+    """Runs func over all posts and prints throughput."""
+    start = time.perf_counter()
+    for post in posts:
+        func(post)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<32} {elapsed:8.2f} s  {len(posts) / elapsed:12,.0f} posts/s")
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Categorizer benchmark')
+    parser.add_argument('--posts', type=int, default=1_000_000, help='Number of synthetic posts')
+    parser.add_argument('--workers', type=int, default=0, help='Worker processes (0 = CPU count)')
+    args = parser.parse_args()
+    
+    posts = make_posts(args.posts)
+    categorizer = ContentCategorizer()
+    categories = [category for category in config.CATEGORY_RULES if category != 'other']
+    
+    def per_category(post):
+        return {
+            category: reference_category_score(config.CATEGORY_RULES, post, category)
+            for category in categories
+        }
+    
+    print(f"{args.posts:,} posts, {len(categories)} categories")
+    baseline = bench('per-category scoring', per_category, posts)
+    compiled = bench('compiled keyword matcher', categorizer.matcher.scores, posts)
+    print(f"speedup: {baseline / compiled:.2f}x")
+    
+    # Full categorization (scores, content type, tags)
+    loop = bench('categorize_post loop', categorizer.categorize_post, posts)
+    start = time.perf_counter()
+    categorizer.categorize_batch(posts)
+    batch = time.perf_counter() - start
+    print(f"{'categorize_batch':<32} {batch:8.2f} s  {len(posts) / batch:12,.0f} posts/s")
+    print(f"speedup: {loop / batch:.2f}x")
+    
+    # Same work spread across a process pool
+    start = time.perf_counter()
+    categorizer.categorize_parallel(posts, workers=args.workers)
+    parallel = time.perf_counter() - start
+    print(f"{'categorize_parallel':<32} {parallel:8.2f} s  {len(posts) / parallel:12,.0f} posts/s")
+    print(f"speedup: {batch / parallel:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -28,12 +28,45 @@ HEADLESS_MODE = os.getenv('HEADLESS_MODE', 'false').lower() == 'true'
 
 # Output Settings
 OUTPUT_DIR = Path(os.getenv('OUTPUT_DIR', 'website_output'))
+RENDER_WORKERS = int(os.getenv('RENDER_WORKERS', '0'))  # 0 = CPU count, 1 = serial
+RENDER_CHUNK_SIZE = int(os.getenv('RENDER_CHUNK_SIZE', '500'))
+RENDER_BUFFER_SIZE = int(os.getenv('RENDER_BUFFER_SIZE', '65536'))  # Write buffer per page (bytes)
+TEMPLATE_BYTECODE_CACHE = os.getenv('TEMPLATE_BYTECODE_CACHE', 'true').lower() == 'true'
+TEMPLATE_CACHE_DIR = BASE_DIR / '.template_cache'
+INCREMENTAL_BUILD = os.getenv('INCREMENTAL_BUILD', 'true').lower() == 'true'  # false = rewrite every page
+CATEGORY_PAGE_SIZE = int(os.getenv('CATEGORY_PAGE_SIZE', '50'))  # Posts per category page
+POST_LAYOUT = os.getenv('POST_LAYOUT', 'flat')  # flat, range (posts/12/34/) or hash (posts/7c/4a/)
+POST_SHARD_DEPTH = int(os.getenv('POST_SHARD_DEPTH', '2'))  # Directory levels for range/hash layouts
+SEARCH_INDEX_ENABLED = os.getenv('SEARCH_INDEX_ENABLED', 'true').lower() == 'true'
+SEARCH_PREFIX_LENGTH = int(os.getenv('SEARCH_PREFIX_LENGTH', '3'))  # Term prefix length per index shard
+SEARCH_MAX_DF_RATIO = float(os.getenv('SEARCH_MAX_DF_RATIO', '0.05'))  # Skip terms in more posts than this
+SEARCH_MAX_INLINE_POSTINGS = int(os.getenv('SEARCH_MAX_INLINE_POSTINGS', '512'))  # Longer lists get their own file
+SEARCH_POSTINGS_PER_FILE = int(os.getenv('SEARCH_POSTINGS_PER_FILE', '4096'))  # Pages long lists into files of this size
+GZIP_SIDECARS = os.getenv('GZIP_SIDECARS', 'true').lower() == 'true'  # Write .gz copies for gzip_static
+GZIP_WORKERS = int(os.getenv('GZIP_WORKERS', '0'))  # 0 = CPU count, 1 = serial
 DOWNLOAD_MEDIA = os.getenv('DOWNLOAD_MEDIA', 'true').lower() == 'true'
 MEDIA_DIR = Path(os.getenv('MEDIA_DIR', 'downloaded_media'))
+MEDIA_HARDLINKS = os.getenv('MEDIA_HARDLINKS', 'true').lower() == 'true'  # Hardlink media into the site when possible
 
 # Categorization Settings
 AUTO_CATEGORIZE = os.getenv('AUTO_CATEGORIZE', 'true').lower() == 'true'
 EXTRACT_TAGS = os.getenv('EXTRACT_TAGS', 'true').lower() == 'true'
+TAG_METHOD = os.getenv('TAG_METHOD', 'tfidf')  # tfidf (corpus-aware) or simple (per post)
+TAGS_PER_POST = int(os.getenv('TAGS_PER_POST', '5'))
+TAG_VOCAB_SIZE = int(os.getenv('TAG_VOCAB_SIZE', '100000'))
+CATEGORIZE_WORKERS = int(os.getenv('CATEGORIZE_WORKERS', '0'))  # 0 = CPU count, 1 = serial
+CATEGORIZE_CHUNK_SIZE = int(os.getenv('CATEGORIZE_CHUNK_SIZE', '5000'))
+STATS_AUTHOR_CAPACITY = int(os.getenv('STATS_AUTHOR_CAPACITY', '10000'))  # 0 = exact author counts
+CATEGORY_CACHE = os.getenv('CATEGORY_CACHE', 'true').lower() == 'true'
+CATEGORY_CACHE_FILE = BASE_DIR / 'category_cache.json'
+CATEGORY_CACHE_MAX_ENTRIES = int(os.getenv('CATEGORY_CACHE_MAX_ENTRIES', '1000000'))  # LRU bound, 0 = unlimited
+
+# Near-Duplicate Detection Settings
+DEDUP_ENABLED = os.getenv('DEDUP_ENABLED', 'true').lower() == 'true'
+DEDUP_THRESHOLD = float(os.getenv('DEDUP_THRESHOLD', '0.8'))  # Estimated Jaccard similarity
+DEDUP_NUM_PERM = int(os.getenv('DEDUP_NUM_PERM', '64'))  # MinHash signature length
+DEDUP_BANDS = int(os.getenv('DEDUP_BANDS', '16'))  # LSH bands (must divide DEDUP_NUM_PERM)
+DEDUP_MIN_SHINGLES = int(os.getenv('DEDUP_MIN_SHINGLES', '8'))  # Shorter posts are never duplicates
 
 # ChromeDriver Settings
 CHROMEDRIVER_PATH = os.getenv('CHROMEDRIVER_PATH', '')
@@ -76,7 +109,43 @@ CATEGORY_RULES = {
 # Rate Limiting
 REQUEST_TIMEOUT = 30
 MAX_RETRIES = 3
-RETRY_DELAY = 5
+RETRY_DELAY = 5  # Base delay for exponential backoff (seconds)
+RETRY_MAX_DELAY = 60
+REQUEST_RATE = float(os.getenv('REQUEST_RATE', '4.0'))  # Shared requests/second, 0 = unlimited
+
+# Media Download Settings
+DOWNLOAD_CHUNK_SIZE = int(os.getenv('DOWNLOAD_CHUNK_SIZE', str(1024 * 1024)))  # 1 MB
+MAX_DOWNLOAD_BYTES = int(os.getenv('MAX_DOWNLOAD_BYTES', '0'))  # Per file, 0 = unlimited
+MAX_INFLIGHT_BYTES = int(os.getenv('MAX_INFLIGHT_BYTES', str(64 * 1024 * 1024)))  # 0 = unlimited
+DOWNLOAD_WORKERS = int(os.getenv('DOWNLOAD_WORKERS', '4'))
+
+# Dead media URLs (404/410) are not retried until the TTL expires
+NEGATIVE_CACHE_FILE = BASE_DIR / 'negative_cache.json'
+NEGATIVE_CACHE_TTL = int(os.getenv('NEGATIVE_CACHE_TTL', str(7 * 24 * 3600)))  # Seconds
+
+# Files downloaded (or replaced by WebP) in earlier runs are not fetched again
+DOWNLOAD_MANIFEST_FILE = BASE_DIR / 'download_manifest.json'
+
+# Download Policy Settings
+HEAD_PRECHECK = os.getenv('HEAD_PRECHECK', 'true').lower() == 'true'  # Batch downloads only
+HEAD_WORKERS = int(os.getenv('HEAD_WORKERS', '8'))
+DEFER_DOWNLOAD_BYTES = int(os.getenv('DEFER_DOWNLOAD_BYTES', str(50 * 1024 * 1024)))  # 0 = never defer
+ALLOWED_MEDIA_TYPES = [t.strip() for t in os.getenv('ALLOWED_MEDIA_TYPES', '').split(',') if t.strip()]  # Empty = all
+MEDIA_DISK_QUOTA = int(os.getenv('MEDIA_DISK_QUOTA', '0'))  # Bytes per run, 0 = unlimited
+MIN_FREE_DISK_BYTES = int(os.getenv('MIN_FREE_DISK_BYTES', str(1024 * 1024 * 1024)))  # 1 GB
+
+# Image Derivative Settings
+GENERATE_DERIVATIVES = os.getenv('GENERATE_DERIVATIVES', 'true').lower() == 'true'
+THUMBNAIL_SIZE = int(os.getenv('THUMBNAIL_SIZE', '400'))  # Bounding box (px)
+DERIVATIVE_WIDTHS = [int(w) for w in os.getenv('DERIVATIVE_WIDTHS', '480,960,1600').split(',') if w.strip()]
+DERIVATIVE_QUALITY = int(os.getenv('DERIVATIVE_QUALITY', '82'))
+IMAGE_WORKERS = int(os.getenv('IMAGE_WORKERS', '0'))  # 0 = CPU count
+
+# WebP Transcoding Settings
+WEBP_ENABLED = os.getenv('WEBP_ENABLED', 'false').lower() == 'true'
+WEBP_QUALITY = int(os.getenv('WEBP_QUALITY', '80'))
+WEBP_METHOD = int(os.getenv('WEBP_METHOD', '4'))  # 0 (fast) - 6 (smallest)
+WEBP_KEEP_ORIGINALS = os.getenv('WEBP_KEEP_ORIGINALS', 'true').lower() == 'true'
 
 # Logging
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
@@ -10,11 +10,13 @@ import sys
 from pathlib import Path
 
 import config
-from src.utils import setup_logger
+from src.utils import setup_logger, RateLimiter
 from src.login import ensure_logged_in
 from src.scraper import XenForoScraper
 from src.downloader import MediaDownloader
-from src.categorizer import ContentCategorizer
+from src.image_processor import ImageProcessor
+from src.deduplicator import NearDuplicateDetector
+from src.categorizer import ContentCategorizer, CategoryCache, rules_fingerprint
 from src.site_generator import WebSiteGenerator
 
 
@@ -73,13 +75,19 @@ def validate_config():
     return True
 
 
-def scrape_forum(session, json_file):
+def scrape_forum(session, json_file, rate_limiter=None, downloader=None):
     """Forum scraping işlemini yapar."""
     logger.info("\n" + "="*50)
     logger.info("ADIM 1: FORUM SCRAPING")
     logger.info("="*50)
     
-    scraper = XenForoScraper(session, config.FORUM_URL)
+    # Downloader verilmişse medya, postlar parse edildikçe indirilmeye başlar
+    scraper = XenForoScraper(
+        session,
+        config.FORUM_URL,
+        rate_limiter=rate_limiter,
+        on_post=downloader.submit_post if downloader else None
+    )
     
     success = scraper.scrape_thread(
         config.THREAD_URL,
@@ -123,21 +131,56 @@ def categorize_content(scraper_or_json):
         logger.error("İçerik verisi bulunamadı!")
         return None, None
     
-    categorizer = ContentCategorizer()
+    # Neredeyse aynı postları işaretle (site oluşturulurken gizlenir)
+    if config.DEDUP_ENABLED:
+        NearDuplicateDetector().mark_duplicates(posts_data)
+    
+    cache = None
+    if config.CATEGORY_CACHE:
+        fingerprint = rules_fingerprint(config.CATEGORY_RULES, config.EXTRACT_TAGS)
+        cache = CategoryCache(config.CATEGORY_CACHE_FILE, fingerprint)
+    
+    categorizer = ContentCategorizer(cache=cache)
     categorized_posts = categorizer.categorize_posts(posts_data)
     stats = categorizer.get_stats()
     
     return categorized_posts, stats, thread_info
 
 
-def download_media(session, posts_data):
-    """Medya dosyalarını indirir."""
+def start_media_pipeline(session, rate_limiter):
+    """Scraping ile eşzamanlı çalışacak medya indirme kuyruğunu başlatır."""
+    downloader = MediaDownloader(session, config.MEDIA_DIR, rate_limiter=rate_limiter)
+    downloader.start_pipeline()
+    return downloader
+
+
+def download_media(downloader):
+    """Kuyruktaki medya indirmelerinin bitmesini bekler ve görselleri işler."""
     logger.info("\n" + "="*50)
     logger.info("ADIM 3: MEDYA DOSYALARI İNDİRİLİYOR")
     logger.info("="*50)
     
-    downloader = MediaDownloader(session, config.MEDIA_DIR)
-    mappings = downloader.download_all_media(posts_data)
+    mappings = downloader.finish_pipeline()
+    
+    total_downloaded = sum(len(mapping) for mapping in mappings.values())
+    logger.info(f"Toplam {total_downloaded} medya dosyası indirildi")
+    
+    if mappings['images'] and (config.GENERATE_DERIVATIVES or config.WEBP_ENABLED):
+        processor = ImageProcessor(config.MEDIA_DIR)
+        
+        # Thumbnail ve srcset türevleri (orijinaller silinmeden önce)
+        if config.GENERATE_DERIVATIVES:
+            mappings['derivatives'] = processor.generate_derivatives(mappings['images'])
+        
+        # WebP dönüştürme
+        if config.WEBP_ENABLED:
+            mappings['webp'] = processor.transcode_to_webp(mappings['images'], config.WEBP_KEEP_ORIGINALS)
+            if 'derivatives' in mappings:
+                processor.transcode_derivatives_to_webp(mappings['derivatives'])
+            
+            # Orijinali silinen görseller WebP yoluyla kaydedilir, sonraki çalıştırma tekrar indirmez
+            downloader.manifest.update('images', mappings['images'])
+            downloader.manifest.save()
     
     return mappings
 
@@ -232,8 +275,14 @@ def main():
         session = requests.Session()
         session.headers.update({'User-Agent': config.USER_AGENT})
     
+    # Scraper ve medya indirme aynı hız sınırlayıcıyı paylaşır
+    rate_limiter = RateLimiter(config.REQUEST_RATE)
+    downloader = None
+    if not args.no_media and not args.scrape_only and config.DOWNLOAD_MEDIA:
+        downloader = start_media_pipeline(session, rate_limiter)
+    
     # Scraping işlemi
-    scraper = scrape_forum(session, json_file)
+    scraper = scrape_forum(session, json_file, rate_limiter, downloader)
     if not scraper:
         logger.error("Scraping başarısız oldu!")
         sys.exit(1)
@@ -255,8 +304,8 @@ def main():
     
     # Medya indirme
     media_mappings = None
-    if not args.no_media and config.DOWNLOAD_MEDIA:
-        media_mappings = download_media(session, scraper.posts_data)
+    if downloader:
+        media_mappings = download_media(downloader)
         logger.info("\n✓ Medya dosyaları indirildi")
     else:
         logger.info("\n⊘ Medya indirme atlandı")
@@ -28,6 +28,7 @@ setup(
         'Jinja2>=3.1.0',
         'cloudscraper>=1.2.71',
         'Pillow>=10.0.0',
+        'numpy>=1.24.0',
     ],
     classifiers=[
         'Development Status :: 4 - Beta',
@@ -0,0 +1,133 @@
+"""
+XenForo Forum Archiver - Derleme Manifest Modülü
+
+Bu modül her çıktı dosyasının girdilerinin hash'ini saklayarak sadece
+girdileri değişen sayfaların yeniden oluşturulmasını sağlar.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List
+
+from src.utils import setup_logger
+import config
+
+
+logger = setup_logger(__name__, config.LOG_FILE, config.LOG_LEVEL)
+
+
+def input_digest(*parts: Any) -> str:
+    """
+    Bir çıktının girdilerinin hash'ini hesaplar.
+    
+    Args:
+        *parts: JSON'a çevrilebilir girdiler (post verisi, template kaynağı vb.)
+    
+    Returns:
+        Hex SHA-256 özeti
+    """
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class BuildManifest:
+    """Çıktı dosyası -> girdi hash'i kayıtlarını tutan derleme manifest'i."""
+    
+    MANIFEST_NAME = '.build_manifest.json'
+    CHANGED_LIST_NAME = '.changed_files.txt'
+    DELETED_LIST_NAME = '.deleted_files.txt'
+    
+    def __init__(self, output_dir: Path, force: bool = False):
+        """
+        Args:
+            output_dir: Web sitesi çıktı dizini
+            force: True ise tüm çıktılar değişmiş kabul edilir (tam derleme)
+        """
+        self.output_dir = output_dir
+        self.force = force
+        self.previous: Dict[str, str] = {}
+        self.current: Dict[str, str] = {}
+        self.changed: List[str] = []
+        self.deleted: List[str] = []
+        self.load()
+    
+    @property
+    def manifest_file(self) -> Path:
+        """Manifest dosyasının yolu."""
+        return self.output_dir / self.MANIFEST_NAME
+    
+    def load(self) -> None:
+        """Önceki derlemenin manifest'ini yükler."""
+        if not self.manifest_file.exists():
+            return
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                self.previous = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Derleme manifest'i okunamadı, tam derleme yapılacak: {e}")
+            self.previous = {}
+    
+    def needs_update(self, relative_path: str, digest: str) -> bool:
+        """
+        Çıktıyı kaydeder ve yeniden oluşturulması gerekip gerekmediğini döndürür.
+        
+        Args:
+            relative_path: Çıktı dizinine göre dosya yolu
+            digest: Çıktının girdilerinin hash'i
+        
+        Returns:
+            Girdiler değiştiyse veya dosya yoksa True
+        """
+        self.current[relative_path] = digest
+        if (
+            not self.force
+            and self.previous.get(relative_path) == digest
+            and (self.output_dir / relative_path).exists()
+        ):
+            return False
+        self.changed.append(relative_path)
+        return True
+    
+    def _remove_empty_parents(self, path: Path) -> None:
+        """Silinen dosyadan sonra boş kalan üst dizinleri (ör. eski post parçaları) siler."""
+        for parent in path.parents:
+            if parent == self.output_dir:
+                return
+            try:
+                parent.rmdir()
+            except OSError:
+                # Dizin boş değil veya zaten yok
+                return
+    
+    def finish(self) -> None:
+        """
+        Eski çıktıları siler, manifest'i ve değişen dosya listelerini yazar.
+        
+        Değişen dosyalar .changed_files.txt, silinenler .deleted_files.txt
+        dosyasına satır başına bir yol olarak yazılır (ör. rsync --files-from).
+        """
+        for relative_path in sorted(set(self.previous) - set(self.current)):
+            stale_file = self.output_dir / relative_path
+            if stale_file.exists():
+                stale_file.unlink()
+            self.deleted.append(relative_path)
+            self._remove_empty_parents(stale_file)
+        
+        tmp_file = self.manifest_file.with_name(self.MANIFEST_NAME + '.part')
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.current, f, ensure_ascii=False)
+        tmp_file.replace(self.manifest_file)
+        
+        (self.output_dir / self.CHANGED_LIST_NAME).write_text(
+            ''.join(f'{path}\n' for path in self.changed), encoding='utf-8'
+        )
+        (self.output_dir / self.DELETED_LIST_NAME).write_text(
+            ''.join(f'{path}\n' for path in self.deleted), encoding='utf-8'
+        )
+        
+        skipped = len(self.current) - len(self.changed)
+        logger.info(
+            f"Derleme: {len(self.changed)} dosya yazıldı, {skipped} dosya değişmedi, "
+            f"{len(self.deleted)} eski dosya silindi"
+        )
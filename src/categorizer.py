@@ -4,135 +4,418 @@ XenForo Forum Archiver - Categorizer Module
 This module automatically categorizes content.
 """
 
+import hashlib
+import json
+import os
 import re
-from typing import Dict, List, Any, Set
-from collections import Counter
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Set, Tuple
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
 
 from src.utils import setup_logger, clean_html_text
+from src.tag_extractor import TfidfTagExtractor
+from src.stats import StatsAccumulator
 import config
 
 
 logger = setup_logger(__name__, config.LOG_FILE, config.LOG_LEVEL)
 
 
-class ContentCategorizer:
-    """Content categorization class"""
+# Compact per-post result sent back from worker processes
+CategoryResult = Tuple[str, float, str, Optional[List[str]]]
+
+# Categorizer of the current worker process (set by _init_worker)
+_worker_categorizer: Optional['ContentCategorizer'] = None
+
+
+def _init_worker(category_rules: Dict[str, Any], extract_tags: bool, tag_method: str) -> None:
+    """Creates the categorizer once per worker process."""
+    global _worker_categorizer
+    config.EXTRACT_TAGS = extract_tags
+    config.TAG_METHOD = tag_method
+    _worker_categorizer = ContentCategorizer(category_rules)
+
+
+def _categorize_chunk(rows: List[tuple]) -> List[CategoryResult]:
+    """
+    Categorizes a chunk of posts in a worker process.
+    
+    Args:
+        rows: (title, content_text, content_html, image count, video count, attachment count) tuples
+    
+    Returns:
+        (category, category_score, content_type, tags) per post, in order
+    """
+    posts = [
+        {
+            'title': title,
+            'content_text': content_text,
+            'content_html': content_html,
+            # Only the lengths of the media lists are used for the content type
+            'images': [None] * images,
+            'videos': [None] * videos,
+            'attachments': [None] * attachments
+        }
+        for title, content_text, content_html, images, videos, attachments in rows
+    ]
+    _worker_categorizer.categorize_batch(posts)
+    return [
+        (post['category'], post['category_score'], post['content_type'], post.get('tags'))
+        for post in posts
+    ]
+
+
+# Patterns are compiled once instead of on every call
+LINK_PATTERN = re.compile(r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+')
+HASHTAG_PATTERN = re.compile(r'#(\w+)')
+
+
+class KeywordMatcher:
+    """
+    Keyword table compiled once from the category rules.
     
-    def __init__(self, category_rules: Dict[str, Any] = None):
+    Every distinct keyword is searched once per text and its hit is credited
+    to each category that lists it, so a post is lowercased once and scored
+    for all categories together.
+    """
+    
+    def __init__(self, category_rules: Dict[str, Any]):
         """
         Args:
             category_rules: Category rules dictionary
         """
-        self.category_rules = category_rules or config.CATEGORY_RULES
-        self.categorized_posts: Dict[str, List[Dict[str, Any]]] = {
-            category: [] for category in self.category_rules.keys()
-        }
-        self.stats: Dict[str, Any] = {}
+        # 'other' is the fallback category and is never scored
+        self.categories = [category for category in category_rules if category != 'other']
+        self.max_scores = [len(category_rules[category]['keywords']) * 3 for category in self.categories]
+        
+        table: Dict[str, List[int]] = {}
+        for index, category in enumerate(self.categories):
+            for keyword in category_rules[category]['keywords']:
+                # Duplicated keywords keep one entry per occurrence, like the per-category loop
+                table.setdefault(keyword.lower(), []).append(index)
+        self.table = list(table.items())
     
-    def _determine_content_type(self, post: Dict[str, Any]) -> str:
+    def match_counts(self, title_text: str, content_text: str) -> List[int]:
         """
-        Determines the content type of the post.
+        Counts weighted keyword matches per category.
         
         Args:
-            post: Post data
+            title_text: Lowercased title
+            content_text: Lowercased content text
         
         Returns:
-            Content type (text, image, video, attachment, code, link)
+            Match points per category (title 2x, content 1x), in self.categories order
         """
-        images_count = len(post.get('images', []))
-        videos_count = len(post.get('videos', []))
-        attachments_count = len(post.get('attachments', []))
-        content_text = post.get('content_text', '')
-        
-        # Video content
-        if videos_count > 0:
-            return 'video'
+        matches = [0] * len(self.categories)
+        for keyword, indexes in self.table:
+            points = (2 if keyword in title_text else 0) + (1 if keyword in content_text else 0)
+            if points:
+                for index in indexes:
+                    matches[index] += points
+        return matches
+    
+    def keyword_category_matrix(self) -> np.ndarray:
+        """
+        Returns the keyword x category occurrence matrix.
         
-        # Image-heavy content
-        if images_count > 3:
-            return 'image'
+        Returns:
+            int32 matrix, entry [k, c] is how many times keyword k is listed in category c
+        """
+        matrix = np.zeros((len(self.table), len(self.categories)), dtype=np.int32)
+        for row, (_, indexes) in enumerate(self.table):
+            for index in indexes:
+                matrix[row, index] += 1
+        return matrix
+    
+    def hit_matrix(self, titles: List[str], contents: List[str]) -> np.ndarray:
+        """
+        Builds the post x keyword hit matrix for a batch of lowercased texts.
         
-        # Attachment content
-        if attachments_count > 0:
-            return 'attachment'
+        Args:
+            titles: Lowercased titles
+            contents: Lowercased content texts
         
-        # Code content
-        if '<code>' in post.get('content_html', '') or '```' in content_text:
-            return 'code'
+        Returns:
+            uint8 matrix, entry [p, k] is 2 for a title hit plus 1 for a content hit
+        """
+        count = len(titles)
+        hits = np.empty((count, len(self.table)), dtype=np.uint8)
+        for column, (keyword, _) in enumerate(self.table):
+            # Substring search stays in str.__contains__, which beats np.strings.find by far
+            hits[:, column] = np.fromiter([keyword in text for text in titles], dtype=bool, count=count)
+            hits[:, column] *= 2
+            hits[:, column] += np.fromiter([keyword in text for text in contents], dtype=bool, count=count)
+        return hits
+    
+    def scores(self, post: Dict[str, Any]) -> Dict[str, float]:
+        """
+        Calculates the score of every category for the post.
         
-        # Link-heavy content
-        link_pattern = r'http[s]?://(?:[a-zA-Z]|[0-9]|[$-_@.&+]|[!*\\(\\),]|(?:%[0-9a-fA-F][0-9a-fA-F]))+'
-        links = re.findall(link_pattern, content_text)
-        if len(links) > 2:
-            return 'link'
+        Args:
+            post: Post data
         
-        # Default: text
-        return 'text'
+        Returns:
+            Category -> score (between 0-1)
+        """
+        matches = self.match_counts(
+            post.get('title', '').lower(),
+            post.get('content_text', '').lower()
+        )
+        return {
+            category: min(match / max_score, 1.0) if max_score > 0 else 0.0
+            for category, match, max_score in zip(self.categories, matches, self.max_scores)
+        }
+
+
+class TextAnalyzer:
+    """
+    Derives the text features categorization needs from one analysis per post.
     
-    def _extract_tags(self, post: Dict[str, Any]) -> List[str]:
+    Keyword hits come from the lowercased title and content. Hashtags and
+    links come from regex scans that only run when '#' or 'http' occurs in
+    the text. Proper nouns come from a whitespace split that stops after the
+    first five. Each feature is computed once and shared by the category
+    score, the content type and the tags.
+    """
+    
+    def __init__(self, matcher: KeywordMatcher):
+        """
+        Args:
+            matcher: Keyword matcher of the category rules
+        """
+        self.matcher = matcher
+    
+    def analyze(self, post: Dict[str, Any], keywords: bool = True) -> Dict[str, Any]:
         """
-        Extracts tags from the post.
+        Analyzes the text of a post.
         
         Args:
             post: Post data
+            keywords: Also count keyword matches (batch scoring does that itself)
         
         Returns:
-            List of tags
+            Dictionary with matches, link_count, hashtags, proper_nouns and has_code
         """
-        tags = []
         content_text = post.get('content_text', '')
         
-        # Find hashtags
-        hashtags = re.findall(r'#(\w+)', content_text)
-        tags.extend(hashtags)
-        
-        # Find words starting with capital letter (proper nouns)
-        words = content_text.split()
-        proper_nouns = [word.strip('.,!?;:') for word in words if word and word[0].isupper() and len(word) > 3]
-        tags.extend(proper_nouns[:5])  # First 5 proper nouns
-        
-        # Remove duplicates and convert to lowercase
-        tags = list(set([tag.lower() for tag in tags]))
-        
-        return tags[:10]  # Maximum 10 tags
+        analysis: Dict[str, Any] = {'matches': None}
+        if keywords:
+            analysis['matches'] = self.matcher.match_counts(
+                post.get('title', '').lower(),
+                content_text.lower()
+            )
+        
+        # Hashtags and links never contain whitespace, so the regexes only run
+        # when their marker occurs at all
+        analysis['hashtags'] = HASHTAG_PATTERN.findall(content_text) if '#' in content_text else []
+        analysis['link_count'] = len(LINK_PATTERN.findall(content_text)) if 'http' in content_text else 0
+        analysis['has_code'] = '<code>' in post.get('content_html', '') or '```' in content_text
+        
+        # Only the first 5 proper nouns are used, so stop there
+        analysis['proper_nouns'] = list(islice(
+            (word.strip('.,!?;:') for word in content_text.split() if word[0].isupper() and len(word) > 3),
+            5
+        ))
+        
+        return analysis
     
-    def _calculate_category_score(self, post: Dict[str, Any], category: str) -> float:
+    @staticmethod
+    def content_type(post: Dict[str, Any], analysis: Dict[str, Any]) -> str:
         """
-        Calculates the category score for the post.
+        Determines the content type from the media counts and the analysis.
         
         Args:
             post: Post data
-            category: Category name
+            analysis: Result of analyze()
         
         Returns:
-            Score (between 0-1)
+            Content type (text, image, video, attachment, code, link)
         """
-        if category not in self.category_rules:
-            return 0.0
-        
-        keywords = self.category_rules[category]['keywords']
-        if not keywords:
-            return 0.0
-        
-        content_text = post.get('content_text', '').lower()
-        title_text = post.get('title', '').lower()
+        if len(post.get('videos', [])) > 0:
+            return 'video'
+        if len(post.get('images', [])) > 3:
+            return 'image'
+        if len(post.get('attachments', [])) > 0:
+            return 'attachment'
+        if analysis['has_code']:
+            return 'code'
+        if analysis['link_count'] > 2:
+            return 'link'
+        return 'text'
+    
+    @staticmethod
+    def tags(analysis: Dict[str, Any]) -> List[str]:
+        """
+        Builds the tag list from hashtags and proper nouns.
         
-        # Keyword match count
-        matches = 0
-        for keyword in keywords:
-            keyword_lower = keyword.lower()
-            # Title match (2x weight)
-            if keyword_lower in title_text:
-                matches += 2
-            # Content match
-            if keyword_lower in content_text:
-                matches += 1
+        Args:
+            analysis: Result of analyze()
         
-        # Normalize
-        max_possible_score = len(keywords) * 3  # Max 3 points per keyword
-        score = matches / max_possible_score if max_possible_score > 0 else 0.0
+        Returns:
+            List of tags (maximum 10)
+        """
+        tags = analysis['hashtags'] + analysis['proper_nouns']
+        # Remove duplicates and convert to lowercase
+        return list(set([tag.lower() for tag in tags]))[:10]
+
+
+def post_content_key(post: Dict[str, Any]) -> str:
+    """
+    Hashes the post fields categorization depends on.
+    
+    Media counts are included because they decide the content type.
+    
+    Args:
+        post: Post data
+    
+    Returns:
+        Hex digest of title, text, HTML and media counts
+    """
+    digest = hashlib.sha1()
+    for field in ('title', 'content_text', 'content_html'):
+        digest.update(post.get(field, '').encode('utf-8', 'surrogatepass'))
+        digest.update(b'\0')
+    counts = (len(post.get(field, [])) for field in ('images', 'videos', 'attachments'))
+    digest.update(','.join(map(str, counts)).encode('ascii'))
+    return digest.hexdigest()
+
+
+def rules_fingerprint(
+    category_rules: Dict[str, Any],
+    extract_tags: bool,
+    tag_method: str = config.TAG_METHOD
+) -> str:
+    """
+    Fingerprints the categorization settings.
+    
+    Args:
+        category_rules: Category rules dictionary
+        extract_tags: Whether tags are extracted
+        tag_method: Tag extraction method
+    
+    Returns:
+        Hex digest that changes whenever the rules or tag settings change
+    """
+    payload = json.dumps(
+        {'rules': category_rules, 'extract_tags': extract_tags, 'tag_method': tag_method},
+        sort_keys=True,
+        ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class CategoryCache:
+    """Persistent cache of categorization results keyed by post content."""
+    
+    def __init__(
+        self,
+        cache_file: Optional[Path],
+        fingerprint: str,
+        max_entries: int = config.CATEGORY_CACHE_MAX_ENTRIES
+    ):
+        """
+        Args:
+            cache_file: JSON cache file (None = in memory only)
+            fingerprint: Rules fingerprint; a stored cache with another one is discarded
+            max_entries: Entries kept on save, least recently used first to go (0 = unlimited)
+        """
+        self.cache_file = cache_file
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self.entries: Dict[str, CategoryResult] = {}
+        # Key -> time of the run that last read or wrote the entry
+        self.last_used: Dict[str, float] = {}
+        self.run_time = time.time()
+        self.hits = 0
+        self.misses = 0
+        self.load()
+    
+    def load(self) -> None:
+        """Loads the cache from disk unless the rules have changed."""
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not read category cache: {e}")
+            return
+        
+        if data.get('fingerprint') != self.fingerprint:
+            logger.info("Category rules changed, category cache invalidated")
+            return
+        self.entries = {key: tuple(entry) for key, entry in data.get('entries', {}).items()}
+        self.last_used = {key: data.get('last_used', {}).get(key, 0.0) for key in self.entries}
+        logger.info(f"Loaded {len(self.entries)} cached categorization results")
+    
+    def save(self) -> None:
+        """
+        Writes the cache to disk.
         
-        return min(score, 1.0)
+        Entries are kept across runs over different subsets of the archive;
+        only the least recently used ones beyond max_entries are dropped,
+        which also ages out results of edited or deleted posts.
+        """
+        if not self.cache_file:
+            return
+        keys = list(self.entries)
+        if self.max_entries and len(keys) > self.max_entries:
+            keys = sorted(keys, key=self.last_used.__getitem__, reverse=True)[:self.max_entries]
+        data = {
+            'fingerprint': self.fingerprint,
+            'entries': {key: self.entries[key] for key in keys},
+            'last_used': {key: self.last_used[key] for key in keys}
+        }
+        try:
+            tmp_file = self.cache_file.with_name(self.cache_file.name + '.part')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            tmp_file.replace(self.cache_file)
+        except OSError as e:
+            logger.warning(f"Could not save category cache: {e}")
+    
+    def get(self, key: str) -> Optional[CategoryResult]:
+        """Returns the cached result for a content key, counting hits and misses."""
+        result = self.entries.get(key)
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.last_used[key] = self.run_time
+        return result
+    
+    def put(self, key: str, result: CategoryResult) -> None:
+        """Stores the result for a content key."""
+        self.entries[key] = result
+        self.last_used[key] = self.run_time
+    
+    def hit_rate(self) -> float:
+        """Share of lookups answered from the cache."""
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class ContentCategorizer:
+    """Content categorization class"""
+    
+    def __init__(self, category_rules: Dict[str, Any] = None, cache: Optional[CategoryCache] = None):
+        """
+        Args:
+            category_rules: Category rules dictionary
+            cache: Categorization result cache (None = always recompute)
+        """
+        self.category_rules = category_rules or config.CATEGORY_RULES
+        self.matcher = KeywordMatcher(self.category_rules)
+        self.analyzer = TextAnalyzer(self.matcher)
+        self.cache = cache
+        self.categorized_posts: Dict[str, List[Dict[str, Any]]] = {
+            category: [] for category in self.category_rules.keys()
+        }
+        self.stats: Dict[str, Any] = {}
     
     def categorize_post(self, post: Dict[str, Any]) -> str:
         """
@@ -144,91 +427,263 @@ class ContentCategorizer:
         Returns:
             Category name
         """
-        # Calculate score for each category
-        scores: Dict[str, float] = {}
-        for category in self.category_rules.keys():
-            if category != 'other':  # Skip 'other' category from calculation
-                score = self._calculate_category_score(post, category)
-                scores[category] = score
+        # Keyword hits, content type and tags all come from one text analysis
+        analysis = self.analyzer.analyze(post)
+        scores = {
+            category: min(match / max_score, 1.0) if max_score > 0 else 0.0
+            for category, match, max_score in zip(
+                self.matcher.categories, analysis['matches'], self.matcher.max_scores
+            )
+        }
         
-        # Find the category with the highest score
+        # Find the category with the highest score ('other' is never scored)
         if scores and max(scores.values()) > 0.1:  # Minimum threshold
             best_category = max(scores, key=scores.get)
         else:
             best_category = 'other'
         
-        # Add category and score information to post
-        post['category'] = best_category
-        post['category_score'] = scores.get(best_category, 0.0)
-        post['content_type'] = self._determine_content_type(post)
+        self._annotate_post(post, best_category, scores.get(best_category, 0.0), analysis)
+        return best_category
+    
+    def categorize_batch(self, posts: List[Dict[str, Any]], batch_size: int = 50000) -> List[str]:
+        """
+        Categorizes many posts at once using matrix operations.
+        
+        Keyword hits are collected into a post x keyword matrix, weighted and
+        normalized per category with a single matrix product, and the best
+        category is taken with argmax. Results are identical to calling
+        categorize_post on each post.
         
-        # Extract tags
+        Args:
+            posts: List of post data
+            batch_size: Posts per matrix, bounds memory use
+        
+        Returns:
+            Category name of each post, in order
+        """
+        categories = self.matcher.categories
+        weights = self.matcher.keyword_category_matrix()
+        max_scores = np.array(self.matcher.max_scores, dtype=np.float64)
+        
+        results: List[str] = []
+        for start in range(0, len(posts), batch_size):
+            batch = posts[start:start + batch_size]
+            titles = [post.get('title', '').lower() for post in batch]
+            contents = [post.get('content_text', '').lower() for post in batch]
+            
+            matches = self.matcher.hit_matrix(titles, contents).astype(np.int32) @ weights
+            scores = np.zeros(matches.shape, dtype=np.float64)
+            np.divide(matches, max_scores, out=scores, where=max_scores > 0)
+            np.minimum(scores, 1.0, out=scores)
+            
+            if categories:
+                # argmax keeps the first maximum, like max() over the ordered dict
+                best = scores.argmax(axis=1)
+                best_scores = scores[np.arange(len(batch)), best]
+            else:
+                best = np.zeros(len(batch), dtype=np.intp)
+                best_scores = np.zeros(len(batch), dtype=np.float64)
+            
+            for post, index, score in zip(batch, best.tolist(), best_scores.tolist()):
+                if score > 0.1:  # Minimum threshold
+                    category = categories[index]
+                else:
+                    category, score = 'other', 0.0
+                self._annotate_post(post, category, score)
+                results.append(category)
+        
+        return results
+    
+    def _annotate_post(
+        self,
+        post: Dict[str, Any],
+        category: str,
+        score: float,
+        analysis: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """
+        Writes category, score, content type and tags into the post.
+        
+        Args:
+            post: Post data
+            category: Selected category
+            score: Score of the selected category
+            analysis: Text analysis of the post, computed here when missing
+        """
+        if analysis is None:
+            analysis = self.analyzer.analyze(post, keywords=False)
+        
+        post['category'] = category
+        post['category_score'] = score
+        post['content_type'] = self.analyzer.content_type(post, analysis)
+        
+        # Per-post tags; with TAG_METHOD=tfidf, categorize_posts replaces them
+        # by archive-wide tags once the whole archive has been seen
         if config.EXTRACT_TAGS:
-            post['tags'] = self._extract_tags(post)
+            post['tags'] = self.analyzer.tags(analysis)
+    
+    def categorize_parallel(
+        self,
+        posts_data: List[Dict[str, Any]],
+        workers: int = config.CATEGORIZE_WORKERS,
+        chunk_size: int = config.CATEGORIZE_CHUNK_SIZE
+    ) -> List[str]:
+        """
+        Categorizes posts in chunks across worker processes.
         
-        return best_category
+        Only the fields needed for categorization are sent to the workers and
+        only compact (category, score, content_type, tags) tuples come back;
+        they are written into the posts in their original order.
+        
+        Args:
+            posts_data: List of post data
+            workers: Number of worker processes (0 = CPU count)
+            chunk_size: Posts per chunk
+        
+        Returns:
+            Category name of each post, in order
+        """
+        rows = [
+            (
+                post.get('title', ''),
+                post.get('content_text', ''),
+                post.get('content_html', ''),
+                len(post.get('images', [])),
+                len(post.get('videos', [])),
+                len(post.get('attachments', []))
+            )
+            for post in posts_data
+        ]
+        chunks = [rows[start:start + chunk_size] for start in range(0, len(rows), chunk_size)]
+        
+        categories: List[str] = []
+        with ProcessPoolExecutor(
+            max_workers=workers or None,
+            initializer=_init_worker,
+            initargs=(self.category_rules, config.EXTRACT_TAGS, config.TAG_METHOD)
+        ) as executor:
+            posts_iter = iter(posts_data)
+            for results in executor.map(_categorize_chunk, chunks):
+                for result in results:
+                    self._apply_result(next(posts_iter), result)
+                    categories.append(result[0])
+        
+        return categories
+    
+    @staticmethod
+    def _apply_result(post: Dict[str, Any], result: CategoryResult) -> None:
+        """Writes a (category, category_score, content_type, tags) tuple into the post."""
+        category, score, content_type, tags = result
+        post['category'] = category
+        post['category_score'] = score
+        post['content_type'] = content_type
+        if tags is not None:
+            post['tags'] = list(tags)
     
-    def categorize_posts(self, posts_data: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    def _categorize_uncached(self, posts_data: List[Dict[str, Any]], workers: int) -> List[str]:
+        """Categorizes posts serially or in the process pool, depending on size."""
+        # Process pool only pays off when there is more than one chunk of work
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(posts_data) > config.CATEGORIZE_CHUNK_SIZE:
+            return self.categorize_parallel(posts_data, workers)
+        return self.categorize_batch(posts_data)
+    
+    def _categorize_cached(self, posts_data: List[Dict[str, Any]], workers: int) -> List[str]:
+        """
+        Categorizes posts, recomputing only those missing from the cache.
+        
+        Args:
+            posts_data: List of post data
+            workers: Number of worker processes
+        
+        Returns:
+            Category name of each post, in order
+        """
+        keys = [post_content_key(post) for post in posts_data]
+        categories: List[Optional[str]] = [None] * len(posts_data)
+        missing: List[int] = []
+        
+        for index, (post, key) in enumerate(zip(posts_data, keys)):
+            result = self.cache.get(key)
+            if result is None:
+                missing.append(index)
+            else:
+                self._apply_result(post, result)
+                categories[index] = result[0]
+        
+        logger.info(
+            f"Category cache: {self.cache.hits} hits, {self.cache.misses} misses "
+            f"({self.cache.hit_rate():.1%} hit rate)"
+        )
+        
+        if missing:
+            missing_posts = [posts_data[index] for index in missing]
+            for index, post, category in zip(
+                missing, missing_posts, self._categorize_uncached(missing_posts, workers)
+            ):
+                categories[index] = category
+                self.cache.put(keys[index], (category, post['category_score'], post['content_type'], post.get('tags')))
+        
+        self.cache.save()
+        return categories
+    
+    def categorize_posts(
+        self,
+        posts_data: List[Dict[str, Any]],
+        workers: int = config.CATEGORIZE_WORKERS
+    ) -> Dict[str, List[Dict[str, Any]]]:
         """
         Categorizes all posts.
         
         Args:
             posts_data: List of post data
+            workers: Number of worker processes (0 = CPU count, 1 = serial)
         
         Returns:
             Dictionary of categorized posts
         """
         logger.info(f"Categorizing total of {len(posts_data)} posts...")
         
-        # Categorize each post
-        for post in posts_data:
-            category = self.categorize_post(post)
+        if self.cache is not None:
+            categories = self._categorize_cached(posts_data, workers)
+        else:
+            categories = self._categorize_uncached(posts_data, workers)
+        
+        # Group posts and collect statistics in the same pass
+        accumulator = StatsAccumulator(self.category_rules.keys())
+        for post, category in zip(posts_data, categories):
             self.categorized_posts[category].append(post)
+            accumulator.add(post)
+        self.stats = accumulator.to_dict()
         
-        # Calculate statistics
-        self._calculate_stats(posts_data)
+        if config.EXTRACT_TAGS and config.TAG_METHOD == 'tfidf':
+            self._extract_corpus_tags(posts_data, workers)
         
         # Print statistics
         self._print_stats()
         
         return self.categorized_posts
     
-    def _calculate_stats(self, posts_data: List[Dict[str, Any]]) -> None:
+    def _extract_corpus_tags(self, posts_data: List[Dict[str, Any]], workers: int) -> None:
         """
-        Calculates categorization statistics.
+        Tags all posts by TF-IDF over the whole archive.
+        
+        When no term qualifies (e.g. an archive of a handful of posts), the
+        per-post tags set during categorization are kept.
         
         Args:
             posts_data: List of post data
+            workers: Number of worker processes (0 = CPU count, 1 = serial)
         """
-        total_posts = len(posts_data)
-        
-        # Category distribution
-        category_distribution = {
-            category: len(posts) for category, posts in self.categorized_posts.items()
-        }
-        
-        # Content type distribution
-        content_types = [post.get('content_type', 'unknown') for post in posts_data]
-        content_type_distribution = dict(Counter(content_types))
-        
-        # Author distribution
-        authors = [post.get('author', 'Unknown') for post in posts_data]
-        author_distribution = dict(Counter(authors).most_common(10))
-        
-        # Image/video statistics
-        total_images = sum(len(post.get('images', [])) for post in posts_data)
-        total_videos = sum(len(post.get('videos', [])) for post in posts_data)
-        total_attachments = sum(len(post.get('attachments', [])) for post in posts_data)
-        
-        self.stats = {
-            'total_posts': total_posts,
-            'category_distribution': category_distribution,
-            'content_type_distribution': content_type_distribution,
-            'author_distribution': author_distribution,
-            'total_images': total_images,
-            'total_videos': total_videos,
-            'total_attachments': total_attachments
-        }
+        texts = [f"{post.get('title', '')}\n{post.get('content_text', '')}" for post in posts_data]
+        workers = workers or os.cpu_count() or 1
+        extractor = TfidfTagExtractor()
+        extractor.fit(texts, workers)
+        if not extractor.idf:
+            logger.info("Tag vocabulary is empty, keeping per-post tags")
+            return
+        for post, tags in zip(posts_data, extractor.transform(texts, workers)):
+            post['tags'] = tags
     
     def _print_stats(self) -> None:
         """Prints statistics to console."""
@@ -255,7 +710,8 @@ class ContentCategorizer:
         ):
             logger.info(f"  {content_type.capitalize()}: {count}")
         
-        logger.info("\nMost Active Authors (Top 10):")
+        exact = '' if self.stats.get('author_counts_exact', True) else ', approximate'
+        logger.info(f"\nMost Active Authors (Top 10{exact}):")
         for author, count in list(self.stats['author_distribution'].items())[:10]:
             logger.info(f"  {author}: {count} posts")
         
@@ -0,0 +1,120 @@
+"""
+XenForo Forum Archiver - Ön Sıkıştırma Modülü
+
+Bu modül oluşturulan metin dosyalarının yanına en yüksek seviyede
+sıkıştırılmış .gz kopyalarını yazar; böylece sunucu (ör. nginx
+gzip_static) her istekte yeniden sıkıştırma yapmaz.
+"""
+
+import gzip
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from src.build_manifest import BuildManifest, input_digest
+from src.utils import setup_logger, format_file_size
+import config
+
+
+logger = setup_logger(__name__, config.LOG_FILE, config.LOG_LEVEL)
+
+
+# Ön sıkıştırılan metin dosyası uzantıları
+COMPRESSIBLE_SUFFIXES = ('.html', '.css', '.js', '.json', '.svg', '.txt', '.xml')
+
+COMPRESS_LEVEL = 9
+
+
+def sidecar_path(path: Path) -> Path:
+    """Dosyanın .gz kopyasının yolunu döndürür."""
+    return path.with_name(path.name + '.gz')
+
+
+def compress_file(path: Path) -> Tuple[int, int]:
+    """
+    Dosyanın .gz kopyasını yazar.
+    
+    Çıktı gzip başlığına zaman damgası yazılmadığı için aynı girdi her
+    zaman aynı baytları üretir.
+    
+    Args:
+        path: Sıkıştırılacak dosya
+    
+    Returns:
+        (orijinal boyut, sıkıştırılmış boyut)
+    """
+    data = path.read_bytes()
+    compressed = gzip.compress(data, compresslevel=COMPRESS_LEVEL, mtime=0)
+    gz_file = sidecar_path(path)
+    tmp_file = gz_file.with_name(gz_file.name + '.part')
+    tmp_file.write_bytes(compressed)
+    tmp_file.replace(gz_file)
+    return len(data), len(compressed)
+
+
+def _compress_chunk(paths: List[Path]) -> List[Tuple[int, int]]:
+    """Bir grup dosyayı işçi süreçte sıkıştırır."""
+    return [compress_file(path) for path in paths]
+
+
+def write_gzip_sidecars(
+    manifest: BuildManifest,
+    workers: int = config.GZIP_WORKERS,
+    chunk_size: int = 64
+) -> Dict[str, int]:
+    """
+    Manifest'teki metin çıktıları için .gz kopyalarını yazar.
+    
+    Her .gz kopyası kaynağının girdi hash'iyle manifest'e kaydedilir; bu
+    yüzden sadece kaynağı değişen veya .gz kopyası olmayan dosyalar yeniden
+    sıkıştırılır ve kaynağı silinen kopyaları manifest.finish() siler.
+    
+    Args:
+        manifest: Bu derlemenin manifest'i (finish() çağrılmadan önce)
+        workers: İşçi süreç sayısı (0 = CPU sayısı, 1 = seri)
+        chunk_size: İşçiye tek seferde gönderilen dosya sayısı
+    
+    Returns:
+        Sıkıştırma istatistikleri
+    """
+    sources = [
+        relative_path for relative_path in list(manifest.current)
+        if relative_path.endswith(COMPRESSIBLE_SUFFIXES)
+    ]
+    pending = [
+        manifest.output_dir / relative_path
+        for relative_path in sources
+        if manifest.needs_update(
+            relative_path + '.gz', input_digest(manifest.current[relative_path], COMPRESS_LEVEL)
+        )
+    ]
+    
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(pending) > chunk_size:
+        chunks = [pending[start:start + chunk_size] for start in range(0, len(pending), chunk_size)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            sizes = [size for chunk_sizes in executor.map(_compress_chunk, chunks) for size in chunk_sizes]
+    else:
+        sizes = _compress_chunk(pending)
+    
+    # Oran değişmeyen kopyalar dahil tüm site için hesaplanır
+    original_bytes = 0
+    compressed_bytes = 0
+    for relative_path in sources:
+        path = manifest.output_dir / relative_path
+        original_bytes += path.stat().st_size
+        compressed_bytes += sidecar_path(path).stat().st_size
+    
+    stats = {
+        'compressed_files': len(sizes),
+        'unchanged_files': len(sources) - len(sizes),
+        'original_bytes': original_bytes,
+        'compressed_bytes': compressed_bytes
+    }
+    ratio = compressed_bytes / original_bytes * 100 if original_bytes else 0
+    logger.info(
+        f".gz kopyaları: {stats['compressed_files']} dosya sıkıştırıldı, {stats['unchanged_files']} değişmedi; "
+        f"{format_file_size(original_bytes)} -> {format_file_size(compressed_bytes)} (%{ratio:.1f})"
+    )
+    return stats
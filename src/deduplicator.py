@@ -0,0 +1,257 @@
+"""
+XenForo Forum Archiver - Tekrar Tespit Modülü
+
+Bu modül MinHash imzaları ve LSH bantlama ile birbirinin neredeyse
+aynısı olan postları (kopyala-yapıştır, bump, sadece imza içeren
+cevaplar) bulur ve tekrar olarak işaretler.
+"""
+
+import re
+from typing import Dict, List, Any, Optional, Tuple
+
+import lxml.html
+import numpy as np
+
+from src.utils import setup_logger
+import config
+
+
+logger = setup_logger(__name__, config.LOG_FILE, config.LOG_LEVEL)
+
+
+# Shingle içindeki kelime hash'lerini karıştıran tek sayı (64 bit altın oran)
+SHINGLE_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+
+WORD_PATTERN = re.compile(r'\w+')
+
+# XenForo alıntı blokları (class listesinde bbCodeBlock geçen blockquote'lar)
+QUOTE_XPATH = './/blockquote[contains(concat(" ", normalize-space(@class), " "), " bbCodeBlock ")]'
+
+
+def reply_text(post: Dict[str, Any]) -> str:
+    """
+    Postun alıntılar çıkarılmış, yazarın kendi yazdığı metnini döndürür.
+    
+    content_text alıntılanan postun metnini de içerir; alıntı yapıp kısa bir
+    cevap ekleyen postlar bu metinle karşılaştırılırsa alıntılanan postun
+    tekrarı sanılır.
+    
+    Args:
+        post: Post verisi
+    
+    Returns:
+        Alıntısız metin
+    """
+    content_html = post.get('content_html') or ''
+    if 'bbCodeBlock' in content_html:
+        try:
+            root = lxml.html.fragment_fromstring(content_html, create_parent='div')
+        except ValueError:
+            root = None
+        if root is not None:
+            for quote in root.xpath(QUOTE_XPATH):
+                quote.drop_tree()
+            return root.text_content()
+    
+    # HTML yoksa scraper'ın çıkardığı alıntı metinleri düşülür
+    text = post.get('content_text', '')
+    for quote in post.get('quotes', []):
+        if quote.get('content'):
+            text = text.replace(quote['content'], ' ', 1)
+    return text
+
+
+class NearDuplicateDetector:
+    """MinHash + LSH ile neredeyse aynı postları bulan sınıf."""
+    
+    def __init__(
+        self,
+        num_perm: int = config.DEDUP_NUM_PERM,
+        bands: int = config.DEDUP_BANDS,
+        threshold: float = config.DEDUP_THRESHOLD,
+        shingle_size: int = 3,
+        min_shingles: int = config.DEDUP_MIN_SHINGLES,
+        seed: int = 1
+    ):
+        """
+        Args:
+            num_perm: MinHash imza uzunluğu
+            bands: LSH bant sayısı (num_perm'e tam bölünmeli)
+            threshold: Tekrar sayılacak minimum tahmini Jaccard benzerliği
+            shingle_size: Shingle başına kelime sayısı
+            min_shingles: Bundan az shingle'ı olan postlar tekrar sayılmaz
+                ("Teşekkürler" gibi kısa cevaplar farklı yazarlardan gelir)
+            seed: Hash fonksiyonları için tohum
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm bant sayısına tam bölünmeli")
+        
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.threshold = threshold
+        self.shingle_size = shingle_size
+        self.min_shingles = min_shingles
+        
+        # Çarp-kaydır hash ailesi: (a*x + b) >> 32, a tek sayı; bölme gerektirmez
+        rng = np.random.default_rng(seed)
+        self.hash_a = rng.integers(0, 2**64, size=(num_perm, 1), dtype=np.uint64) | np.uint64(1)
+        self.hash_b = rng.integers(0, 2**64, size=(num_perm, 1), dtype=np.uint64)
+    
+    def _shingles(self, text: str) -> np.ndarray:
+        """
+        Metni kelime shingle'larının 32 bit hash'lerine çevirir.
+        
+        Args:
+            text: Post metni
+        
+        Returns:
+            Tekil shingle hash'leri (uint64)
+        """
+        words = WORD_PATTERN.findall(text.lower())
+        size = self.shingle_size
+        if len(words) < size:
+            # Kısa postlar ("+1", "up") tek bir shingle olarak ele alınır
+            return np.array([hash(' '.join(words)) & 0xFFFFFFFF], dtype=np.uint64)
+        
+        # Kelimeler bir kez hash'lenir, shingle hash'leri numpy ile birleştirilir.
+        # str hash'i süreç başına tuzlanır; imzalar sadece aynı çalıştırma içinde karşılaştırılır.
+        word_hashes = np.fromiter(map(hash, words), dtype=np.int64, count=len(words)).view(np.uint64)
+        count = len(words) - size + 1
+        mixed = np.zeros(count, dtype=np.uint64)
+        for offset in range(size):
+            # Taşmalar 2^64 modunda sarılır
+            mixed = (mixed ^ word_hashes[offset:offset + count]) * SHINGLE_MULTIPLIER
+        return (mixed ^ (mixed >> np.uint64(32))) & np.uint64(0xFFFFFFFF)
+    
+    def _permute(self, hashes: np.ndarray) -> np.ndarray:
+        """Shingle hash'lerine num_perm farklı hash fonksiyonu uygular (num_perm x len)."""
+        # Taşmalar 2^64 modunda sarılır
+        return (self.hash_a * hashes + self.hash_b) >> np.uint64(32)
+    
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """
+        Metnin MinHash imzasını hesaplar.
+        
+        Args:
+            text: Post metni
+        
+        Returns:
+            num_perm uzunluğunda imza, metinde kelime yoksa None
+        """
+        if not WORD_PATTERN.search(text):
+            return None
+        hashes = self._shingles(text)
+        return self._permute(hashes).min(axis=1)
+    
+    def signatures(self, texts: List[str], batch_size: int = 1000) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Birçok metnin MinHash imzalarını toplu hesaplar.
+        
+        Bir gruptaki tüm shingle'lar tek bir dizide hash'lenir ve her metnin
+        minimumu np.minimum.reduceat ile alınır; sonuç signature() ile aynıdır.
+        
+        Args:
+            texts: Post metinleri
+            batch_size: Grup başına metin sayısı (bellek kullanımını sınırlar)
+        
+        Returns:
+            (len(texts) x num_perm uint32 imza matrisi, metin başına shingle sayısı;
+            kelime içermeyen metinler için 0)
+        """
+        matrix = np.zeros((len(texts), self.num_perm), dtype=np.uint32)
+        counts = np.zeros(len(texts), dtype=np.int64)
+        for start in range(0, len(texts), batch_size):
+            indexes = [
+                index for index in range(start, min(start + batch_size, len(texts)))
+                if WORD_PATTERN.search(texts[index])
+            ]
+            if not indexes:
+                continue
+            shingles = [self._shingles(texts[index]) for index in indexes]
+            offsets = np.cumsum([0] + [len(hashes) for hashes in shingles[:-1]])
+            hashed = self._permute(np.concatenate(shingles))
+            matrix[indexes] = np.minimum.reduceat(hashed, offsets, axis=1).T
+            counts[indexes] = [len(hashes) for hashes in shingles]
+        return matrix, counts
+    
+    def find_duplicates(self, texts: List[str]) -> Dict[int, int]:
+        """
+        Neredeyse aynı metinleri bulur.
+        
+        min_shingles'tan kısa metinler hiçbir kümeye katılmaz. Her bant bir
+        hash kovasına düşer; sadece aynı kovaya düşen metinler imza
+        benzerliğiyle doğrulanır, böylece tüm çiftler karşılaştırılmaz.
+        
+        Args:
+            texts: Post metinleri
+        
+        Returns:
+            Tekrar indeksi -> ilk (kanonik) metnin indeksi
+        """
+        matrix, counts = self.signatures(texts)
+        candidates = np.flatnonzero(counts >= max(self.min_shingles, 1)).tolist()
+        
+        # Union-find; kök her zaman kümenin en küçük indeksidir
+        parent = list(range(len(texts)))
+        
+        def find(index: int) -> int:
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+        
+        # Bant satırlarını tek bir 64 bit kovaya indirgeyen katsayılar
+        rng = np.random.default_rng(0)
+        band_weights = rng.integers(0, 2**64, size=self.rows, dtype=np.uint64) | np.uint64(1)
+        
+        for band in range(self.bands):
+            start = band * self.rows
+            # Taşmalar 2^64 modunda sarılır; çakışmalar aşağıda doğrulanır
+            keys = (matrix[:, start:start + self.rows].astype(np.uint64) * band_weights).sum(axis=1).tolist()
+            buckets: Dict[int, int] = {}
+            for index in candidates:
+                first = buckets.setdefault(keys[index], index)
+                if first == index:
+                    continue
+                
+                root, other = find(first), find(index)
+                if root == other:
+                    continue
+                # Kova çakışmasını imza benzerliğiyle doğrula
+                if np.count_nonzero(matrix[first] == matrix[index]) / self.num_perm >= self.threshold:
+                    parent[max(root, other)] = min(root, other)
+        
+        return {
+            index: find(index)
+            for index in range(len(texts))
+            if find(index) != index
+        }
+    
+    def mark_duplicates(self, posts: List[Dict[str, Any]]) -> int:
+        """
+        Tekrar postları işaretler.
+        
+        Postlar alıntılar çıkarılmış metinleriyle karşılaştırılır. Tekrar
+        postlara kanonik postun ID'si 'duplicate_of' olarak, kanonik postlara
+        ise tekrar sayısı 'duplicate_count' olarak yazılır.
+        
+        Args:
+            posts: Post listesi (ilk görülen post kanonik kabul edilir)
+        
+        Returns:
+            İşaretlenen tekrar sayısı
+        """
+        duplicates = self.find_duplicates([reply_text(post) for post in posts])
+        
+        for post in posts:
+            post.pop('duplicate_of', None)
+            post.pop('duplicate_count', None)
+        
+        for index, canonical_index in duplicates.items():
+            canonical = posts[canonical_index]
+            posts[index]['duplicate_of'] = canonical.get('post_id')
+            canonical['duplicate_count'] = canonical.get('duplicate_count', 0) + 1
+        
+        logger.info(f"{len(duplicates)} tekrar post bulundu ({len(posts)} post içinde)")
+        return len(duplicates)
@@ -4,31 +4,414 @@ XenForo Forum Archiver - Downloader Modülü
 Bu modül görseller, videolar ve ek dosyaları indirir.
 """
 
+import hashlib
+import itertools
+import json
+import os
+import queue
+import random
+import shutil
+import tempfile
+import threading
 import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
 from urllib.parse import urlparse
 
 import requests
 from tqdm import tqdm
 
-from src.utils import setup_logger, sanitize_filename, format_file_size
+from src.utils import (
+    setup_logger, sanitize_filename, format_file_size, RateLimiter,
+    canonicalize_media_url, attachment_filename, make_absolute_url
+)
 import config
 
 
 logger = setup_logger(__name__, config.LOG_FILE, config.LOG_LEVEL)
 
 
+class DownloadLimitError(Exception):
+    """Dosya boyut, tür veya disk kotası politikasına takıldığında fırlatılır."""
+
+
+class DeferDownload(Exception):
+    """GET yanıtındaki boyut dosyanın sona bırakılması gerektiğini gösterdiğinde fırlatılır."""
+    
+    def __init__(self, size: int):
+        super().__init__(f"{format_file_size(size)} sona bırakıldı")
+        self.size = size
+
+
+class ByteBudget:
+    """Eşzamanlı indirmelerin bellekte tuttuğu toplam byte miktarını sınırlar."""
+    
+    def __init__(self, limit: int):
+        """
+        Args:
+            limit: Aynı anda bellekte tutulabilecek maksimum byte (0 = sınırsız)
+        """
+        self.limit = limit
+        self.in_use = 0
+        self._condition = threading.Condition()
+    
+    def acquire(self, amount: int) -> int:
+        """
+        Bütçeden byte ayırır, yer açılana kadar bekler.
+        
+        Args:
+            amount: Ayrılmak istenen byte miktarı
+        
+        Returns:
+            Gerçekte ayrılan byte miktarı (release'e verilmeli)
+        """
+        if self.limit <= 0:
+            return 0
+        
+        # Tek bir istek bütçenin tamamından büyükse kilitlenmemek için kırp
+        amount = min(amount, self.limit)
+        with self._condition:
+            while self.in_use + amount > self.limit:
+                self._condition.wait()
+            self.in_use += amount
+        return amount
+    
+    def release(self, amount: int) -> None:
+        """
+        Daha önce ayrılan byte'ları bütçeye geri verir.
+        
+        Args:
+            amount: acquire'ın döndürdüğü byte miktarı
+        """
+        if amount <= 0:
+            return
+        with self._condition:
+            self.in_use -= amount
+            self._condition.notify_all()
+
+
+# Tekrar denenmeye değecek 4xx durumları (zaman aşımı, hız sınırı)
+TRANSIENT_CLIENT_ERRORS = {408, 425, 429}
+# Negatif önbelleğe yazılan kalıcı "dosya yok" durumları
+DEAD_STATUS_CODES = {404, 410}
+
+
+def is_permanent_error(error: Exception) -> bool:
+    """
+    Hatanın tekrar denemeyle düzelmeyecek bir istemci hatası olup olmadığını döndürür.
+    
+    Args:
+        error: İndirme sırasında oluşan hata
+    
+    Returns:
+        4xx (408/425/429 hariç) ise True
+    """
+    response = getattr(error, 'response', None)
+    if not isinstance(error, requests.HTTPError) or response is None:
+        return False
+    return 400 <= response.status_code < 500 and response.status_code not in TRANSIENT_CLIENT_ERRORS
+
+
+def backoff_delay(attempt: int, error: Optional[Exception] = None) -> float:
+    """
+    Jitter'lı üstel bekleme süresini hesaplar.
+    
+    Args:
+        attempt: Sıfırdan başlayan deneme numarası
+        error: Son hata (Retry-After başlığı varsa dikkate alınır)
+    
+    Returns:
+        Saniye cinsinden bekleme süresi
+    """
+    response = getattr(error, 'response', None)
+    retry_after = response.headers.get('retry-after', '') if response is not None else ''
+    if retry_after.isdigit():
+        return min(float(retry_after), config.RETRY_MAX_DELAY)
+    
+    # Full jitter: aynı anda başarısız olan indirmeler aynı anda tekrar denemesin
+    return random.uniform(0, min(config.RETRY_MAX_DELAY, config.RETRY_DELAY * 2 ** attempt))
+
+
+class NegativeCache:
+    """Ölü medya URL'lerini TTL ile diskte saklayan önbellek."""
+    
+    def __init__(self, cache_file: Optional[Path] = None, ttl: int = config.NEGATIVE_CACHE_TTL):
+        """
+        Args:
+            cache_file: JSON önbellek dosyası (None = sadece bellekte)
+            ttl: Kayıtların geçerlilik süresi (saniye)
+        """
+        self.cache_file = cache_file
+        self.ttl = ttl
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+        self.load()
+    
+    def load(self) -> None:
+        """Önbelleği diskten yükler, süresi dolmuş kayıtları atar."""
+        if not self.cache_file or not self.cache_file.exists():
+            return
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Negatif önbellek okunamadı: {e}")
+            return
+        
+        now = time.time()
+        self.entries = {
+            url: entry for url, entry in entries.items()
+            if now - entry.get('time', 0) < self.ttl
+        }
+        if self.entries:
+            logger.info(f"Negatif önbellekte {len(self.entries)} ölü URL var")
+    
+    def save(self) -> None:
+        """Önbelleği diske yazar."""
+        if not self.cache_file:
+            return
+        with self._lock:
+            entries = dict(self.entries)
+        try:
+            tmp_file = self.cache_file.with_name(self.cache_file.name + '.part')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(entries, f)
+            tmp_file.replace(self.cache_file)
+        except OSError as e:
+            logger.warning(f"Negatif önbellek kaydedilemedi: {e}")
+    
+    def is_dead(self, url: str) -> bool:
+        """URL'nin TTL içinde ölü olarak işaretlenip işaretlenmediğini döndürür."""
+        entry = self.entries.get(url)
+        return bool(entry) and time.time() - entry['time'] < self.ttl
+    
+    def mark_dead(self, url: str, status: int) -> None:
+        """
+        URL'yi ölü olarak işaretler.
+        
+        Args:
+            url: Dosya URL'si
+            status: HTTP durum kodu
+        """
+        with self._lock:
+            self.entries[url] = {'status': status, 'time': time.time()}
+
+
+class DownloadManifest:
+    """Önceki çalıştırmalarda indirilen dosyaları iş anahtarına göre diskte saklayan kayıt."""
+    
+    def __init__(self, manifest_file: Optional[Path] = None):
+        """
+        Args:
+            manifest_file: JSON kayıt dosyası (None = sadece bellekte)
+        """
+        self.manifest_file = manifest_file
+        # kind -> (key -> MEDIA_DIR.parent'a göreli yol)
+        self.entries: Dict[str, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+        self.load()
+    
+    def load(self) -> None:
+        """Kaydı diskten yükler."""
+        if not self.manifest_file or not self.manifest_file.exists():
+            return
+        try:
+            with open(self.manifest_file, 'r', encoding='utf-8') as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"İndirme kaydı okunamadı: {e}")
+    
+    def save(self) -> None:
+        """Kaydı diske yazar."""
+        if not self.manifest_file:
+            return
+        with self._lock:
+            entries = {kind: dict(paths) for kind, paths in self.entries.items()}
+        try:
+            tmp_file = self.manifest_file.with_name(self.manifest_file.name + '.part')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(entries, f, ensure_ascii=False)
+            tmp_file.replace(self.manifest_file)
+        except OSError as e:
+            logger.warning(f"İndirme kaydı kaydedilemedi: {e}")
+    
+    def get(self, kind: str, key: str) -> Optional[str]:
+        """Daha önce kaydedilmiş yerel yolu döndürür."""
+        return self.entries.get(kind, {}).get(key)
+    
+    def update(self, kind: str, mapping: Dict[str, str]) -> None:
+        """
+        Anahtarların yerel yollarını kaydeder.
+        
+        WebP dönüştürmesi orijinali sildiğinde yol WebP dosyasıyla
+        güncellenir; böylece sonraki çalıştırma dosyayı tekrar indirmez.
+        
+        Args:
+            kind: Sonuç türü ('images', 'attachments', ...)
+            mapping: key -> local path
+        """
+        with self._lock:
+            self.entries.setdefault(kind, {}).update(mapping)
+
+
+class DownloadPolicy:
+    """Boyut, MIME türü ve disk kotasına göre indirme kararlarını verir."""
+    
+    # Sayfaların erken tamamlanması için görünür medya eklerden önce gelir
+    KIND_PRIORITY = {'youtube_thumbnails': 0, 'images': 0, 'attachments': 1}
+    
+    def __init__(
+        self,
+        max_file_bytes: int = config.MAX_DOWNLOAD_BYTES,
+        defer_bytes: int = config.DEFER_DOWNLOAD_BYTES,
+        allowed_types: Optional[List[str]] = None,
+        disk_quota: int = config.MEDIA_DISK_QUOTA,
+        min_free_bytes: int = config.MIN_FREE_DISK_BYTES
+    ):
+        """
+        Args:
+            max_file_bytes: Dosya başına maksimum boyut, üstü atlanır (0 = sınırsız)
+            defer_bytes: Bu boyutun üstündeki dosyalar sona bırakılır (0 = ertelenmez)
+            allowed_types: İzin verilen MIME önekleri, örn. ['image/', 'application/pdf'] (boş = tümü)
+            disk_quota: Bu çalıştırmada yazılabilecek toplam byte (0 = sınırsız)
+            min_free_bytes: Diskte bırakılacak minimum boş alan
+        """
+        self.max_file_bytes = max_file_bytes
+        self.defer_bytes = defer_bytes
+        self.allowed_types = [t.lower() for t in (allowed_types if allowed_types is not None else config.ALLOWED_MEDIA_TYPES)]
+        self.disk_quota = disk_quota
+        self.min_free_bytes = min_free_bytes
+        
+        self.used_bytes = 0
+        self._lock = threading.Lock()
+    
+    def check(self, size: Optional[int], content_type: Optional[str]) -> None:
+        """
+        Dosyanın indirilip indirilemeyeceğini kontrol eder.
+        
+        Args:
+            size: Dosya boyutu (bilinmiyorsa None)
+            content_type: Content-Type başlığı (bilinmiyorsa None)
+        
+        Raises:
+            DownloadLimitError: Dosya politikaya uymuyorsa
+        """
+        if content_type and self.allowed_types:
+            mime = content_type.split(';')[0].strip().lower()
+            if not any(mime.startswith(allowed) for allowed in self.allowed_types):
+                raise DownloadLimitError(f"İzin verilmeyen tür: {mime}")
+        
+        if size and self.max_file_bytes and size > self.max_file_bytes:
+            raise DownloadLimitError(
+                f"{format_file_size(size)} > {format_file_size(self.max_file_bytes)}"
+            )
+        
+        if self.disk_quota and self.used_bytes + (size or 0) > self.disk_quota:
+            raise DownloadLimitError(f"Disk kotası aşılıyor ({format_file_size(self.disk_quota)})")
+    
+    def check_disk(self, directory: Path) -> None:
+        """
+        Hedef diskte yeterli boş alan olup olmadığını kontrol eder.
+        
+        Args:
+            directory: Dosyanın yazılacağı dizin
+        
+        Raises:
+            DownloadLimitError: Boş alan min_free_bytes altındaysa
+        """
+        if self.min_free_bytes and shutil.disk_usage(directory).free < self.min_free_bytes:
+            raise DownloadLimitError(f"Diskte {format_file_size(self.min_free_bytes)} boş alan kalmadı")
+    
+    def consume(self, amount: int) -> None:
+        """
+        Yazılan byte'ları kotadan düşer.
+        
+        Args:
+            amount: Yazılan byte miktarı
+        
+        Raises:
+            DownloadLimitError: Kota aşılırsa
+        """
+        with self._lock:
+            if self.disk_quota and self.used_bytes + amount > self.disk_quota:
+                raise DownloadLimitError(f"Disk kotası aşıldı ({format_file_size(self.disk_quota)})")
+            self.used_bytes += amount
+    
+    def refund(self, amount: int) -> None:
+        """
+        Yarıda kalan indirmenin byte'larını kotaya geri verir.
+        
+        Args:
+            amount: Geri verilecek byte miktarı
+        """
+        with self._lock:
+            self.used_bytes -= amount
+    
+    def should_defer(self, size: Optional[int]) -> bool:
+        """Dosyanın büyüklüğü nedeniyle sona bırakılıp bırakılmayacağını döndürür."""
+        return bool(size and self.defer_bytes and size > self.defer_bytes)
+    
+    def sort_key(self, job: Dict[str, Any]) -> tuple:
+        """
+        İndirme sırası anahtarı: ertelenmeyenler, görünür medya ve küçük dosyalar önce.
+        
+        Args:
+            job: İndirme işi (kind, size alanları)
+        
+        Returns:
+            Sıralama anahtarı
+        """
+        size = job.get('size')
+        return (
+            self.should_defer(size),
+            self.KIND_PRIORITY.get(job['kind'], 1),
+            size if size is not None else float('inf')
+        )
+
+
 class MediaDownloader:
     """Medya dosyaları indirme sınıfı"""
     
-    def __init__(self, session: requests.Session, output_dir: Path):
+    def __init__(
+        self,
+        session: requests.Session,
+        output_dir: Path,
+        chunk_size: int = config.DOWNLOAD_CHUNK_SIZE,
+        byte_budget: Optional[ByteBudget] = None,
+        policy: Optional[DownloadPolicy] = None,
+        head_precheck: bool = config.HEAD_PRECHECK,
+        rate_limiter: Optional[RateLimiter] = None,
+        workers: int = config.DOWNLOAD_WORKERS,
+        negative_cache: Optional[NegativeCache] = None,
+        manifest: Optional[DownloadManifest] = None,
+        base_url: str = config.FORUM_URL
+    ):
         """
         Args:
             session: Requests session
             output_dir: İndirilen dosyaların kaydedileceği dizin
+            chunk_size: Stream okuma parça boyutu (byte)
+            byte_budget: Tüm indirmeler arasında paylaşılan bellek bütçesi
+            policy: Boyut/tür/kota politikası
+            head_precheck: Toplu indirmede kuyruk sıralaması ve erteleme için önce HEAD
+                ile boyut ve tür öğrenilsin mi (kuyruk modunda HEAD yapılmaz)
+            rate_limiter: Scraper ile paylaşılan hız sınırlayıcı
+            workers: Eşzamanlı indirme thread sayısı
+            negative_cache: Ölü URL önbelleği (varsayılan: config.NEGATIVE_CACHE_FILE)
+            manifest: Önceki indirmelerin kaydı (varsayılan: config.DOWNLOAD_MANIFEST_FILE)
+            base_url: Göreceli medya URL'leri için forum ana URL'si
         """
         self.session = session
+        self.chunk_size = chunk_size
+        self.byte_budget = byte_budget or ByteBudget(config.MAX_INFLIGHT_BYTES)
+        self.policy = policy or DownloadPolicy()
+        self.head_precheck = head_precheck
+        self.rate_limiter = rate_limiter or RateLimiter(0)
+        self.workers = max(1, workers)
+        self.negative_cache = negative_cache or NegativeCache(config.NEGATIVE_CACHE_FILE)
+        self.manifest = manifest or DownloadManifest(config.DOWNLOAD_MANIFEST_FILE)
+        self.base_url = base_url
         self.output_dir = output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
         
@@ -41,6 +424,22 @@ class MediaDownloader:
         self.thumbnails_dir.mkdir(parents=True, exist_ok=True)
         
         self.downloaded_files: Dict[str, str] = {}
+        # URL -> {'sha256': ..., 'size': ...}
+        self.file_info: Dict[str, Dict[str, Any]] = {}
+        
+        # Paralel indirmelerde aynı dosya adının iki kez seçilmemesi için
+        self._path_lock = threading.Lock()
+        self._reserved_paths: set = set()
+        
+        # İndirme kuyruğu (start_pipeline ile başlatılır)
+        self._queue: Optional[queue.PriorityQueue] = None
+        self._threads: List[threading.Thread] = []
+        self._results: Dict[str, Dict[str, str]] = {}
+        self._results_lock = threading.Lock()
+        self._seen_jobs: set = set()
+        self._sequence = itertools.count()
+        self._pipeline_stats: Dict[str, int] = {}
+        self._pbar: Optional[tqdm] = None
     
     def _get_filename_from_url(self, url: str) -> str:
         """
@@ -58,11 +457,41 @@ class MediaDownloader:
             filename = f"file_{hash(url)}"
         return sanitize_filename(filename)
     
+    def _unique_output_path(self, url: str, directory: Path, filename: Optional[str] = None) -> Path:
+        """
+        URL için hedef dizinde çakışmayan bir dosya yolu seçer.
+        
+        Args:
+            url: Dosya URL'si
+            directory: Hedef dizin
+            filename: Tercih edilen dosya adı (yoksa URL'den çıkarılır)
+        
+        Returns:
+            Dosya yolu
+        """
+        filename = sanitize_filename(filename) if filename else self._get_filename_from_url(url)
+        output_path = directory / filename
+        
+        with self._path_lock:
+            # Aynı isimde dosya varsa (veya başka bir thread ayırdıysa) numara ekle
+            counter = 1
+            while (output_path.exists() or output_path in self._reserved_paths) and url not in self.downloaded_files:
+                name_parts = filename.rsplit('.', 1)
+                if len(name_parts) == 2:
+                    output_path = directory / f"{name_parts[0]}_{counter}.{name_parts[1]}"
+                else:
+                    output_path = directory / f"{filename}_{counter}"
+                counter += 1
+            self._reserved_paths.add(output_path)
+        
+        return output_path
+    
     def _download_file(
         self,
         url: str,
         output_path: Path,
-        max_retries: int = config.MAX_RETRIES
+        max_retries: int = config.MAX_RETRIES,
+        defer: bool = False
     ) -> Optional[Path]:
         """
         Tek bir dosyayı indirir.
@@ -71,87 +500,449 @@ class MediaDownloader:
             url: Dosya URL'si
             output_path: Kaydedilecek dosya yolu
             max_retries: Maksimum deneme sayısı
+            defer: Content-Length defer_bytes'ı aşarsa indirmeden vazgeç
         
         Returns:
             İndirilen dosya yolu veya None
+        
+        Raises:
+            DeferDownload: defer açıkken dosya büyük çıkarsa
         """
         # Daha önce indirilmiş mi kontrol et
         if url in self.downloaded_files:
             return Path(self.downloaded_files[url])
         
+        # Daha önce kalıcı olarak bulunamadıysa hiç deneme
+        if self.negative_cache.is_dead(url):
+            logger.debug(f"Negatif önbellekte, atlandı: {url}")
+            return None
+        
         for attempt in range(max_retries):
             try:
-                response = self.session.get(url, timeout=config.REQUEST_TIMEOUT, stream=True)
-                response.raise_for_status()
-                
-                # Dosya boyutunu al
-                total_size = int(response.headers.get('content-length', 0))
-                
-                # Dosyayı indir
-                with open(output_path, 'wb') as f:
-                    if total_size == 0:
-                        f.write(response.content)
-                    else:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            if chunk:
-                                f.write(chunk)
-                
-                logger.debug(f"İndirildi: {output_path.name} ({format_file_size(output_path.stat().st_size)})")
+                result = self._stream_to_file(url, output_path, defer)
+                logger.debug(f"İndirildi: {output_path.name} ({format_file_size(result['size'])})")
                 self.downloaded_files[url] = str(output_path)
+                self.file_info[url] = result
                 return output_path
-                
+            
+            except DeferDownload:
+                raise
+            
+            except DownloadLimitError as e:
+                # Politika ihlali kalıcıdır, tekrar denemenin anlamı yok
+                logger.warning(f"Dosya atlandı: {url} - {e}")
+                return None
+            
             except Exception as e:
+                if is_permanent_error(e):
+                    status = e.response.status_code
+                    if status in DEAD_STATUS_CODES:
+                        self.negative_cache.mark_dead(url, status)
+                    logger.warning(f"Dosya indirilemedi (HTTP {status}, tekrar denenmeyecek): {url}")
+                    return None
+                
                 logger.warning(f"İndirme denemesi {attempt + 1}/{max_retries} başarısız: {url} - {e}")
                 if attempt < max_retries - 1:
-                    time.sleep(config.RETRY_DELAY)
+                    time.sleep(backoff_delay(attempt, e))
                 else:
                     logger.error(f"Dosya indirilemedi: {url}")
                     return None
     
-    def download_images(self, posts_data: List[Dict[str, Any]]) -> Dict[str, str]:
+    def _stream_to_file(self, url: str, output_path: Path, defer: bool = False) -> Dict[str, Any]:
         """
-        Tüm görselleri indirir.
+        Yanıtı parça parça geçici dosyaya yazar, ardından atomik olarak taşır.
+        
+        Content-Length başlığı olsun ya da olmasın yanıt hiçbir zaman
+        tamamen belleğe alınmaz; hash ve boyut akış sırasında hesaplanır.
         
         Args:
-            posts_data: Post verisi listesi
+            url: Dosya URL'si
+            output_path: Kaydedilecek dosya yolu
+            defer: Content-Length defer_bytes'ı aşarsa gövde okunmadan vazgeç
         
         Returns:
-            URL -> local path mapping
+            {'sha256': hex digest, 'size': byte sayısı}
+        
+        Raises:
+            DeferDownload: defer açıkken dosya büyük çıkarsa
         """
-        logger.info("Görseller indiriliyor...")
+        self.rate_limiter.wait()
+        with self.session.get(url, timeout=config.REQUEST_TIMEOUT, stream=True) as response:
+            response.raise_for_status()
+            
+            # HEAD yapılmadıysa ilk yanıt başlıkları aynı kontrolü sağlar
+            declared_size = int(response.headers.get('content-length') or 0)
+            self.policy.check(declared_size or None, response.headers.get('content-type'))
+            if defer and self.policy.should_defer(declared_size):
+                # Yanıt gövdesi okunmadan kapatılır; iş kuyruğun sonuna taşınır
+                raise DeferDownload(declared_size)
+            self.policy.check_disk(output_path.parent)
+            
+            max_file_bytes = self.policy.max_file_bytes
+            sha256 = hashlib.sha256()
+            size = 0
+            consumed = 0
+            fd, tmp_name = tempfile.mkstemp(
+                dir=output_path.parent, prefix=f".{output_path.name}.", suffix='.part'
+            )
+            tmp_path = Path(tmp_name)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    chunks = response.iter_content(chunk_size=self.chunk_size)
+                    while True:
+                        reserved = self.byte_budget.acquire(self.chunk_size)
+                        try:
+                            chunk = next(chunks, None)
+                            if chunk is None:
+                                break
+                            if not chunk:
+                                continue
+                            size += len(chunk)
+                            if max_file_bytes and size > max_file_bytes:
+                                raise DownloadLimitError(
+                                    f"{format_file_size(size)} > {format_file_size(max_file_bytes)}"
+                                )
+                            self.policy.consume(len(chunk))
+                            consumed += len(chunk)
+                            sha256.update(chunk)
+                            f.write(chunk)
+                        finally:
+                            self.byte_budget.release(reserved)
+                
+                os.replace(tmp_path, output_path)
+            except BaseException:
+                tmp_path.unlink(missing_ok=True)
+                self.policy.refund(consumed)
+                raise
+        
+        return {'sha256': sha256.hexdigest(), 'size': size}
+    
+    def _existing_path(self, job: Dict[str, Any]) -> Optional[str]:
+        """
+        Önceki çalıştırmada indirilen (veya WebP'ye dönüştürülen) dosya hâlâ duruyorsa yolunu döndürür.
+        
+        Args:
+            job: İndirme işi
+        
+        Returns:
+            MEDIA_DIR.parent'a göreli yol veya None
+        """
+        existing = self.manifest.get(job['kind'], job['key'])
+        if existing and (self.output_dir.parent / existing).exists():
+            return existing
+        return None
+    
+    def _probe(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        HEAD isteği ile dosyanın boyutunu ve türünü öğrenir.
+        
+        Args:
+            job: İndirme işi
+        
+        Returns:
+            size ve content_type alanları doldurulmuş iş
+        """
+        if self.negative_cache.is_dead(job['url']) or self._existing_path(job):
+            return job
+        
+        try:
+            self.rate_limiter.wait()
+            response = self.session.head(job['url'], timeout=config.REQUEST_TIMEOUT, allow_redirects=True)
+            if response.ok:
+                length = response.headers.get('content-length', '')
+                job['size'] = int(length) if length.isdigit() else None
+                job['content_type'] = response.headers.get('content-type')
+        except requests.RequestException as e:
+            logger.debug(f"HEAD başarısız: {job['url']} - {e}")
+        return job
+    
+    def start_pipeline(self, desc: str = "Medya") -> None:
+        """
+        İndirme thread'lerini başlatır; işler submit/submit_post ile eklenir.
+        
+        Kuyruk önceliklidir: görünür medya ve boyutu bilinen küçük dosyalar
+        önce, büyük dosyalar kuyruk boşaldığında indirilir.
+        
+        Args:
+            desc: İlerleme çubuğu başlığı
+        """
+        self._queue = queue.PriorityQueue()
+        self._results = {'images': {}, 'attachments': {}, 'youtube_thumbnails': {}}
+        self._seen_jobs = set()
+        self._pipeline_stats = {'skipped': 0, 'deferred': 0, 'reused': 0}
+        self._pbar = tqdm(total=0, desc=desc, unit="dosya")
+        
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"downloader-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def submit(self, job: Dict[str, Any]) -> None:
+        """
+        İndirme kuyruğuna bir iş ekler (aynı iş ikinci kez eklenmez).
+        
+        Args:
+            job: İndirme işi (kind, key, url, directory veya output_path)
+        """
+        job_id = (job['kind'], job['key'])
+        if job_id in self._seen_jobs:
+            return
+        self._seen_jobs.add(job_id)
+        
+        self._pbar.total += 1
+        self._pbar.refresh()
+        self._queue.put((self.policy.sort_key(job), next(self._sequence), job))
+    
+    def submit_post(self, post: Dict[str, Any]) -> None:
+        """
+        Bir postun tüm medyasını indirme kuyruğuna ekler.
+        
+        Scraper'ın on_post callback'i olarak kullanılır.
+        
+        Args:
+            post: Post verisi
+        """
+        posts = [post]
+        for job in self._image_jobs(posts) + self._attachment_jobs(posts) + self._youtube_jobs(posts):
+            self.submit(job)
+    
+    def finish_pipeline(self) -> Dict[str, Dict[str, str]]:
+        """
+        Kuyruktaki tüm işlerin bitmesini bekler ve thread'leri durdurur.
+        
+        Returns:
+            kind -> (key -> local path) mapping
+        """
+        self._queue.join()
+        
+        # Durdurma işaretleri her zaman gerçek işlerden sonra gelir
+        for _ in self._threads:
+            self._queue.put(((2, 0, 0), next(self._sequence), None))
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+        self._pbar.close()
+        self.negative_cache.save()
+        for kind, mapping in self._results.items():
+            self.manifest.update(kind, mapping)
+        self.manifest.save()
+        
+        stats = self._pipeline_stats
+        if stats['reused']:
+            logger.info(f"{stats['reused']} dosya önceki çalıştırmadan kullanıldı")
+        if stats['skipped'] or stats['deferred']:
+            logger.info(f"{stats['skipped']} dosya politika nedeniyle atlandı, {stats['deferred']} büyük dosya sona bırakıldı")
+        
+        return self._results
+    
+    def _worker(self) -> None:
+        """Kuyruktan iş alıp indiren thread döngüsü."""
+        while True:
+            _, _, job = self._queue.get()
+            try:
+                if job is None:
+                    return
+                self._process_job(job)
+            except Exception as e:
+                logger.error(f"İndirme işi başarısız: {job['url']} - {e}")
+            finally:
+                self._queue.task_done()
+    
+    def _process_job(self, job: Dict[str, Any]) -> None:
+        """
+        Tek bir işi politikaya göre atlar, erteler veya indirir.
+        
+        Args:
+            job: İndirme işi
+        """
+        # Önceki çalıştırmadan kalan dosya tekrar indirilmez
+        existing = self._existing_path(job)
+        if existing:
+            with self._results_lock:
+                self._results[job['kind']][job['key']] = existing
+                self._pipeline_stats['reused'] += 1
+            self._pbar.update(1)
+            return
+        
+        # HEAD sadece toplu indirmede (_run_jobs) yapılır; kuyruk modunda aynı
+        # kontrolü GET yanıtının başlıkları sağlar, ayrı bir istek hız sınırını yarıya indirir
+        try:
+            self.policy.check(job.get('size'), job.get('content_type'))
+        except DownloadLimitError as e:
+            logger.info(f"Dosya atlandı: {job['url']} - {e}")
+            with self._results_lock:
+                self._pipeline_stats['skipped'] += 1
+            self._pbar.update(1)
+            return
+        
+        # Boyut HEAD ile biliniyorsa istek atmadan sona bırak
+        if self.policy.should_defer(job.get('size')) and not job.get('deferred'):
+            self._defer(job)
+            return
+        
+        output_path = job.get('output_path') or self._unique_output_path(
+            job['url'], job['directory'], job.get('filename')
+        )
+        
+        # Ana URL ölüyse sıradaki alternatif denenir (örn. YouTube thumbnail boyutları)
+        result = None
+        try:
+            for url in [job['url']] + job.get('fallback_urls', []):
+                result = self._download_file(url, output_path, defer=not job.get('deferred'))
+                if result:
+                    break
+        except DeferDownload as e:
+            # Boyut ancak GET yanıtında öğrenildi; ayrılan yol tekrar kullanılır
+            job['size'] = e.size
+            job['output_path'] = output_path
+            self._defer(job)
+            return
+        if result:
+            with self._results_lock:
+                self._results[job['kind']][job['key']] = str(result.relative_to(self.output_dir.parent))
+        
+        self._pbar.update(1)
+    
+    def _defer(self, job: Dict[str, Any]) -> None:
+        """
+        Büyük dosyayı kuyruğun sonuna (daha küçük işler bittikten sonra) taşır.
+        
+        Args:
+            job: Boyutu defer_bytes'ı aşan indirme işi
+        """
+        job['deferred'] = True
+        with self._results_lock:
+            self._pipeline_stats['deferred'] += 1
+        self._queue.put((self.policy.sort_key(job), next(self._sequence), job))
+    
+    def _run_jobs(self, jobs: List[Dict[str, Any]], desc: str) -> Dict[str, Dict[str, str]]:
+        """
+        Bilinen bir iş listesini öncelik sırasıyla paralel indirir.
+        
+        Args:
+            jobs: İndirme işleri
+            desc: İlerleme çubuğu başlığı
+        
+        Returns:
+            kind -> (key -> local path) mapping
+        """
+        # Boyutlar önceden bilinirse kuyruk baştan doğru sıralanır
+        if self.head_precheck and jobs:
+            with ThreadPoolExecutor(max_workers=config.HEAD_WORKERS) as executor:
+                jobs = list(executor.map(self._probe, jobs))
         
-        # Tüm görsel URL'lerini topla
-        image_urls = set()
+        # Thread'ler ilk işi hemen aldığı için işler öncelik sırasıyla eklenir
+        self.start_pipeline(desc)
+        for job in sorted(jobs, key=self.policy.sort_key):
+            self.submit(job)
+        return self.finish_pipeline()
+    
+    def _media_jobs(
+        self,
+        kind: str,
+        directory: Path,
+        entries: List[Tuple[str, Optional[str]]]
+    ) -> List[Dict[str, Any]]:
+        """
+        (URL, dosya adı) çiftlerinden kanonik URL başına tek bir indirme işi oluşturur.
+        
+        Kanonik URL sadece iş ve mapping anahtarıdır; dosya, görülen ilk
+        orijinal URL'den indirilir (proxy.php veya ?hash= gibi parametreler
+        sunucunun dosyayı vermesi için gerekebilir).
+        
+        Args:
+            kind: Sonuç türü ('images' veya 'attachments')
+            directory: Hedef dizin
+            entries: Orijinal URL ve bilinen dosya adı çiftleri
+        
+        Returns:
+            İndirme işleri
+        """
+        jobs: Dict[str, Dict[str, Any]] = {}
+        for url, filename in entries:
+            canonical = canonicalize_media_url(url, self.base_url)
+            job = jobs.setdefault(canonical, {
+                'kind': kind,
+                'key': canonical,
+                'url': make_absolute_url(self.base_url, url.strip()),
+                'filename': None,
+                'directory': directory
+            })
+            if not job['filename']:
+                job['filename'] = filename
+        
+        for canonical, job in jobs.items():
+            # Proxy URL'lerinin adı 'proxy.php' olacağından ad kanonik URL'den çıkarılır
+            job['filename'] = job['filename'] or self._get_filename_from_url(canonical)
+        return list(jobs.values())
+    
+    def _image_jobs(self, posts_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Postlardaki görseller için indirme işlerini oluşturur."""
+        entries = []
         for post in posts_data:
             for img in post.get('images', []):
                 url = img.get('data_src') or img.get('src')
                 if url:
-                    image_urls.add(url)
+                    entries.append((url, attachment_filename(url)))
+        return self._media_jobs('images', self.images_dir, entries)
+    
+    def _attachment_jobs(self, posts_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Postlardaki ek dosyalar için indirme işlerini oluşturur."""
+        entries = []
+        for post in posts_data:
+            for att in post.get('attachments', []):
+                url = att.get('url')
+                if url:
+                    entries.append((url, att.get('filename') or attachment_filename(url)))
+        return self._media_jobs('attachments', self.attachments_dir, entries)
+    
+    def _youtube_jobs(self, posts_data: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Postlardaki YouTube videolarının thumbnail'ları için indirme işlerini oluşturur."""
+        from src.utils import extract_youtube_id
         
-        logger.info(f"Toplam {len(image_urls)} görsel bulundu")
+        # YouTube video ID'lerini topla
+        video_ids = set()
+        for post in posts_data:
+            for video in post.get('videos', []):
+                if video.get('type') == 'youtube':
+                    video_id = extract_youtube_id(video.get('src', ''))
+                    if video_id:
+                        video_ids.add(video_id)
         
-        # İndir
-        image_mapping = {}
-        with tqdm(total=len(image_urls), desc="Görseller", unit="dosya") as pbar:
-            for url in image_urls:
-                filename = self._get_filename_from_url(url)
-                output_path = self.images_dir / filename
-                
-                # Aynı isimde dosya varsa numara ekle
-                counter = 1
-                while output_path.exists() and url not in self.downloaded_files:
-                    name_parts = filename.rsplit('.', 1)
-                    if len(name_parts) == 2:
-                        output_path = self.images_dir / f"{name_parts[0]}_{counter}.{name_parts[1]}"
-                    else:
-                        output_path = self.images_dir / f"{filename}_{counter}"
-                    counter += 1
-                
-                result = self._download_file(url, output_path)
-                if result:
-                    image_mapping[url] = str(output_path.relative_to(self.output_dir.parent))
-                
-                pbar.update(1)
+        # YouTube thumbnail URL formatı; maxres her video için üretilmediğinden
+        # sırayla daha küçük boyutlara düşülür
+        return [
+            {
+                'kind': 'youtube_thumbnails',
+                'key': video_id,
+                'url': f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg",
+                'fallback_urls': [
+                    f"https://img.youtube.com/vi/{video_id}/sddefault.jpg",
+                    f"https://img.youtube.com/vi/{video_id}/hqdefault.jpg"
+                ],
+                'output_path': self.thumbnails_dir / f"youtube_{video_id}.jpg"
+            }
+            for video_id in video_ids
+        ]
+    
+    def download_images(self, posts_data: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        Tüm görselleri indirir.
+        
+        Args:
+            posts_data: Post verisi listesi
+        
+        Returns:
+            URL -> local path mapping
+        """
+        logger.info("Görseller indiriliyor...")
+        
+        jobs = self._image_jobs(posts_data)
+        logger.info(f"Toplam {len(jobs)} görsel bulundu")
+        
+        image_mapping = self._run_jobs(jobs, "Görseller").get('images', {})
         
         logger.info(f"{len(image_mapping)} görsel başarıyla indirildi")
         return image_mapping
@@ -168,38 +959,10 @@ class MediaDownloader:
         """
         logger.info("Ek dosyalar indiriliyor...")
         
-        # Tüm ek dosya URL'lerini topla
-        attachment_urls = set()
-        for post in posts_data:
-            for att in post.get('attachments', []):
-                url = att.get('url')
-                if url:
-                    attachment_urls.add(url)
-        
-        logger.info(f"Toplam {len(attachment_urls)} ek dosya bulundu")
+        jobs = self._attachment_jobs(posts_data)
+        logger.info(f"Toplam {len(jobs)} ek dosya bulundu")
         
-        # İndir
-        attachment_mapping = {}
-        with tqdm(total=len(attachment_urls), desc="Ek dosyalar", unit="dosya") as pbar:
-            for url in attachment_urls:
-                filename = self._get_filename_from_url(url)
-                output_path = self.attachments_dir / filename
-                
-                # Aynı isimde dosya varsa numara ekle
-                counter = 1
-                while output_path.exists() and url not in self.downloaded_files:
-                    name_parts = filename.rsplit('.', 1)
-                    if len(name_parts) == 2:
-                        output_path = self.attachments_dir / f"{name_parts[0]}_{counter}.{name_parts[1]}"
-                    else:
-                        output_path = self.attachments_dir / f"{filename}_{counter}"
-                    counter += 1
-                
-                result = self._download_file(url, output_path)
-                if result:
-                    attachment_mapping[url] = str(output_path.relative_to(self.output_dir.parent))
-                
-                pbar.update(1)
+        attachment_mapping = self._run_jobs(jobs, "Ek dosyalar").get('attachments', {})
         
         logger.info(f"{len(attachment_mapping)} ek dosya başarıyla indirildi")
         return attachment_mapping
@@ -216,40 +979,20 @@ class MediaDownloader:
         """
         logger.info("YouTube thumbnail'ları indiriliyor...")
         
-        from src.utils import extract_youtube_id
+        jobs = self._youtube_jobs(posts_data)
+        logger.info(f"Toplam {len(jobs)} YouTube videosu bulundu")
         
-        # YouTube video ID'lerini topla
-        video_ids = set()
-        for post in posts_data:
-            for video in post.get('videos', []):
-                if video.get('type') == 'youtube':
-                    video_id = extract_youtube_id(video.get('src', ''))
-                    if video_id:
-                        video_ids.add(video_id)
-        
-        logger.info(f"Toplam {len(video_ids)} YouTube videosu bulundu")
-        
-        # Thumbnail'ları indir
-        thumbnail_mapping = {}
-        with tqdm(total=len(video_ids), desc="YouTube thumbnails", unit="dosya") as pbar:
-            for video_id in video_ids:
-                # YouTube thumbnail URL formatı
-                thumbnail_url = f"https://img.youtube.com/vi/{video_id}/maxresdefault.jpg"
-                filename = f"youtube_{video_id}.jpg"
-                output_path = self.thumbnails_dir / filename
-                
-                result = self._download_file(thumbnail_url, output_path)
-                if result:
-                    thumbnail_mapping[video_id] = str(output_path.relative_to(self.output_dir.parent))
-                
-                pbar.update(1)
+        thumbnail_mapping = self._run_jobs(jobs, "YouTube thumbnails").get('youtube_thumbnails', {})
         
         logger.info(f"{len(thumbnail_mapping)} YouTube thumbnail başarıyla indirildi")
         return thumbnail_mapping
     
     def download_all_media(self, posts_data: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
-        Tüm medya dosyalarını indirir.
+        Tüm medya dosyalarını tek bir öncelik sırasıyla indirir.
+        
+        Görseller ve küçük dosyalar önce, büyük ekler en sona kalır; böylece
+        sayfalar erkenden eksiksiz hale gelir.
         
         Args:
             posts_data: Post verisi listesi
@@ -257,10 +1000,20 @@ class MediaDownloader:
         Returns:
             Tüm mapping'leri içeren dictionary
         """
+        logger.info("Medya dosyaları indiriliyor...")
+        
+        jobs = (
+            self._image_jobs(posts_data) +
+            self._attachment_jobs(posts_data) +
+            self._youtube_jobs(posts_data)
+        )
+        logger.info(f"Toplam {len(jobs)} medya dosyası bulundu")
+        
+        results = self._run_jobs(jobs, "Medya")
         mappings = {
-            'images': self.download_images(posts_data),
-            'attachments': self.download_attachments(posts_data),
-            'youtube_thumbnails': self.download_youtube_thumbnails(posts_data)
+            'images': results.get('images', {}),
+            'attachments': results.get('attachments', {}),
+            'youtube_thumbnails': results.get('youtube_thumbnails', {})
         }
         
         total_downloaded = (
@@ -270,4 +1023,6 @@ class MediaDownloader:
         )
         
         logger.info(f"Toplam {total_downloaded} medya dosyası indirildi")
+        if self.policy.used_bytes:
+            logger.info(f"Bu çalıştırmada yazılan: {format_file_size(self.policy.used_bytes)}")
         return mappings
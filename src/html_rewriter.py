@@ -0,0 +1,195 @@
+"""
+XenForo Forum Archiver - İçerik Medya URL'si Yeniden Yazma Modülü
+
+Bu modül post içeriğindeki (content_html) görsel ve ek dosya
+bağlantılarını indirilen yerel kopyalara yönlendirir; böylece arşiv
+sayfaları forum sunucusuna istek atmaz ve forum kapansa da çalışır.
+"""
+
+import html
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+import lxml.html
+
+from src.utils import setup_logger, canonicalize_media_url
+import config
+
+
+logger = setup_logger(__name__, config.LOG_FILE, config.LOG_LEVEL)
+
+
+# Yerel yolların önüne konan işaret; sayfa derinliğine göre media_root()
+# ile '' veya '../' olur. Böylece her post bir kez yeniden yazılır.
+# lxml URL niteliklerinde ASCII dışı karakterleri %-kodladığı için işaret
+# sadece kodlanmayan karakterlerden oluşur.
+MEDIA_ROOT = '@@MEDIA_ROOT@@/'
+
+# Yeniden yazan işçi sürecin nesnesi (_init_worker ile kurulur)
+_worker_rewriter: Optional['ContentMediaRewriter'] = None
+
+
+def media_root(content_html: Optional[str], prefix: str = '') -> str:
+    """
+    Yeniden yazılmış içerikteki yerel yolları sayfanın konumuna göre tamamlar.
+    
+    Args:
+        content_html: ContentMediaRewriter çıktısı
+        prefix: Sayfadan site köküne göreli yol (ör. '../')
+    
+    Returns:
+        Sayfaya yazılacak HTML
+    """
+    return (content_html or '').replace(MEDIA_ROOT, prefix)
+
+
+def _init_worker(media_mappings: Dict[str, Any], base_url: str) -> None:
+    """Her işçi süreçte URL tablolarını bir kez kurar."""
+    global _worker_rewriter
+    _worker_rewriter = ContentMediaRewriter(media_mappings, base_url)
+
+
+def _rewrite_chunk(contents: List[str]) -> List[str]:
+    """Bir grup post içeriğini işçi süreçte yeniden yazar."""
+    return [_worker_rewriter.rewrite(content) for content in contents]
+
+
+class ContentMediaRewriter:
+    """content_html içindeki medya URL'lerini yerel yollarla değiştiren sınıf."""
+    
+    def __init__(self, media_mappings: Dict[str, Any], base_url: str = ''):
+        """
+        Args:
+            media_mappings: Medya dosyası mapping'leri (kanonik URL -> yerel yol)
+            base_url: Göreceli URL'ler için ana URL
+        """
+        self.media_mappings = media_mappings
+        self.base_url = base_url
+        self.images = media_mappings.get('images', {})
+        self.attachments = media_mappings.get('attachments', {})
+        self.derivatives = media_mappings.get('derivatives', {})
+        # Orijinal içerik -> yeniden yazılmış içerik
+        self.cache: Dict[str, str] = {}
+    
+    def _canonical(self, url: Optional[str]) -> str:
+        """URL'yi mapping anahtarı biçimine getirir (data: URI'ler atlanır)."""
+        if not url or url.startswith('data:'):
+            return ''
+        return canonicalize_media_url(url, self.base_url)
+    
+    def _rewrite_image(self, img: Any) -> bool:
+        """<img> etiketini yerel kopyaya yönlendirir; değişiklik yaptıysa True döndürür."""
+        changed = False
+        if img.get('loading') != 'lazy':
+            img.set('loading', 'lazy')
+            changed = True
+        
+        # Lazy-load eden XenForo görsellerinde asıl URL data-src'dedir
+        original_url = self._canonical(img.get('data-src')) or self._canonical(img.get('src'))
+        local_path = self.images.get(original_url)
+        if not local_path:
+            return changed
+        
+        img.set('src', MEDIA_ROOT + local_path)
+        for attribute in ('data-src', 'srcset', 'data-srcset'):
+            img.attrib.pop(attribute, None)
+        
+        derivatives = self.derivatives.get(original_url)
+        if derivatives and not img.get('width') and not img.get('height'):
+            img.set('width', str(derivatives['width']))
+            img.set('height', str(derivatives['height']))
+        return True
+    
+    def _rewrite_link(self, link: Any) -> bool:
+        """Ek dosya veya tam boy görsel bağlantısını yerel kopyaya yönlendirir."""
+        original_url = self._canonical(link.get('href'))
+        local_path = self.attachments.get(original_url) or self.images.get(original_url)
+        if not local_path:
+            return False
+        link.set('href', MEDIA_ROOT + local_path)
+        return True
+    
+    def _rewrite(self, content_html: str) -> str:
+        """
+        İçeriği lxml ile ayrıştırıp medya URL'lerini yeniden yazar.
+        
+        Args:
+            content_html: Post içeriği
+        
+        Returns:
+            Yeniden yazılmış içerik (değişiklik yoksa orijinal string)
+        """
+        # İçerikte işaret karakteri varsa yerel yol sanılmasın
+        if MEDIA_ROOT in content_html:
+            content_html = content_html.replace(MEDIA_ROOT, '')
+        if '<img' not in content_html and '<a' not in content_html:
+            return content_html
+        
+        try:
+            root = lxml.html.fragment_fromstring(content_html, create_parent='div')
+        except Exception as e:
+            logger.debug(f"İçerik ayrıştırılamadı, olduğu gibi bırakıldı: {e}")
+            return content_html
+        
+        changed = False
+        for img in root.iter('img'):
+            changed = self._rewrite_image(img) or changed
+        for link in root.iter('a'):
+            if link.get('href'):
+                changed = self._rewrite_link(link) or changed
+        if not changed:
+            return content_html
+        
+        # Yapay <div> kabı olmadan serileştir (alt öğeler kendi tail metinlerini içerir)
+        return html.escape(root.text or '', quote=False) + ''.join(
+            lxml.html.tostring(child, encoding='unicode') for child in root
+        )
+    
+    def rewrite(self, content_html: str) -> str:
+        """
+        İçeriği yeniden yazar; aynı içerik ikinci kez ayrıştırılmaz.
+        
+        Args:
+            content_html: Post içeriği
+        
+        Returns:
+            Yerel yolları MEDIA_ROOT ile işaretlenmiş içerik
+        """
+        rewritten = self.cache.get(content_html)
+        if rewritten is None:
+            rewritten = self.cache[content_html] = self._rewrite(content_html)
+        return rewritten
+    
+    def rewrite_all(
+        self,
+        contents: List[str],
+        workers: int = config.RENDER_WORKERS,
+        chunk_size: int = config.RENDER_CHUNK_SIZE
+    ) -> None:
+        """
+        Tüm post içeriklerini toplu olarak yeniden yazıp cache'e ekler.
+        
+        Args:
+            contents: Post içerikleri
+            workers: İşçi süreç sayısı (0 = CPU sayısı, 1 = seri)
+            chunk_size: İşçiye tek seferde gönderilen içerik sayısı
+        """
+        pending = list(dict.fromkeys(content for content in contents if content not in self.cache))
+        
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(pending) > chunk_size:
+            chunks = [pending[start:start + chunk_size] for start in range(0, len(pending), chunk_size)]
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self.media_mappings, self.base_url)
+            ) as executor:
+                for chunk, results in zip(chunks, executor.map(_rewrite_chunk, chunks)):
+                    self.cache.update(zip(chunk, results))
+        else:
+            for content in pending:
+                self.rewrite(content)
+        
+        rewritten = sum(1 for content in pending if self.cache[content] != content)
+        logger.info(f"İçerik medya URL'leri: {rewritten}/{len(pending)} post yeniden yazıldı")
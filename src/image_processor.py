@@ -0,0 +1,414 @@
+"""
+XenForo Forum Archiver - Görsel İşleme Modülü
+
+Bu modül indirilen görsellerden thumbnail ve farklı genişlikte
+türevler (srcset için) üretir ve görselleri WebP formatına dönüştürür.
+"""
+
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Any, Optional, Tuple
+
+from PIL import Image, ImageOps
+from tqdm import tqdm
+
+from src.utils import setup_logger, format_file_size
+import config
+
+
+logger = setup_logger(__name__, config.LOG_FILE, config.LOG_LEVEL)
+
+# EXIF yönlendirme değerleri arasında genişlik/yüksekliği yer değiştirenler
+_TRANSPOSED_ORIENTATIONS = {5, 6, 7, 8}
+
+
+def _file_sha256(path: Path) -> str:
+    """Dosyanın SHA-256 özetini parça parça okuyarak hesaplar."""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _has_alpha(img: Image.Image) -> bool:
+    """Görselin saydamlık kanalı olup olmadığını döndürür."""
+    return img.mode in ('RGBA', 'LA', 'PA') or 'transparency' in img.info
+
+
+def _process_image(
+    source: str,
+    derivatives_dir: str,
+    thumbnail_size: int,
+    widths: List[int],
+    quality: int
+) -> Dict[str, Any]:
+    """
+    Tek bir görselin türevlerini üretir (worker process'te çalışır).
+    
+    Çıktı adları kaynak dosyanın hash'i ile boyut ve kalite ayarlarından
+    oluştuğu için tüm türevler zaten mevcutsa görsel decode edilmeden
+    atlanır; ayarlar değişince türevler yeni adlarla yeniden üretilir.
+    
+    Args:
+        source: Kaynak görsel yolu
+        derivatives_dir: Türevlerin yazılacağı dizin
+        thumbnail_size: Thumbnail sınır kutusu (px)
+        widths: Üretilecek genişlikler
+        quality: JPEG kalite değeri
+    
+    Returns:
+        Türev bilgileri (yollar derivatives_dir'e göreli) veya hata
+        durumunda {'error': neden}
+    """
+    try:
+        source_path = Path(source)
+        digest = _file_sha256(source_path)
+        
+        with Image.open(source_path) as img:
+            # Image.open sadece başlığı okur; boyut ve mod decode gerektirmez
+            width, height = img.size
+            if img.getexif().get(0x0112) in _TRANSPOSED_ORIENTATIONS:
+                width, height = height, width
+            ext = 'png' if _has_alpha(img) else 'jpg'
+            
+            shard = Path(digest[:2])
+            thumb_name = shard / f"{digest}_thumb{thumbnail_size}_q{quality}.{ext}"
+            targets = {w: shard / f"{digest}_{w}w_q{quality}.{ext}" for w in widths if w < width}
+            
+            out_dir = Path(derivatives_dir)
+            expected = [thumb_name, *targets.values()]
+            created = 0
+            if not all((out_dir / name).exists() for name in expected):
+                (out_dir / shard).mkdir(parents=True, exist_ok=True)
+                
+                # JPEG'lerde en büyük hedef boyutta decode ederek zaman kazan
+                largest = max([thumbnail_size, *targets.keys()])
+                img.draft('RGB', (largest, largest))
+                
+                image = ImageOps.exif_transpose(img)
+                image = image.convert('RGBA' if ext == 'png' else 'RGB')
+                
+                for target_width, name in targets.items():
+                    target_height = max(1, round(height * target_width / width))
+                    resized = image.resize((target_width, target_height), Image.LANCZOS)
+                    _save_image(resized, out_dir / name, ext, quality)
+                    created += 1
+                
+                thumb = image.copy()
+                thumb.thumbnail((thumbnail_size, thumbnail_size), Image.LANCZOS)
+                _save_image(thumb, out_dir / thumb_name, ext, quality)
+                created += 1
+        
+        with Image.open(out_dir / thumb_name) as thumb:
+            thumb_width, thumb_height = thumb.size
+        
+        return {
+            'sha256': digest,
+            'width': width,
+            'height': height,
+            'thumbnail': {'path': thumb_name.as_posix(), 'width': thumb_width, 'height': thumb_height},
+            'variants': [{'width': w, 'path': name.as_posix()} for w, name in sorted(targets.items())],
+            'created': created
+        }
+    
+    except Exception as e:
+        # Worker'da loglamak yerine neden ana sürece döndürülür
+        return {'error': f"{type(e).__name__}: {e}"}
+
+
+def _save_image(image: Image.Image, path: Path, ext: str, quality: int) -> None:
+    """Türevi geçici isimle yazıp atomik olarak yerine taşır."""
+    tmp_path = path.with_name(path.name + '.part')
+    if ext == 'png':
+        image.save(tmp_path, 'PNG', optimize=True)
+    else:
+        image.save(tmp_path, 'JPEG', quality=quality, optimize=True, progressive=True)
+    tmp_path.replace(path)
+
+
+def _transcode_webp(source: str, webp_dir: str, quality: int, method: int) -> Dict[str, Any]:
+    """
+    Tek bir görseli WebP'ye dönüştürür (worker process'te çalışır).
+    
+    Sonuç kaynak hash'i ve encode ayarlarına göre saklanır: aynı ayarlarla
+    WebP zaten varsa ya da orijinalden küçük olmadığı işaretlendiyse tekrar
+    encode edilmez; kalite veya efor değişince yeniden denenir.
+    
+    Args:
+        source: Kaynak görsel yolu
+        webp_dir: WebP dosyalarının yazılacağı dizin
+        quality: WebP kalite hedefi
+        method: WebP sıkıştırma eforu (0-6)
+    
+    Returns:
+        {'path', 'original_size', 'webp_size', 'created'} (path None ise
+        WebP orijinalden küçük değildir) veya hata durumunda {'error': neden}
+    """
+    try:
+        source_path = Path(source)
+        digest = _file_sha256(source_path)
+        original_size = source_path.stat().st_size
+        
+        shard = Path(digest[:2])
+        key = f"{digest}_q{quality}_m{method}"
+        webp_name = shard / f"{key}.webp"
+        out_dir = Path(webp_dir)
+        target = out_dir / webp_name
+        # WebP'nin bu ayarlarla küçük olmadığı durumlar için işaret dosyası
+        skip_marker = out_dir / shard / f"{key}.skip"
+        
+        if target.exists():
+            return {'path': webp_name.as_posix(), 'original_size': original_size,
+                    'webp_size': target.stat().st_size, 'created': False}
+        if skip_marker.exists():
+            return {'path': None, 'original_size': original_size,
+                    'webp_size': None, 'created': False}
+        
+        (out_dir / shard).mkdir(parents=True, exist_ok=True)
+        tmp_path = target.with_name(target.name + '.part')
+        
+        with Image.open(source_path) as img:
+            if getattr(img, 'is_animated', False):
+                img.save(tmp_path, 'WEBP', save_all=True, quality=quality, method=method)
+            else:
+                image = ImageOps.exif_transpose(img)
+                image = image.convert('RGBA' if _has_alpha(img) else 'RGB')
+                image.save(tmp_path, 'WEBP', quality=quality, method=method)
+        
+        webp_size = tmp_path.stat().st_size
+        if webp_size >= original_size:
+            tmp_path.unlink()
+            skip_marker.touch()
+            return {'path': None, 'original_size': original_size,
+                    'webp_size': None, 'created': False}
+        
+        tmp_path.replace(target)
+        return {'path': webp_name.as_posix(), 'original_size': original_size,
+                'webp_size': webp_size, 'created': True}
+    
+    except Exception as e:
+        return {'error': f"{type(e).__name__}: {e}"}
+
+
+class ImageProcessor:
+    """Görsel türevi üretme ve WebP dönüştürme sınıfı"""
+    
+    def __init__(
+        self,
+        media_dir: Path,
+        thumbnail_size: int = config.THUMBNAIL_SIZE,
+        widths: Optional[List[int]] = None,
+        quality: int = config.DERIVATIVE_QUALITY,
+        workers: int = config.IMAGE_WORKERS,
+        webp_quality: int = config.WEBP_QUALITY,
+        webp_method: int = config.WEBP_METHOD
+    ):
+        """
+        Args:
+            media_dir: İndirilen medya dizini (MediaDownloader.output_dir)
+            thumbnail_size: Thumbnail sınır kutusu (px)
+            widths: Üretilecek genişlikler (varsayılan: config.DERIVATIVE_WIDTHS)
+            quality: JPEG kalite değeri
+            workers: Process sayısı (0 = CPU sayısı)
+            webp_quality: WebP kalite hedefi
+            webp_method: WebP sıkıştırma eforu (0-6)
+        """
+        self.media_dir = media_dir
+        self.derivatives_dir = media_dir / 'derivatives'
+        self.derivatives_dir.mkdir(parents=True, exist_ok=True)
+        
+        self.thumbnail_size = thumbnail_size
+        self.widths = sorted(widths if widths is not None else config.DERIVATIVE_WIDTHS)
+        self.quality = quality
+        self.workers = workers or None
+        
+        self.webp_dir = media_dir / 'webp'
+        self.webp_quality = webp_quality
+        self.webp_method = webp_method
+        self.webp_stats: Dict[str, int] = {}
+    
+    def generate_derivatives(self, image_mapping: Dict[str, str]) -> Dict[str, Dict[str, Any]]:
+        """
+        İndirilen tüm görseller için türevleri paralel olarak üretir.
+        
+        Args:
+            image_mapping: URL -> local path mapping (download_images çıktısı)
+        
+        Returns:
+            URL -> türev bilgileri mapping (yollar image_mapping ile aynı köke göreli)
+        """
+        logger.info("Görsel türevleri oluşturuluyor...")
+        
+        base_dir = self.media_dir.parent
+        sources = sorted(set(image_mapping.values()))
+        logger.info(f"Toplam {len(sources)} görsel işlenecek")
+        
+        derivatives_rel = self.derivatives_dir.relative_to(base_dir)
+        results: Dict[str, Dict[str, Any]] = {}
+        created = 0
+        
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            jobs = executor.map(
+                _process_image,
+                [str(base_dir / source) for source in sources],
+                [str(self.derivatives_dir)] * len(sources),
+                [self.thumbnail_size] * len(sources),
+                [self.widths] * len(sources),
+                [self.quality] * len(sources),
+                chunksize=16
+            )
+            
+            with tqdm(total=len(sources), desc="Görsel türevleri", unit="dosya") as pbar:
+                for source, info in zip(sources, jobs):
+                    if 'error' in info:
+                        logger.warning(f"Görsel işlenemedi: {source} - {info['error']}")
+                    else:
+                        created += info.pop('created')
+                        info['thumbnail']['path'] = (derivatives_rel / info['thumbnail']['path']).as_posix()
+                        for variant in info['variants']:
+                            variant['path'] = (derivatives_rel / variant['path']).as_posix()
+                        results[source] = info
+                    pbar.update(1)
+        
+        mapping = {
+            url: results[local_path]
+            for url, local_path in image_mapping.items()
+            if local_path in results
+        }
+        
+        logger.info(f"{len(results)} görsel için türev hazır ({created} yeni dosya oluşturuldu)")
+        return mapping
+    
+    def _transcode_sources(self, sources: List[str], desc: str) -> Tuple[Dict[str, str], Dict[str, int]]:
+        """
+        Dosyaları paralel olarak WebP'ye dönüştürür.
+        
+        Args:
+            sources: media_dir.parent'a göreli kaynak yolları
+            desc: İlerleme çubuğu başlığı
+        
+        Returns:
+            (kaynak -> WebP yolu, sadece küçülenler; sayaçlar)
+        """
+        self.webp_dir.mkdir(parents=True, exist_ok=True)
+        base_dir = self.media_dir.parent
+        webp_rel = self.webp_dir.relative_to(base_dir)
+        
+        results: Dict[str, str] = {}
+        stats = {'converted': 0, 'skipped': 0, 'failed': 0, 'created': 0,
+                 'original_bytes': 0, 'webp_bytes': 0}
+        
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            jobs = executor.map(
+                _transcode_webp,
+                [str(base_dir / source) for source in sources],
+                [str(self.webp_dir)] * len(sources),
+                [self.webp_quality] * len(sources),
+                [self.webp_method] * len(sources),
+                chunksize=16
+            )
+            
+            with tqdm(total=len(sources), desc=desc, unit="dosya") as pbar:
+                for source, info in zip(sources, jobs):
+                    if 'error' in info:
+                        logger.warning(f"WebP'ye dönüştürülemedi: {source} - {info['error']}")
+                        stats['failed'] += 1
+                    elif info['path'] is None:
+                        stats['skipped'] += 1
+                    else:
+                        stats['converted'] += 1
+                        stats['created'] += int(info['created'])
+                        stats['original_bytes'] += info['original_size']
+                        stats['webp_bytes'] += info['webp_size']
+                        results[source] = (webp_rel / info['path']).as_posix()
+                    pbar.update(1)
+        
+        return results, stats
+    
+    def transcode_to_webp(
+        self,
+        image_mapping: Dict[str, str],
+        keep_originals: bool = config.WEBP_KEEP_ORIGINALS
+    ) -> Dict[str, str]:
+        """
+        İndirilen görselleri paralel olarak WebP'ye dönüştürür.
+        
+        WebP orijinalden küçük değilse sadece orijinal kullanılır. keep_originals
+        False ise küçülen görsellerin orijinali silinir ve image_mapping
+        WebP dosyasını gösterecek şekilde yerinde güncellenir; çağıran bu
+        mapping'i indirme kaydına yazarak sonraki çalıştırmada orijinalin
+        tekrar indirilmesini önler.
+        
+        Args:
+            image_mapping: URL -> local path mapping (download_images çıktısı)
+            keep_originals: Orijinalleri fallback olarak sakla
+        
+        Returns:
+            URL -> WebP path mapping (sadece küçülen görseller)
+        """
+        logger.info("Görseller WebP formatına dönüştürülüyor...")
+        
+        base_dir = self.media_dir.parent
+        webp_prefix = self.webp_dir.relative_to(base_dir).as_posix() + '/'
+        # Önceki çalıştırmada orijinali silinen görseller zaten WebP'dir
+        sources = sorted({path for path in image_mapping.values() if not path.startswith(webp_prefix)})
+        results, stats = self._transcode_sources(sources, "WebP")
+        
+        mapping = {
+            url: local_path if local_path.startswith(webp_prefix) else results[local_path]
+            for url, local_path in image_mapping.items()
+            if local_path.startswith(webp_prefix) or local_path in results
+        }
+        
+        if not keep_originals:
+            for source in results:
+                (base_dir / source).unlink(missing_ok=True)
+            image_mapping.update(mapping)
+        
+        stats['saved_bytes'] = stats['original_bytes'] - stats['webp_bytes']
+        self.webp_stats = stats
+        
+        ratio = (stats['webp_bytes'] / stats['original_bytes'] * 100) if stats['original_bytes'] else 0
+        logger.info(
+            f"WebP: {stats['converted']} dönüştürüldü ({stats['created']} yeni), "
+            f"{stats['skipped']} küçülmediği için atlandı, {stats['failed']} başarısız"
+        )
+        logger.info(
+            f"WebP kazancı: {format_file_size(stats['saved_bytes'])} "
+            f"({format_file_size(stats['original_bytes'])} -> {format_file_size(stats['webp_bytes'])}, %{ratio:.1f})"
+        )
+        return mapping
+    
+    def transcode_derivatives_to_webp(self, derivative_mapping: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Thumbnail ve srcset türevlerini WebP'ye dönüştürür.
+        
+        Küçülen her türeve 'webp_path' eklenir; şablonlar bunlardan
+        <picture> içinde bir WebP <source> kurar.
+        
+        Args:
+            derivative_mapping: generate_derivatives çıktısı (yerinde güncellenir)
+        
+        Returns:
+            WebP karşılığı olan türev sayısı
+        """
+        logger.info("Görsel türevleri WebP formatına dönüştürülüyor...")
+        
+        entries = [
+            entry
+            for info in derivative_mapping.values()
+            for entry in [info['thumbnail'], *info['variants']]
+        ]
+        results, stats = self._transcode_sources(sorted({entry['path'] for entry in entries}), "WebP türevleri")
+        
+        for entry in entries:
+            if entry['path'] in results:
+                entry['webp_path'] = results[entry['path']]
+        
+        logger.info(
+            f"WebP türevleri: {stats['converted']} dönüştürüldü ({stats['created']} yeni), "
+            f"{stats['skipped']} küçülmediği için atlandı, {stats['failed']} başarısız"
+        )
+        return stats['converted']
@@ -0,0 +1,155 @@
+"""
+XenForo Forum Archiver - Medya Senkronizasyon Modülü
+
+Bu modül indirilen medya dizinini web sitesi dizinine artımlı olarak
+aktarır: değişmeyen dosyalara dokunmaz, aynı dosya sistemindeki
+dosyaları kopyalamak yerine hard link ile bağlar ve kaynağı silinen
+dosyaları hedeften kaldırır.
+"""
+
+import hashlib
+import os
+import shutil
+from pathlib import Path
+from typing import Dict, Set
+
+from src.utils import setup_logger, format_file_size
+import config
+
+
+logger = setup_logger(__name__, config.LOG_FILE, config.LOG_LEVEL)
+
+
+def file_sha256(path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Dosyanın SHA-256 özetini parça parça okuyarak hesaplar.
+    
+    Args:
+        path: Dosya yolu
+        chunk_size: Okuma parçası boyutu (bayt)
+    
+    Returns:
+        Hex SHA-256 özeti
+    """
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class MediaSync:
+    """Kaynak dizini hedef dizine artımlı olarak aynalayan sınıf."""
+    
+    def __init__(self, source_dir: Path, dest_dir: Path, hardlink: bool = config.MEDIA_HARDLINKS):
+        """
+        Args:
+            source_dir: İndirilen medya dizini
+            dest_dir: Web sitesi içindeki medya dizini
+            hardlink: Aynı dosya sistemindeyse kopyalamak yerine hard link oluştursun mu
+        """
+        self.source_dir = source_dir
+        self.dest_dir = dest_dir
+        self.hardlink = hardlink
+        self.stats = {
+            'linked': 0,
+            'copied': 0,
+            'unchanged': 0,
+            'removed': 0,
+            'bytes_copied': 0
+        }
+    
+    def _is_current(self, source_stat: os.stat_result, source: Path, dest: Path) -> bool:
+        """
+        Hedef dosyanın kaynakla aynı olup olmadığını kontrol eder.
+        
+        Önce inode (hard link), sonra boyut ve mtime karşılaştırılır; sadece
+        boyutu aynı ama mtime'ı farklı dosyaların içeriği hash'lenir.
+        """
+        try:
+            dest_stat = dest.stat()
+        except FileNotFoundError:
+            return False
+        
+        if (dest_stat.st_dev, dest_stat.st_ino) == (source_stat.st_dev, source_stat.st_ino):
+            return True
+        if dest_stat.st_size != source_stat.st_size:
+            return False
+        if dest_stat.st_mtime_ns == source_stat.st_mtime_ns:
+            return True
+        if file_sha256(source) != file_sha256(dest):
+            return False
+        # İçerik aynı; bir sonraki çalıştırmada tekrar hash'lenmemesi için mtime'ı eşitle
+        os.utime(dest, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        return True
+    
+    def _transfer(self, source_stat: os.stat_result, source: Path, dest: Path) -> None:
+        """Dosyayı hard link ile bağlar, olmuyorsa kopyalar; hedef atomik olarak değiştirilir."""
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = dest.with_name(f'.{dest.name}.sync')
+        tmp_file.unlink(missing_ok=True)
+        
+        if self.hardlink:
+            try:
+                os.link(source, tmp_file)
+                tmp_file.replace(dest)
+                self.stats['linked'] += 1
+                return
+            except OSError:
+                # Farklı dosya sistemi (EXDEV) veya hard link desteklenmiyor; kopyaya düş
+                tmp_file.unlink(missing_ok=True)
+                self.hardlink = False
+        
+        try:
+            shutil.copy2(source, tmp_file)
+            tmp_file.replace(dest)
+        except BaseException:
+            tmp_file.unlink(missing_ok=True)
+            raise
+        self.stats['copied'] += 1
+        self.stats['bytes_copied'] += source_stat.st_size
+    
+    def _remove_orphans(self, expected: Set[Path]) -> None:
+        """Kaynağı olmayan dosyaları ve boş kalan dizinleri siler."""
+        for root, _, files in os.walk(self.dest_dir, topdown=False):
+            root_path = Path(root)
+            for name in files:
+                path = root_path / name
+                if path not in expected:
+                    path.unlink()
+                    self.stats['removed'] += 1
+            if root_path != self.dest_dir and not any(root_path.iterdir()):
+                root_path.rmdir()
+    
+    def sync(self) -> Dict[str, int]:
+        """
+        Kaynak dizini hedef dizine aynalar.
+        
+        Returns:
+            Senkronizasyon istatistikleri
+        """
+        self.dest_dir.mkdir(parents=True, exist_ok=True)
+        expected: Set[Path] = set()
+        
+        for root, _, files in os.walk(self.source_dir):
+            root_path = Path(root)
+            dest_root = self.dest_dir / root_path.relative_to(self.source_dir)
+            for name in files:
+                source = root_path / name
+                dest = dest_root / name
+                expected.add(dest)
+                
+                source_stat = source.stat()
+                if self._is_current(source_stat, source, dest):
+                    self.stats['unchanged'] += 1
+                else:
+                    self._transfer(source_stat, source, dest)
+        
+        self._remove_orphans(expected)
+        
+        logger.info(
+            f"Medya senkronize edildi: {self.stats['linked']} link, {self.stats['copied']} kopya "
+            f"({format_file_size(self.stats['bytes_copied'])}), {self.stats['unchanged']} değişmedi, "
+            f"{self.stats['removed']} silindi"
+        )
+        return self.stats
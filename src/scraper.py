@@ -9,13 +9,13 @@ import json
 import re
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 from urllib.parse import urljoin, urlparse, parse_qs
 
 import requests
 from bs4 import BeautifulSoup
 
-from src.utils import setup_logger, clean_html_text
+from src.utils import setup_logger, clean_html_text, RateLimiter
 import config
 
 
@@ -25,14 +25,24 @@ logger = setup_logger(__name__, config.LOG_FILE, config.LOG_LEVEL)
 class XenForoScraper:
     """XenForo v2.x forum scraper sınıfı"""
     
-    def __init__(self, session: requests.Session, base_url: str):
+    def __init__(
+        self,
+        session: requests.Session,
+        base_url: str,
+        rate_limiter: Optional[RateLimiter] = None,
+        on_post: Optional[Callable[[Dict[str, Any]], None]] = None
+    ):
         """
         Args:
             session: Çerezli requests session
             base_url: Forum ana URL'si
+            rate_limiter: Medya indirmeleriyle paylaşılan hız sınırlayıcı
+            on_post: Her post parse edildiğinde çağrılır (örn. medya kuyruğu)
         """
         self.session = session
         self.base_url = base_url.rstrip('/')
+        self.rate_limiter = rate_limiter
+        self.on_post = on_post
         self.posts_data: List[Dict[str, Any]] = []
         self.thread_title = ""
         self.thread_info: Dict[str, Any] = {}
@@ -49,6 +59,8 @@ class XenForoScraper:
         """
         try:
             logger.info(f"Thread sayfa sayısı kontrol ediliyor: {thread_url}")
+            if self.rate_limiter:
+                self.rate_limiter.wait()
             response = self.session.get(thread_url, timeout=config.REQUEST_TIMEOUT)
             response.raise_for_status()
             
@@ -225,6 +237,8 @@ class XenForoScraper:
         posts = []
         try:
             logger.info(f"Sayfa scraping yapılıyor: {page_url}")
+            if self.rate_limiter:
+                self.rate_limiter.wait()
             response = self.session.get(page_url, timeout=config.REQUEST_TIMEOUT)
             response.raise_for_status()
             
@@ -238,6 +252,9 @@ class XenForoScraper:
                 post_data = self._parse_post(article)
                 if post_data:
                     posts.append(post_data)
+                    # Medyası sayfa bitmeden indirme kuyruğuna girsin
+                    if self.on_post:
+                        self.on_post(post_data)
             
             return posts
             
@@ -0,0 +1,229 @@
+"""
+XenForo Forum Archiver - Arama İndeksi Modülü
+
+Bu modül statik site için istemci tarafında sorgulanan, terim önekine
+göre parçalara bölünmüş bir ters indeks (inverted index) oluşturur.
+"""
+
+import re
+from array import array
+from itertools import groupby
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from src.utils import truncate_text
+import config
+
+
+# En az iki karakterli kelimeler; search.html'deki JS ile aynı kural
+TERM_PATTERN = re.compile(r'\w{2,}')
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Metni küçük harfli arama terimlerine ayırır.
+    
+    Args:
+        text: Metin
+    
+    Returns:
+        Terim listesi
+    """
+    return TERM_PATTERN.findall(text.lower())
+
+
+def shard_name(term: str, prefix_length: int) -> str:
+    """
+    Terimin bulunduğu parça dosyasının adını döndürür.
+    
+    Önek, dosya sistemi için güvenli olması adına UTF-8 hex olarak yazılır.
+    
+    Args:
+        term: Arama terimi
+        prefix_length: Önek uzunluğu (karakter)
+    
+    Returns:
+        Parça adı (ör. 'ke' -> '6b65')
+    """
+    return term[:prefix_length].encode('utf-8').hex()
+
+
+def term_file_name(term: str) -> str:
+    """
+    Ayrı dosyaya yazılan doküman listesinin dosya adını döndürür.
+    
+    Args:
+        term: Arama terimi
+    
+    Returns:
+        Terimin UTF-8 hex karşılığı
+    """
+    return term.encode('utf-8').hex()
+
+
+def term_page_name(term: str, page: int) -> str:
+    """
+    Uzun doküman listesinin bir sayfasının dosya adını döndürür.
+    
+    Args:
+        term: Arama terimi
+        page: Sıfırdan başlayan sayfa numarası
+    
+    Returns:
+        Dosya adı (ör. ('ke', 1) -> '6b65.1')
+    """
+    return f'{term_file_name(term)}.{page}'
+
+
+def delta_encode(doc_ids: array) -> List[int]:
+    """
+    Artan doküman numaralarını farklara çevirir.
+    
+    Args:
+        doc_ids: Artan sırada doküman numaraları
+    
+    Returns:
+        İlk numara ve ardışık farklar
+    """
+    previous = 0
+    deltas = []
+    for doc_id in doc_ids:
+        deltas.append(doc_id - previous)
+        previous = doc_id
+    return deltas
+
+
+class SearchIndexBuilder:
+    """content_text, yazar ve etiketler üzerinde ters indeks oluşturan sınıf."""
+    
+    # Bundan az postta geçen terimler max_df_ratio'dan bağımsız olarak tutulur
+    MIN_SKIPPED_DF = 1000
+    # Dosya adı olarak kullanılabilecek en uzun terim (UTF-8 byte)
+    MAX_TERM_FILE_BYTES = 100
+    
+    def __init__(
+        self,
+        prefix_length: int = config.SEARCH_PREFIX_LENGTH,
+        docs_per_file: int = 256,
+        max_df_ratio: float = config.SEARCH_MAX_DF_RATIO,
+        max_inline_postings: int = config.SEARCH_MAX_INLINE_POSTINGS,
+        postings_per_file: int = config.SEARCH_POSTINGS_PER_FILE,
+        snippet_length: int = 120
+    ):
+        """
+        Args:
+            prefix_length: Parçalama için terim öneki uzunluğu
+            docs_per_file: Doküman tablosu dosyası başına post sayısı
+            max_df_ratio: Bu orandan fazla postta geçen terimler (stop word) atlanır
+            max_inline_postings: Daha uzun doküman listeleri parça yerine ayrı dosyaya yazılır
+            postings_per_file: Ayrı yazılan listelerin dosya (sayfa) başına doküman sayısı
+            snippet_length: Sonuç listesinde gösterilecek metin uzunluğu
+        """
+        self.prefix_length = prefix_length
+        self.docs_per_file = docs_per_file
+        self.max_df_ratio = max_df_ratio
+        self.max_inline_postings = max_inline_postings
+        self.postings_per_file = max(1, postings_per_file)
+        self.snippet_length = snippet_length
+        self.postings: Dict[str, array] = {}
+        self.docs: List[List[Any]] = []
+    
+    def add(self, post: Dict[str, Any], category: str, url: str) -> None:
+        """
+        Postu indekse ekler.
+        
+        Args:
+            post: Post verisi
+            category: Postun kategorisi
+            url: Post sayfasının site köküne göre yolu
+        """
+        doc_id = len(self.docs)
+        author = post.get('author', '')
+        content_text = post.get('content_text', '')
+        self.docs.append([
+            post.get('post_id'),
+            author,
+            category,
+            url,
+            truncate_text(content_text, self.snippet_length)
+        ])
+        
+        terms = set(tokenize(content_text))
+        terms.update(tokenize(author))
+        for tag in post.get('tags', []):
+            terms.update(tokenize(tag))
+        
+        # Doküman numaraları artan sırada eklendiği için listeler sıralı kalır
+        for term in terms:
+            postings = self.postings.get(term)
+            if postings is None:
+                postings = self.postings[term] = array('I')
+            postings.append(doc_id)
+    
+    def _max_df(self) -> int:
+        """Stop word sayılmadan önce bir terimin geçebileceği en fazla post sayısı."""
+        # Küçük listeler zaten birkaç KB olduğu için sadece büyük listeler atlanır
+        return max(self.MIN_SKIPPED_DF, int(self.max_df_ratio * len(self.docs)))
+    
+    def _is_external(self, term: str) -> bool:
+        """Terimin doküman listesinin ayrı dosyaya yazılıp yazılmayacağını döndürür."""
+        return (
+            len(self.postings[term]) > self.max_inline_postings and
+            len(term.encode('utf-8')) <= self.MAX_TERM_FILE_BYTES
+        )
+    
+    def shards(self) -> Iterator[Tuple[str, Dict[str, Optional[Union[List[int], int]]]]]:
+        """
+        İndeks parçalarını üretir.
+        
+        Parçadaki değer fark kodlu doküman listesi, listesi ayrı dosyada olan
+        terimler için liste uzunluğu, stop word'ler için None'dır; istemci
+        None terimleri kesişimde atlar.
+        
+        Yields:
+            (parça adı, terim -> değer)
+        """
+        max_df = self._max_df()
+        # Sıralı terim listesinde aynı öneke sahip terimler art arda gelir;
+        # böylece her seferinde sadece bir parça bellekte tutulur
+        terms = sorted(self.postings)
+        for prefix, group in groupby(terms, key=lambda term: term[:self.prefix_length]):
+            shard: Dict[str, Optional[Union[List[int], int]]] = {}
+            for term in group:
+                count = len(self.postings[term])
+                if count > max_df:
+                    shard[term] = None
+                elif self._is_external(term):
+                    shard[term] = count
+                else:
+                    shard[term] = delta_encode(self.postings[term])
+            yield shard_name(prefix, self.prefix_length), shard
+    
+    def postings_files(self) -> Iterator[Tuple[str, List[int]]]:
+        """
+        Parçaları KB boyutunda tutmak için ayrı yazılan uzun doküman listelerini üretir.
+        
+        Listeler postings_per_file dokümanlık sayfalara bölünür, böylece yaygın
+        terimlerin dosyaları da arşiv büyüdükçe sınırsız büyümez. Her sayfa
+        kendi içinde fark kodludur (ilk değer mutlak doküman numarasıdır);
+        istemci sayfa sayısını parçadaki liste uzunluğundan hesaplar.
+        
+        Yields:
+            (dosya adı, fark kodlu doküman listesi sayfası)
+        """
+        max_df = self._max_df()
+        for term in sorted(self.postings):
+            postings = self.postings[term]
+            if len(postings) <= max_df and self._is_external(term):
+                for start in range(0, len(postings), self.postings_per_file):
+                    page = postings[start:start + self.postings_per_file]
+                    yield term_page_name(term, start // self.postings_per_file), delta_encode(page)
+    
+    def doc_files(self) -> Iterator[Tuple[int, List[List[Any]]]]:
+        """
+        Doküman tablosu dosyalarını üretir.
+        
+        Yields:
+            (dosya numarası, [post_id, yazar, kategori, url, özet] satırları)
+        """
+        for start in range(0, len(self.docs), self.docs_per_file):
+            yield start // self.docs_per_file, self.docs[start:start + self.docs_per_file]
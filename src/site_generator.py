@@ -4,20 +4,204 @@ XenForo Forum Archiver - Site Generator Modülü
 Bu modül Jinja2 kullanarak statik HTML web sitesi oluşturur.
 """
 
-import shutil
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 from datetime import datetime
 
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template, select_autoescape
 
-from src.utils import setup_logger, truncate_text, extract_youtube_id, extract_vimeo_id
+from src.utils import (
+    setup_logger, truncate_text, extract_youtube_id, extract_vimeo_id, canonicalize_media_url,
+    format_file_size
+)
+from src.build_manifest import BuildManifest, input_digest
+from src.compressor import write_gzip_sidecars
+from src.html_rewriter import ContentMediaRewriter, media_root
+from src.media_sync import MediaSync
+from src.search_index import SearchIndexBuilder
 import config
 
 
 logger = setup_logger(__name__, config.LOG_FILE, config.LOG_LEVEL)
 
 
+# Desteklenen post sayfası dizin düzenleri (bkz. post_page_path)
+POST_LAYOUTS = ('flat', 'range', 'hash')
+
+# Eski düz post yollarından yeni yollara yönlendirme tablosu (Netlify/Cloudflare Pages biçimi)
+REDIRECTS_FILE = '_redirects'
+
+# Post sayfası render eden işçi sürecin durumu (_init_render_worker ile kurulur)
+_worker_state: Dict[str, Any] = {}
+
+
+def create_environment(templates_dir: Path, cache_dir: Optional[Path] = None) -> Environment:
+    """
+    Custom filtreleri eklenmiş Jinja2 environment'ı oluşturur.
+    
+    cache_dir verilirse derlenmiş template'ler diske yazılır; sonraki
+    çalıştırmalar ve işçi süreçler template'leri yeniden derlemez. Kayıtlar
+    template kaynağının hash'i ve Python sürümüyle eşleşmezse kullanılmaz,
+    bellekteki kopyalar ise dosya mtime'ı değişince yeniden yüklenir.
+    
+    Args:
+        templates_dir: Jinja2 template'lerinin bulunduğu dizin
+        cache_dir: Bytecode cache dizini (None = cache yok)
+    
+    Returns:
+        Jinja2 environment
+    """
+    bytecode_cache = None
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(str(cache_dir))
+    
+    env = Environment(
+        loader=FileSystemLoader(str(templates_dir)),
+        autoescape=select_autoescape(['html', 'xml']),
+        bytecode_cache=bytecode_cache
+    )
+    
+    # Custom filters ekle
+    env.filters['truncate_text'] = truncate_text
+    env.filters['youtube_id'] = extract_youtube_id
+    env.filters['vimeo_id'] = extract_vimeo_id
+    env.filters['media_root'] = media_root
+    env.filters['post_url'] = post_page_path
+    return env
+
+
+def render_to_file(
+    template: Template,
+    output_file: Path,
+    buffer_size: int = config.RENDER_BUFFER_SIZE,
+    **context: Any
+) -> None:
+    """
+    Template'i parça parça render edip dosyaya yazar.
+    
+    Sayfa tek bir string olarak oluşturulmaz; Jinja2'nin ürettiği parçalar
+    tamponlu olarak geçici dosyaya yazılır, bellek kullanımı sayfa boyutuyla
+    değil tampon boyutuyla sınırlı kalır. Dosya tamamlanınca yerine taşınır;
+    okuyucular hiçbir zaman yarım yazılmış sayfa görmez.
+    
+    Args:
+        template: Render edilecek template
+        output_file: Çıktı dosyası
+        buffer_size: Yazma tamponu boyutu (bayt)
+        **context: Template değişkenleri
+    """
+    tmp_file = output_file.with_name(output_file.name + '.part')
+    try:
+        with open(tmp_file, 'w', encoding='utf-8', buffering=buffer_size) as f:
+            template.stream(**context).dump(f)
+        tmp_file.replace(output_file)
+    except BaseException:
+        tmp_file.unlink(missing_ok=True)
+        raise
+
+
+def _init_render_worker(
+    templates_dir: Path,
+    cache_dir: Optional[Path],
+    output_dir: Path,
+    thread_info: Dict[str, Any]
+) -> None:
+    """Her işçi süreçte kendi Jinja2 environment'ını bir kez kurar."""
+    _worker_state['template'] = create_environment(templates_dir, cache_dir).get_template('post.html')
+    _worker_state['output_dir'] = output_dir
+    _worker_state['thread_info'] = thread_info
+
+
+def _render_post_chunk(items: List[Tuple[str, str, Dict[str, Any]]]) -> List[str]:
+    """
+    Bir grup post sayfasını işçi süreçte render edip diske yazar.
+    
+    Args:
+        items: (sayfa yolu, kategori, post) listesi
+    
+    Returns:
+        Yazılan sayfa yolları
+    """
+    template = _worker_state['template']
+    output_dir = _worker_state['output_dir']
+    thread_info = _worker_state['thread_info']
+    
+    for page_path, category, post in items:
+        render_to_file(
+            template,
+            output_dir / page_path,
+            post=post,
+            category=category,
+            thread_info=thread_info,
+            root=root_prefix(page_path)
+        )
+    
+    return [page_path for page_path, _, _ in items]
+
+
+def category_page_name(category: str, page: int) -> str:
+    """
+    Kategori sayfasının dosya adını döndürür.
+    
+    İlk sayfa eski bağlantıların çalışması için {kategori}.html olarak kalır.
+    
+    Args:
+        category: Kategori adı
+        page: Sayfa numarası (1'den başlar)
+    
+    Returns:
+        Dosya adı
+    """
+    return f'{category}.html' if page == 1 else f'{category}_page_{page}.html'
+
+
+def post_page_path(post_id: Any, layout: Optional[str] = None, depth: Optional[int] = None) -> str:
+    """
+    Post sayfasının site köküne göre yolunu döndürür.
+    
+    Milyonlarca sayfanın tek bir dizinde toplanmaması için sayfalar
+    alt dizinlere dağıtılabilir:
+        flat:  posts/post_123456.html
+        range: posts/12/34/post_123456.html (ID'nin baştaki rakamları)
+        hash:  posts/7c/4a/post_123456.html (ID'nin SHA-1 öneki, eşit dağılım)
+    Sayısal olmayan ID'ler range düzeninde hash ile dağıtılır.
+    
+    Args:
+        post_id: Post ID'si
+        layout: Dizin düzeni (None = config.POST_LAYOUT)
+        depth: Alt dizin seviyesi (None = config.POST_SHARD_DEPTH)
+    
+    Returns:
+        Sayfa yolu
+    """
+    layout = layout or config.POST_LAYOUT
+    depth = config.POST_SHARD_DEPTH if depth is None else depth
+    if layout not in POST_LAYOUTS:
+        raise ValueError(f"Geçersiz post dizin düzeni: {layout}")
+    
+    name = f'post_{post_id}.html'
+    if layout == 'flat' or depth <= 0:
+        return f'posts/{name}'
+    
+    key = str(post_id)
+    if layout == 'range' and key.isdigit():
+        # Kısa ID'ler sıfırla doldurulur: 42 -> 00/42
+        key = key.zfill(2 * depth)
+    else:
+        key = hashlib.sha1(key.encode('utf-8')).hexdigest()
+    return '/'.join(['posts'] + [key[level * 2:level * 2 + 2] for level in range(depth)] + [name])
+
+
+def root_prefix(relative_path: str) -> str:
+    """Sayfadan site köküne göreli yolu döndürür (ör. 'posts/12/34/x.html' -> '../../../')."""
+    return '../' * relative_path.count('/')
+
+
 class WebSiteGenerator:
     """Statik web sitesi oluşturma sınıfı"""
     
@@ -46,16 +230,44 @@ class WebSiteGenerator:
         self.stats = stats
         self.media_mappings = media_mappings or {}
         
-        # Jinja2 environment oluştur
-        self.env = Environment(
-            loader=FileSystemLoader(str(templates_dir)),
-            autoescape=select_autoescape(['html', 'xml'])
-        )
+        # Jinja2 environment oluştur (derlenmiş template'ler diskte saklanır)
+        self.template_cache_dir = config.TEMPLATE_CACHE_DIR if config.TEMPLATE_BYTECODE_CACHE else None
+        self.env = create_environment(templates_dir, self.template_cache_dir)
         
-        # Custom filters ekle
-        self.env.filters['truncate_text'] = truncate_text
-        self.env.filters['youtube_id'] = extract_youtube_id
-        self.env.filters['vimeo_id'] = extract_vimeo_id
+        # content_html içindeki medya URL'lerini yerel kopyalara yönlendirir
+        self.content_rewriter = ContentMediaRewriter(self.media_mappings, thread_info.get('base_url', ''))
+        
+        # generate_site sırasında kurulur; yoksa her sayfa yeniden yazılır
+        self.manifest: Optional[BuildManifest] = None
+        self._template_digests: Dict[str, str] = {}
+    
+    def _needs_update(self, relative_path: str, *inputs: Any) -> bool:
+        """
+        Çıktının girdileri değiştiyse True döndürür.
+        
+        Args:
+            relative_path: Çıktı dizinine göre dosya yolu
+            *inputs: Çıktının girdileri (post verisi, template kaynağı vb.)
+        
+        Returns:
+            Dosya yeniden yazılmalıysa True
+        """
+        if self.manifest is None:
+            return True
+        return self.manifest.needs_update(relative_path, input_digest(*inputs))
+    
+    def _template_digest(self, name: str) -> str:
+        """
+        Template kaynağının hash'ini döndürür (derleme manifest'i için).
+        
+        Hash template başına bir kez hesaplanır; sayfa digest'lerine kaynak
+        metni yerine bu kısa hash girer.
+        """
+        digest = self._template_digests.get(name)
+        if digest is None:
+            source, _, _ = self.env.loader.get_source(self.env, name)
+            digest = self._template_digests[name] = input_digest(source)
+        return digest
     
     def _update_media_paths(self, posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -69,22 +281,62 @@ class WebSiteGenerator:
         """
         image_mapping = self.media_mappings.get('images', {})
         attachment_mapping = self.media_mappings.get('attachments', {})
+        derivative_mapping = self.media_mappings.get('derivatives', {})
+        webp_mapping = self.media_mappings.get('webp', {})
+        base_url = self.thread_info.get('base_url', '')
         
         for post in posts:
-            # Görselleri güncelle
+            # Görselleri güncelle (mapping'ler kanonik URL ile tutulur)
             for img in post.get('images', []):
-                original_url = img.get('data_src') or img.get('src')
+                original_url = canonicalize_media_url(img.get('data_src') or img.get('src') or '', base_url)
                 if original_url in image_mapping:
                     img['local_path'] = image_mapping[original_url]
+                
+                # Orijinal fallback olarak kalırsa WebP <picture> source olarak sunulur
+                webp_path = webp_mapping.get(original_url)
+                if webp_path and webp_path != img.get('local_path'):
+                    img['webp_path'] = webp_path
+                
+                # Thumbnail ve srcset türevleri
+                derivatives = derivative_mapping.get(original_url)
+                if derivatives:
+                    thumbnail = derivatives['thumbnail']
+                    img['thumbnail_path'] = thumbnail['path']
+                    img['srcset'] = [thumbnail] + derivatives['variants']
+                    # WebP <source> sadece her genişliğin WebP karşılığı varsa kurulur
+                    if all(item.get('webp_path') for item in img['srcset']):
+                        img['webp_srcset'] = [
+                            {'path': item['webp_path'], 'width': item['width']} for item in img['srcset']
+                        ]
+                    img['width'] = derivatives['width']
+                    img['height'] = derivatives['height']
             
             # Ekleri güncelle
             for att in post.get('attachments', []):
-                original_url = att.get('url')
+                original_url = canonicalize_media_url(att.get('url') or '', base_url)
                 if original_url in attachment_mapping:
                     att['local_path'] = attachment_mapping[original_url]
+            
+            # Gömülü görseller ve ek bağlantıları (cache'lenir; post başına bir kez ayrıştırılır)
+            post['content_html_local'] = self.content_rewriter.rewrite(post.get('content_html', ''))
         
         return posts
     
+    @staticmethod
+    def _collapse_duplicates(posts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Tekrar olarak işaretlenmiş postları çıkarır.
+        
+        Kanonik post kalır ve 'duplicate_count' ile gizlenen kopya sayısını taşır.
+        
+        Args:
+            posts: Post listesi
+        
+        Returns:
+            Tekrarları çıkarılmış post listesi
+        """
+        return [post for post in posts if not post.get('duplicate_of')]
+    
     def _create_css(self) -> None:
         """Ana CSS dosyasını oluşturur."""
         css_content = """
@@ -336,6 +588,22 @@ nav a:hover {
     color: var(--text-color);
 }
 
+.pagination {
+    display: flex;
+    justify-content: center;
+    align-items: center;
+    gap: 15px;
+    margin: 20px 0;
+}
+
+.pagination a {
+    padding: 8px 16px;
+    background: var(--primary-color);
+    color: white;
+    text-decoration: none;
+    border-radius: 5px;
+}
+
 footer {
     background: #333;
     color: white;
@@ -371,6 +639,9 @@ footer {
     }
 }
 """
+        if not self._needs_update('css/style.css', css_content):
+            return
+        
         css_dir = self.output_dir / 'css'
         css_dir.mkdir(parents=True, exist_ok=True)
         
@@ -379,6 +650,23 @@ footer {
         
         logger.info(f"CSS dosyası oluşturuldu: {css_file}")
     
+    def rewrite_content_media(self, workers: int = config.RENDER_WORKERS) -> None:
+        """
+        Tüm postların content_html'ini sayfalar oluşturulmadan önce toplu olarak yeniden yazar.
+        
+        Sonuçlar content_rewriter cache'inde tutulur; sayfa oluşturma
+        sırasında her post için sadece cache'e bakılır.
+        
+        Args:
+            workers: İşçi süreç sayısı (0 = CPU sayısı, 1 = seri)
+        """
+        contents = [
+            post.get('content_html', '')
+            for posts in self.categorized_posts.values()
+            for post in self._collapse_duplicates(posts)
+        ]
+        self.content_rewriter.rewrite_all(contents, workers)
+    
     def generate_index_page(self) -> None:
         """Ana sayfa HTML'ini oluşturur."""
         logger.info("Ana sayfa oluşturuluyor...")
@@ -388,97 +676,304 @@ footer {
         # Kategorilere göre post sayılarını hazırla
         category_data = []
         for category, posts in self.categorized_posts.items():
+            posts = self._collapse_duplicates(posts)
             if posts:
                 category_data.append({
                     'name': category,
                     'count': len(posts),
-                    'posts': posts[:5]  # İlk 5 post
+                    'posts': self._update_media_paths(posts[:5])  # İlk 5 post
                 })
         
-        html_content = template.render(
+        # Oluşturma tarihi girdi sayılmaz; sadece içerik değişince yeniden yazılır.
+        # Post bağlantıları dizin düzenine bağlı olduğu için düzen de girdidir.
+        if not self._needs_update(
+            'index.html', self._template_digest('index.html'), self.thread_info.get('title'),
+            self.thread_info.get('url'), category_data, self.stats, config.POST_LAYOUT, config.POST_SHARD_DEPTH
+        ):
+            logger.info("Ana sayfa değişmedi")
+            return
+        
+        output_file = self.output_dir / 'index.html'
+        render_to_file(
+            template,
+            output_file,
             thread_info=self.thread_info,
             categories=category_data,
             stats=self.stats,
             generation_date=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
         )
         
-        output_file = self.output_dir / 'index.html'
-        output_file.write_text(html_content, encoding='utf-8')
-        
         logger.info(f"Ana sayfa oluşturuldu: {output_file}")
     
-    def generate_category_pages(self) -> None:
-        """Kategori sayfalarını oluşturur."""
+    def generate_category_pages(self, page_size: int = config.CATEGORY_PAGE_SIZE) -> None:
+        """
+        Kategori sayfalarını sayfalara bölerek oluşturur.
+        
+        Postlar dilim dilim işlenir; her sayfa için sadece o sayfanın postları
+        güncellenip template'e verilir.
+        
+        Args:
+            page_size: Sayfa başına post sayısı
+        """
         logger.info("Kategori sayfaları oluşturuluyor...")
         
         template = self.env.get_template('category.html')
+        # Sadece template'in kullandığı değerler digest'e girer (thread başlığı,
+        # post bağlantılarını belirleyen dizin düzeni); istatistikler gösterilmez
+        page_inputs = (
+            self._template_digest('category.html'),
+            self.thread_info.get('title'),
+            config.POST_LAYOUT,
+            config.POST_SHARD_DEPTH
+        )
         
         for category, posts in self.categorized_posts.items():
+            posts = self._collapse_duplicates(posts)
             if not posts:
                 continue
             
-            # Medya path'lerini güncelle
-            posts = self._update_media_paths(posts)
-            
-            html_content = template.render(
-                category=category,
-                posts=posts,
-                thread_info=self.thread_info,
-                stats=self.stats
-            )
-            
-            output_file = self.output_dir / f'{category}.html'
-            output_file.write_text(html_content, encoding='utf-8')
+            page_count = (len(posts) + page_size - 1) // page_size
+            for page in range(1, page_count + 1):
+                # Medya path'lerini sadece bu sayfanın postları için güncelle
+                page_posts = self._update_media_paths(posts[(page - 1) * page_size:page * page_size])
+                
+                pagination = {
+                    'page': page,
+                    'page_count': page_count,
+                    'total_posts': len(posts),
+                    'first_url': category_page_name(category, 1),
+                    'last_url': category_page_name(category, page_count),
+                    'prev_url': category_page_name(category, page - 1) if page > 1 else None,
+                    'next_url': category_page_name(category, page + 1) if page < page_count else None
+                }
+                
+                page_name = category_page_name(category, page)
+                if not self._needs_update(page_name, *page_inputs, category, page_posts, pagination):
+                    continue
+                
+                render_to_file(
+                    template,
+                    self.output_dir / page_name,
+                    category=category,
+                    posts=page_posts,
+                    pagination=pagination,
+                    thread_info=self.thread_info,
+                    stats=self.stats
+                )
             
-            logger.info(f"Kategori sayfası oluşturuldu: {output_file} ({len(posts)} post)")
+            logger.info(f"Kategori sayfaları oluşturuldu: {category} ({len(posts)} post, {page_count} sayfa)")
     
-    def generate_post_pages(self) -> None:
-        """Tekil post sayfalarını oluşturur."""
-        logger.info("Post sayfaları oluşturuluyor...")
-        
-        template = self.env.get_template('post.html')
+    def generate_post_pages(self, workers: int = config.RENDER_WORKERS) -> None:
+        """
+        Tekil post sayfalarını oluşturur.
         
-        posts_dir = self.output_dir / 'posts'
-        posts_dir.mkdir(parents=True, exist_ok=True)
+        Args:
+            workers: İşçi süreç sayısı (0 = CPU sayısı, 1 = seri)
+        """
+        logger.info("Post sayfaları oluşturuluyor...")
         
         total_posts = sum(len(posts) for posts in self.categorized_posts.values())
-        generated = 0
         
+        # thread_info'dan sadece başlık gösterilir; toplam sayfa sayısı gibi
+        # alanlar değişince milyonlarca sayfa yeniden yazılmasın
+        template_digest = self._template_digest('post.html')
+        thread_title = self.thread_info.get('title')
+        items: List[Tuple[str, str, Dict[str, Any]]] = []
+        unchanged = 0
         for category, posts in self.categorized_posts.items():
-            posts = self._update_media_paths(posts)
+            posts = self._update_media_paths(self._collapse_duplicates(posts))
             
             for post in posts:
-                post_id = post.get('post_id', generated)
-                
-                html_content = template.render(
+                page_path = post_page_path(post.get('post_id', len(items) + unchanged))
+                # Sadece girdileri (post, kategori, template) değişen sayfalar render edilir
+                if self._needs_update(page_path, template_digest, thread_title, category, post):
+                    items.append((page_path, category, post))
+                else:
+                    unchanged += 1
+        
+        # Parçalı düzende dizinler sayfa başına değil, bir kez oluşturulur
+        for directory in {page_path.rpartition('/')[0] for page_path, _, _ in items}:
+            (self.output_dir / directory).mkdir(parents=True, exist_ok=True)
+        
+        workers = workers or os.cpu_count() or 1
+        chunk_size = config.RENDER_CHUNK_SIZE
+        if workers > 1 and len(items) > chunk_size:
+            generated = self._render_parallel(items, workers, chunk_size)
+        else:
+            template = self.env.get_template('post.html')
+            for page_path, category, post in items:
+                render_to_file(
+                    template,
+                    self.output_dir / page_path,
                     post=post,
                     category=category,
-                    thread_info=self.thread_info
+                    thread_info=self.thread_info,
+                    root=root_prefix(page_path)
                 )
-                
-                output_file = posts_dir / f'post_{post_id}.html'
-                output_file.write_text(html_content, encoding='utf-8')
-                
-                generated += 1
+            generated = len(items)
         
-        logger.info(f"{generated}/{total_posts} post sayfası oluşturuldu")
+        hidden = total_posts - generated - unchanged
+        logger.info(
+            f"{generated}/{total_posts} post sayfası oluşturuldu "
+            f"({unchanged} değişmedi, {hidden} tekrar gizlendi)"
+        )
     
-    def copy_media_files(self, media_dir: Path) -> None:
-        """Medya dosyalarını web sitesi dizinine kopyalar."""
-        if not media_dir.exists():
-            logger.warning(f"Medya dizini bulunamadı: {media_dir}")
+    def _render_parallel(
+        self,
+        items: List[Tuple[str, str, Dict[str, Any]]],
+        workers: int,
+        chunk_size: int
+    ) -> int:
+        """
+        Post sayfalarını işçi süreçlere dağıtarak render eder.
+        
+        Her işçi kendi Jinja2 environment'ını kurar ve dosyaları doğrudan
+        yazar; ana sürece sadece yazılan sayfa yolları döner.
+        
+        Args:
+            items: (sayfa yolu, kategori, post) listesi
+            workers: İşçi süreç sayısı
+            chunk_size: İşçiye tek seferde gönderilen post sayısı
+        
+        Returns:
+            Oluşturulan sayfa sayısı
+        """
+        chunks = [items[start:start + chunk_size] for start in range(0, len(items), chunk_size)]
+        generated = 0
+        
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_render_worker,
+            initargs=(self.templates_dir, self.template_cache_dir, self.output_dir, self.thread_info)
+        ) as executor:
+            for page_paths in executor.map(_render_post_chunk, chunks):
+                generated += len(page_paths)
+        
+        return generated
+    
+    def _write_json(self, relative_path: str, data: Any) -> int:
+        """
+        Veriyi sıkıştırılmış JSON olarak yazar (içerik değiştiyse).
+        
+        Args:
+            relative_path: Çıktı dizinine göre dosya yolu
+            data: JSON'a çevrilecek veri
+        
+        Returns:
+            Dosyanın bayt cinsinden boyutu
+        """
+        content = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        if self._needs_update(relative_path, content):
+            output_file = self.output_dir / relative_path
+            output_file.parent.mkdir(parents=True, exist_ok=True)
+            output_file.write_text(content, encoding='utf-8')
+        return len(content.encode('utf-8'))
+    
+    def generate_search_index(self) -> None:
+        """
+        İstemci tarafı arama indeksini ve arama sayfasını oluşturur.
+        
+        Terimler önek parçalarına (search/index/<önek>.json), uzun doküman
+        listeleri sayfalanmış ayrı dosyalara (search/terms/<terim>.<sayfa>.json),
+        post bilgileri küçük doküman tablolarına (search/docs/<n>.json)
+        yazılır; arama sayfası sadece sorgudaki terimlerin dosyalarını indirir.
+        """
+        logger.info("Arama indeksi oluşturuluyor...")
+        
+        builder = SearchIndexBuilder()
+        for category, posts in self.categorized_posts.items():
+            for post in self._collapse_duplicates(posts):
+                builder.add(post, category, post_page_path(post.get('post_id')))
+        
+        shard_count = 0
+        index_bytes = 0
+        largest_shard = 0
+        for name, shard in builder.shards():
+            size = self._write_json(f'search/index/{name}.json', shard)
+            shard_count += 1
+            index_bytes += size
+            largest_shard = max(largest_shard, size)
+        
+        term_files = 0
+        for name, deltas in builder.postings_files():
+            index_bytes += self._write_json(f'search/terms/{name}.json', deltas)
+            term_files += 1
+        
+        for number, rows in builder.doc_files():
+            self._write_json(f'search/docs/{number}.json', rows)
+        
+        template_digest = self._template_digest('search.html')
+        search_config = {
+            'prefix_length': builder.prefix_length,
+            'docs_per_file': builder.docs_per_file,
+            'postings_per_file': builder.postings_per_file
+        }
+        if self._needs_update('search.html', template_digest, search_config, self.thread_info.get('title')):
+            render_to_file(
+                self.env.get_template('search.html'),
+                self.output_dir / 'search.html',
+                search_config=search_config,
+                thread_info=self.thread_info
+            )
+        
+        logger.info(
+            f"Arama indeksi oluşturuldu: {len(builder.docs)} post, {shard_count} parça, {term_files} uzun liste sayfası, "
+            f"{format_file_size(index_bytes)} (en büyük parça {format_file_size(largest_shard)})"
+        )
+    
+    def generate_redirect_map(self) -> None:
+        """
+        Eski düz post yollarından parçalı yollara yönlendirme tablosunu yazar.
+        
+        Tablo Netlify/Cloudflare Pages _redirects biçimindedir; her satır
+        "/posts/post_<id>.html /<yeni yol> 301" şeklindedir ve nginx map'ine
+        kolayca dönüştürülebilir. Düz düzende tablo yazılmaz (varsa manifest
+        tarafından silinir).
+        """
+        if config.POST_LAYOUT == 'flat':
             return
         
-        logger.info("Medya dosyaları kopyalanıyor...")
+        post_ids = [
+            post['post_id']
+            for posts in self.categorized_posts.values()
+            for post in self._collapse_duplicates(posts)
+            if post.get('post_id') is not None
+        ]
+        if not self._needs_update(REDIRECTS_FILE, config.POST_LAYOUT, config.POST_SHARD_DEPTH, post_ids):
+            return
         
-        dest_dir = self.output_dir / media_dir.name
+        # Satırlar tek bir string'de toplanmadan, tamponlu olarak yazılır
+        output_file = self.output_dir / REDIRECTS_FILE
+        tmp_file = output_file.with_name(output_file.name + '.part')
+        with open(tmp_file, 'w', encoding='utf-8', buffering=config.RENDER_BUFFER_SIZE) as f:
+            f.writelines(
+                f"/posts/post_{post_id}.html /{post_page_path(post_id)} 301\n" for post_id in post_ids
+            )
+        tmp_file.replace(output_file)
         
-        if dest_dir.exists():
-            shutil.rmtree(dest_dir)
+        logger.info(f"Yönlendirme tablosu oluşturuldu: {output_file} ({len(post_ids)} post)")
+    
+    def copy_media_files(self, media_dir: Path) -> Dict[str, int]:
+        """
+        Medya dosyalarını web sitesi dizinine artımlı olarak aktarır.
         
-        shutil.copytree(media_dir, dest_dir)
+        Sadece yeni veya değişen dosyalar bağlanır/kopyalanır, kaynağı
+        silinen dosyalar hedeften kaldırılır.
         
-        logger.info(f"Medya dosyaları kopyalandı: {dest_dir}")
+        Args:
+            media_dir: İndirilen medya dizini
+        
+        Returns:
+            Senkronizasyon istatistikleri
+        """
+        if not media_dir.exists():
+            logger.warning(f"Medya dizini bulunamadı: {media_dir}")
+            return {}
+        
+        logger.info("Medya dosyaları senkronize ediliyor...")
+        
+        dest_dir = self.output_dir / media_dir.name
+        return MediaSync(media_dir, dest_dir).sync()
     
     def generate_site(self, copy_media: bool = True) -> bool:
         """
@@ -496,6 +991,12 @@ footer {
             # Çıktı dizinini oluştur
             self.output_dir.mkdir(parents=True, exist_ok=True)
             
+            # Önceki derlemenin manifest'i; sadece girdisi değişen sayfalar yazılır
+            self.manifest = BuildManifest(self.output_dir, force=not config.INCREMENTAL_BUILD)
+            
+            # Gömülü medya URL'lerini yerel kopyalara yönlendir
+            self.rewrite_content_media()
+            
             # CSS oluştur
             self._create_css()
             
@@ -503,6 +1004,9 @@ footer {
             self.generate_index_page()
             self.generate_category_pages()
             self.generate_post_pages()
+            self.generate_redirect_map()
+            if config.SEARCH_INDEX_ENABLED:
+                self.generate_search_index()
             
             # Medya dosyalarını kopyala
             if copy_media and self.media_mappings:
@@ -510,9 +1014,16 @@ footer {
                 if media_base.exists():
                     self.copy_media_files(media_base)
             
+            # Metin dosyalarının .gz kopyalarını yaz (gzip_static için)
+            if config.GZIP_SIDECARS:
+                write_gzip_sidecars(self.manifest)
+            
+            # Eski çıktıları sil, manifest'i ve değişen dosya listesini yaz
+            self.manifest.finish()
+            
             logger.info(f"Web sitesi başarıyla oluşturuldu: {self.output_dir}")
             return True
-            
+        
         except Exception as e:
             logger.error(f"Web sitesi oluşturulurken hata: {e}")
             return False
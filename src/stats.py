@@ -0,0 +1,161 @@
+"""
+XenForo Forum Archiver - Statistics Module
+
+This module collects categorization statistics in a single streaming pass.
+"""
+
+import heapq
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import config
+
+
+class HeavyHitters:
+    """
+    Bounded-memory counter of the most frequent items (Misra-Gries).
+    
+    Counts are exact until more than twice `capacity` distinct items have
+    been seen. Then the counters are reduced back to at most `capacity`;
+    every count is a lower bound that is off by at most
+    total / (capacity + 1), so any item occurring more often than that is
+    guaranteed to be tracked. Capacity 0 keeps exact counts of every item.
+    """
+    
+    def __init__(self, capacity: int = config.STATS_AUTHOR_CAPACITY):
+        """
+        Args:
+            capacity: Maximum number of counters (0 = exact)
+        """
+        self.capacity = capacity
+        self.counts: Counter = Counter()
+        self.total = 0
+        self.exact = True
+    
+    def add(self, item: str, count: int = 1) -> None:
+        """
+        Counts an item.
+        
+        Args:
+            item: Item to count
+            count: Number of occurrences
+        """
+        self.total += count
+        self.counts[item] += count
+        if self.capacity and len(self.counts) > 2 * self.capacity:
+            self._reduce()
+    
+    def _reduce(self) -> None:
+        """Subtracts the (capacity + 1)-th largest count from all counters and drops the empty ones."""
+        self.exact = False
+        # Reducing only at twice the capacity removes at least `capacity`
+        # counters at once, which keeps the cost amortized per added item
+        cut = heapq.nlargest(self.capacity + 1, self.counts.values())[-1]
+        self.counts = Counter({item: count - cut for item, count in self.counts.items() if count > cut})
+    
+    def merge(self, other: 'HeavyHitters') -> None:
+        """
+        Merges another counter, e.g. one filled by a parallel worker.
+        
+        The merged counter keeps the error bound of a single counter over
+        both streams.
+        
+        Args:
+            other: Counter to merge
+        """
+        self.total += other.total
+        self.exact = self.exact and other.exact
+        self.counts.update(other.counts)
+        if self.capacity and len(self.counts) > 2 * self.capacity:
+            self._reduce()
+    
+    def most_common(self, n: int) -> List[Tuple[str, int]]:
+        """
+        Returns the n most frequent items.
+        
+        Args:
+            n: Number of items
+        
+        Returns:
+            (item, count) pairs, most frequent first
+        """
+        return self.counts.most_common(n)
+
+
+class StatsAccumulator:
+    """
+    Categorization statistics updated one post at a time.
+    
+    Category, content type and media totals take constant memory; authors
+    are tracked by a HeavyHitters counter. Accumulators filled on separate
+    chunks can be merged.
+    """
+    
+    def __init__(
+        self,
+        categories: Optional[Iterable[str]] = None,
+        author_capacity: int = config.STATS_AUTHOR_CAPACITY
+    ):
+        """
+        Args:
+            categories: Category names to report even when empty
+            author_capacity: Maximum number of author counters (0 = exact)
+        """
+        self.total_posts = 0
+        self.categories: Counter = Counter({category: 0 for category in categories or []})
+        self.content_types: Counter = Counter()
+        self.authors = HeavyHitters(author_capacity)
+        self.total_images = 0
+        self.total_videos = 0
+        self.total_attachments = 0
+    
+    def add(self, post: Dict[str, Any]) -> None:
+        """
+        Counts a categorized post.
+        
+        Args:
+            post: Post data
+        """
+        self.total_posts += 1
+        self.categories[post.get('category', 'other')] += 1
+        self.content_types[post.get('content_type', 'unknown')] += 1
+        self.authors.add(post.get('author', 'Unknown'))
+        self.total_images += len(post.get('images', []))
+        self.total_videos += len(post.get('videos', []))
+        self.total_attachments += len(post.get('attachments', []))
+    
+    def merge(self, other: 'StatsAccumulator') -> None:
+        """
+        Merges statistics collected on another chunk.
+        
+        Args:
+            other: Accumulator to merge
+        """
+        self.total_posts += other.total_posts
+        self.categories.update(other.categories)
+        self.content_types.update(other.content_types)
+        self.authors.merge(other.authors)
+        self.total_images += other.total_images
+        self.total_videos += other.total_videos
+        self.total_attachments += other.total_attachments
+    
+    def to_dict(self, top_authors: int = 10) -> Dict[str, Any]:
+        """
+        Returns the statistics dictionary.
+        
+        Args:
+            top_authors: Number of most active authors to report
+        
+        Returns:
+            Statistics dictionary
+        """
+        return {
+            'total_posts': self.total_posts,
+            'category_distribution': dict(self.categories),
+            'content_type_distribution': dict(self.content_types),
+            'author_distribution': dict(self.authors.most_common(top_authors)),
+            'author_counts_exact': self.authors.exact,
+            'total_images': self.total_images,
+            'total_videos': self.total_videos,
+            'total_attachments': self.total_attachments
+        }
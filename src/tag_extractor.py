@@ -0,0 +1,228 @@
+"""
+XenForo Forum Archiver - Tag Extractor Module
+
+This module extracts tags from posts by TF-IDF over the whole archive.
+"""
+
+import heapq
+import math
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple
+
+from src.utils import setup_logger
+import config
+
+
+logger = setup_logger(__name__, config.LOG_FILE, config.LOG_LEVEL)
+
+
+# Words of at least three letters; digits and underscores split words
+TOKEN_PATTERN = re.compile(r'[^\W\d_]{3,}')
+
+# IDF table of the current worker process (set by _init_worker)
+_worker_idf: Dict[str, float] = {}
+_worker_tags_per_post = 0
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Splits text into lowercased word tokens.
+    
+    Args:
+        text: Text to split
+    
+    Returns:
+        List of tokens
+    """
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+def prune_vocabulary(frequencies: Counter, max_size: int) -> Counter:
+    """
+    Keeps only the most frequent terms.
+    
+    Args:
+        frequencies: Term -> document frequency
+        max_size: Number of terms to keep
+    
+    Returns:
+        Pruned counter
+    """
+    if len(frequencies) <= max_size:
+        return frequencies
+    return Counter(dict(heapq.nlargest(max_size, frequencies.items(), key=lambda item: item[1])))
+
+
+def _count_chunk(args: Tuple[List[str], int]) -> Tuple[int, Counter]:
+    """
+    Counts document frequencies of a chunk of texts (first pass).
+    
+    Args:
+        args: (texts, vocabulary size)
+    
+    Returns:
+        (document count, term -> document frequency)
+    """
+    texts, max_vocab = args
+    frequencies: Counter = Counter()
+    for text in texts:
+        frequencies.update(set(tokenize(text)))
+        # Prune at twice the limit so pruning cost stays amortized O(1) per token
+        if len(frequencies) > 2 * max_vocab:
+            frequencies = prune_vocabulary(frequencies, max_vocab)
+    return len(texts), prune_vocabulary(frequencies, max_vocab)
+
+
+def _top_tags(text: str, idf: Dict[str, float], count: int) -> List[str]:
+    """
+    Picks the highest TF-IDF terms of a text.
+    
+    Args:
+        text: Text of the post
+        idf: Term -> inverse document frequency
+        count: Number of tags
+    
+    Returns:
+        Tags, best first (ties are broken alphabetically)
+    """
+    term_counts = Counter(token for token in tokenize(text) if token in idf)
+    best = heapq.nsmallest(
+        count,
+        term_counts.items(),
+        key=lambda item: (-item[1] * idf[item[0]], item[0])
+    )
+    return [term for term, _ in best]
+
+
+def _init_worker(idf: Dict[str, float], tags_per_post: int) -> None:
+    """Stores the IDF table once per worker process."""
+    global _worker_idf, _worker_tags_per_post
+    _worker_idf = idf
+    _worker_tags_per_post = tags_per_post
+
+
+def _tag_chunk(texts: List[str]) -> List[List[str]]:
+    """Picks the tags of a chunk of texts in a worker process (second pass)."""
+    return [_top_tags(text, _worker_idf, _worker_tags_per_post) for text in texts]
+
+
+class TfidfTagExtractor:
+    """
+    Corpus-aware tag extractor.
+    
+    The first pass streams over the texts and counts in how many posts each
+    term occurs, keeping the vocabulary bounded by pruning the rarest terms.
+    The second pass scores the terms of every post by TF-IDF and keeps the
+    best ones. Terms in too few posts (typos, one-offs) or too many posts
+    (stop words) never become tags. Both passes are linear in the number of
+    tokens and can be split into chunks across worker processes.
+    """
+    
+    def __init__(
+        self,
+        tags_per_post: int = config.TAGS_PER_POST,
+        max_vocab: int = config.TAG_VOCAB_SIZE,
+        min_df: int = 2,
+        max_df_ratio: float = 0.25
+    ):
+        """
+        Args:
+            tags_per_post: Maximum number of tags per post
+            max_vocab: Maximum number of terms kept in the vocabulary
+            min_df: Minimum number of posts a tag must occur in
+            max_df_ratio: Maximum share of posts a tag may occur in
+        """
+        self.tags_per_post = tags_per_post
+        self.max_vocab = max_vocab
+        self.min_df = min_df
+        self.max_df_ratio = max_df_ratio
+        self.document_count = 0
+        self.frequencies: Counter = Counter()
+        self.idf: Dict[str, float] = {}
+    
+    def update(self, document_count: int, frequencies: Counter) -> None:
+        """
+        Merges document frequencies counted on a chunk.
+        
+        Args:
+            document_count: Number of texts in the chunk
+            frequencies: Term -> document frequency of the chunk
+        """
+        self.document_count += document_count
+        self.frequencies.update(frequencies)
+        if len(self.frequencies) > 2 * self.max_vocab:
+            self.frequencies = prune_vocabulary(self.frequencies, self.max_vocab)
+    
+    def fit(self, texts: List[str], workers: int = 1, chunk_size: int = config.CATEGORIZE_CHUNK_SIZE) -> None:
+        """
+        Builds document frequencies and the IDF table (first pass).
+        
+        Args:
+            texts: Texts of all posts
+            workers: Number of worker processes (1 = serial)
+            chunk_size: Texts per chunk
+        """
+        chunks = [(texts[start:start + chunk_size], self.max_vocab) for start in range(0, len(texts), chunk_size)]
+        if workers > 1 and len(chunks) > 1:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for document_count, frequencies in executor.map(_count_chunk, chunks):
+                    self.update(document_count, frequencies)
+        else:
+            for chunk in chunks:
+                self.update(*_count_chunk(chunk))
+        
+        self.frequencies = prune_vocabulary(self.frequencies, self.max_vocab)
+        # On small archives the ratio alone would fall below min_df and reject every term
+        max_df = max(self.min_df, self.max_df_ratio * self.document_count)
+        self.idf = {
+            term: math.log((1 + self.document_count) / (1 + frequency)) + 1
+            for term, frequency in self.frequencies.items()
+            if self.min_df <= frequency <= max_df
+        }
+        logger.info(f"Tag vocabulary: {len(self.idf)} terms from {self.document_count} posts")
+    
+    def transform(
+        self,
+        texts: List[str],
+        workers: int = 1,
+        chunk_size: int = config.CATEGORIZE_CHUNK_SIZE
+    ) -> List[List[str]]:
+        """
+        Picks the tags of every text (second pass).
+        
+        Args:
+            texts: Texts of all posts
+            workers: Number of worker processes (1 = serial)
+            chunk_size: Texts per chunk
+        
+        Returns:
+            Tags of each text, in order
+        """
+        if workers > 1 and len(texts) > chunk_size:
+            chunks = [texts[start:start + chunk_size] for start in range(0, len(texts), chunk_size)]
+            results: List[List[str]] = []
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(self.idf, self.tags_per_post)
+            ) as executor:
+                for tags in executor.map(_tag_chunk, chunks):
+                    results.extend(tags)
+            return results
+        return [_top_tags(text, self.idf, self.tags_per_post) for text in texts]
+    
+    def fit_transform(self, texts: List[str], workers: int = 1) -> List[List[str]]:
+        """
+        Runs both passes.
+        
+        Args:
+            texts: Texts of all posts
+            workers: Number of worker processes (1 = serial)
+        
+        Returns:
+            Tags of each text, in order
+        """
+        self.fit(texts, workers)
+        return self.transform(texts, workers)
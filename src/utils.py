@@ -6,9 +6,12 @@ Bu modül projede kullanılan yardımcı fonksiyonları içerir.
 
 import logging
 import re
+import threading
+import time
+from functools import lru_cache
 from pathlib import Path
 from typing import Optional
-from urllib.parse import urlparse, urljoin
+from urllib.parse import urlparse, urljoin, urlunparse, parse_qs, parse_qsl, urlencode, quote
 
 
 def setup_logger(name: str, log_file: Optional[Path] = None, level: str = 'INFO') -> logging.Logger:
@@ -131,6 +134,108 @@ def make_absolute_url(base_url: str, relative_url: str) -> str:
     return urljoin(base_url, relative_url)
 
 
+# XenForo ek dosya route'u: attachments/<slug>.<id>/ veya attachments/<id>/
+XENFORO_ATTACHMENT_PATTERN = re.compile(r'^(?P<prefix>.*?/)?attachments/(?:(?P<slug>[^/]*)\.)?(?P<id>\d+)/?$')
+
+# Forum URL'lerinde aynı dosyayı gösterirken değişebilen sorgu parametreleri
+VOLATILE_QUERY_PARAMS = {'hash'}
+
+
+def _normalize_netloc(scheme: str, netloc: str) -> str:
+    """Host'u küçük harfe çevirir ve şemanın varsayılan portunu atar."""
+    netloc = netloc.lower()
+    if (scheme, netloc.rsplit(':', 1)[-1]) in (('http', '80'), ('https', '443')):
+        netloc = netloc.rsplit(':', 1)[0]
+    return netloc
+
+
+@lru_cache(maxsize=65536)
+def canonicalize_media_url(url: str, base_url: str = '') -> str:
+    """
+    Aynı medya dosyasını gösteren farklı URL biçimlerini tek bir URL'ye indirger.
+    
+    Göreceli URL'ler mutlak yapılır, XenForo görsel proxy'si (proxy.php?image=)
+    açılır ve ek dosya URL'leri slug, sorgu parametresi ve sondaki eğik çizgiden
+    bağımsız olarak attachments/<id>/ biçimine getirilir. VOLATILE_QUERY_PARAMS
+    sadece forumun kendi URL'lerinden atılır; başka sitelerde bu parametreler
+    dosyanın parçası olabilir.
+    
+    Args:
+        url: Orijinal medya URL'si
+        base_url: Göreceli URL'ler için ana URL
+    
+    Returns:
+        Kanonik URL
+    """
+    url = url.strip()
+    if not url:
+        return url
+    if base_url:
+        url = urljoin(base_url, url)
+    
+    parsed = urlparse(url)
+    path = parsed.path
+    query = parsed.query
+    
+    # Görsel proxy'si: asıl URL image (veya link) parametresindedir
+    if path.endswith('/proxy.php'):
+        params = parse_qs(query)
+        inner = params.get('image') or params.get('link')
+        if inner:
+            return canonicalize_media_url(inner[0], base_url)
+    
+    scheme = parsed.scheme.lower()
+    netloc = _normalize_netloc(scheme, parsed.netloc)
+    
+    # Dostu olmayan URL'ler: /index.php?attachments/foo-jpg.123/
+    if path.endswith('/index.php') and query.startswith('attachments/'):
+        path = path[:-len('index.php')] + query.split('&', 1)[0]
+        query = ''
+    
+    match = XENFORO_ATTACHMENT_PATTERN.match(path)
+    if match:
+        prefix = match.group('prefix') or '/'
+        return urlunparse((scheme, netloc, f"{prefix}attachments/{match.group('id')}/", '', '', ''))
+    
+    forum = urlparse(base_url)
+    is_forum_url = bool(base_url) and netloc == _normalize_netloc(forum.scheme.lower(), forum.netloc)
+    params = sorted(
+        (key, value) for key, value in parse_qsl(query, keep_blank_values=True)
+        if not (is_forum_url and key in VOLATILE_QUERY_PARAMS)
+    )
+    return urlunparse((scheme, netloc, path, parsed.params, urlencode(params, quote_via=quote), ''))
+
+
+def attachment_filename(url: str) -> Optional[str]:
+    """
+    XenForo ek dosya URL'sinin slug'ından dosya adını çıkarır.
+    
+    Args:
+        url: Ek dosya URL'si (örn. /attachments/ekran-goruntusu-png.123/)
+    
+    Returns:
+        Dosya adı (örn. ekran-goruntusu.png) veya None
+    """
+    parsed = urlparse(url)
+    path = parsed.path
+    if path.endswith('/index.php') and parsed.query.startswith('attachments/'):
+        path = '/' + parsed.query.split('&', 1)[0]
+    
+    match = XENFORO_ATTACHMENT_PATTERN.match(path)
+    if not match:
+        return None
+    
+    slug = match.group('slug')
+    if not slug:
+        return f"attachment_{match.group('id')}"
+    
+    # XenForo uzantıdaki noktayı tireye çevirir: foto-jpg -> foto.jpg
+    name, sep, ext = slug.rpartition('-')
+    if sep and name and ext.isalnum() and len(ext) <= 5:
+        return f"{name}.{ext}"
+    return slug
+
+
 def extract_youtube_id(url: str) -> Optional[str]:
     """
     YouTube URL'sinden video ID'sini çıkarır.
@@ -202,3 +307,30 @@ def truncate_text(text: str, max_length: int = 150, suffix: str = '...') -> str:
     if len(text) <= max_length:
         return text
     return text[:max_length - len(suffix)].rstrip() + suffix
+
+
+class RateLimiter:
+    """Birden fazla thread arasında paylaşılan istek hızı sınırlayıcı."""
+    
+    def __init__(self, rate: float):
+        """
+        Args:
+            rate: Saniyedeki maksimum istek sayısı (0 = sınırsız)
+        """
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_time = 0.0
+    
+    def wait(self) -> None:
+        """Bir sonraki isteğin zamanı gelene kadar bekler."""
+        if not self.interval:
+            return
+        
+        # Sıradaki zaman dilimini kilit altında ayır, uykuyu kilit dışında yap
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next_time, now)
+            self._next_time = slot + self.interval
+        
+        if slot > now:
+            time.sleep(slot - now)
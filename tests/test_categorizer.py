@@ -5,6 +5,7 @@ This file contains test scenarios for the ContentCategorizer class.
 """
 
 import unittest
+from unittest import mock
 from pathlib import Path
 import sys
 
@@ -12,10 +13,56 @@ import sys
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from src.categorizer import ContentCategorizer
+from src.categorizer import (
+    ContentCategorizer, CategoryCache, rules_fingerprint, post_content_key, LINK_PATTERN, HASHTAG_PATTERN
+)
 import config
 
 
+def reference_content_type(post: dict) -> str:
+    """Straightforward content type rules the single-pass analysis must reproduce."""
+    content_text = post.get('content_text', '')
+    if len(post.get('videos', [])) > 0:
+        return 'video'
+    if len(post.get('images', [])) > 3:
+        return 'image'
+    if len(post.get('attachments', [])) > 0:
+        return 'attachment'
+    if '<code>' in post.get('content_html', '') or '```' in content_text:
+        return 'code'
+    if len(LINK_PATTERN.findall(content_text)) > 2:
+        return 'link'
+    return 'text'
+
+
+def reference_tags(post: dict) -> list:
+    """Straightforward tag extraction the single-pass analysis must reproduce."""
+    content_text = post.get('content_text', '')
+    tags = HASHTAG_PATTERN.findall(content_text)
+    proper_nouns = [
+        word.strip('.,!?;:') for word in content_text.split() if word and word[0].isupper() and len(word) > 3
+    ]
+    tags.extend(proper_nouns[:5])
+    return list(set([tag.lower() for tag in tags]))[:10]
+
+
+def reference_category_score(category_rules: dict, post: dict, category: str) -> float:
+    """Per-keyword category score the compiled matcher must reproduce."""
+    keywords = category_rules.get(category, {}).get('keywords', [])
+    if not keywords:
+        return 0.0
+    content_text = post.get('content_text', '').lower()
+    title_text = post.get('title', '').lower()
+    matches = 0
+    for keyword in keywords:
+        # Title hits count twice
+        if keyword.lower() in title_text:
+            matches += 2
+        if keyword.lower() in content_text:
+            matches += 1
+    return min(matches / (len(keywords) * 3), 1.0)
+
+
 class TestContentCategorizer(unittest.TestCase):
     """Test scenarios for ContentCategorizer class"""
     
@@ -135,13 +182,15 @@ class TestContentCategorizer(unittest.TestCase):
     def test_determine_content_type_video(self):
         """Video content type test"""
         post = self.sample_posts[4]
-        content_type = self.categorizer._determine_content_type(post)
+        analyzer = self.categorizer.analyzer
+        content_type = analyzer.content_type(post, analyzer.analyze(post))
         self.assertEqual(content_type, 'video')
     
     def test_determine_content_type_text(self):
         """Text content type test"""
         post = self.sample_posts[0]
-        content_type = self.categorizer._determine_content_type(post)
+        analyzer = self.categorizer.analyzer
+        content_type = analyzer.content_type(post, analyzer.analyze(post))
         self.assertEqual(content_type, 'text')
     
     def test_extract_tags(self):
@@ -149,7 +198,7 @@ class TestContentCategorizer(unittest.TestCase):
         post = {
             'content_text': 'This is a #test #python post. Python is a great language.'
         }
-        tags = self.categorizer._extract_tags(post)
+        tags = self.categorizer.analyzer.tags(self.categorizer.analyzer.analyze(post))
         
         # At least one tag should be extracted
         self.assertGreater(len(tags), 0)
@@ -204,7 +253,170 @@ class TestContentCategorizer(unittest.TestCase):
         
         category = categorizer.categorize_post(post)
         self.assertEqual(category, 'technology')
-
+    
+    def test_matcher_scores_match_per_category_scores(self):
+        """Compiled matcher gives the same scores as the per-category calculation"""
+        posts = self.sample_posts + [
+            {'title': 'News review', 'content_text': 'A renewal of the step by step setup.'},
+            {'title': '', 'content_text': 'Screenshots and photos from the gallery'},
+            {'title': 'HOW TO INSTALL', 'content_text': ''},
+        ]
+        for post in posts:
+            expected = {
+                category: reference_category_score(config.CATEGORY_RULES, post, category)
+                for category in config.CATEGORY_RULES if category != 'other'
+            }
+            self.assertEqual(self.categorizer.matcher.scores(post), expected)
+    
+    def test_matcher_shared_and_duplicate_keywords(self):
+        """Keywords shared between categories or repeated are counted like before"""
+        custom_rules = {
+            'a': {'keywords': ['new', 'news', 'new'], 'priority': 1},
+            'b': {'keywords': ['news', 'Update'], 'priority': 2},
+            'empty': {'keywords': [], 'priority': 3},
+            'other': {'keywords': [], 'priority': 99}
+        }
+        categorizer = ContentCategorizer(category_rules=custom_rules)
+        post = {'title': 'Latest news', 'content_text': 'An update is out'}
+        
+        expected = {
+            category: reference_category_score(custom_rules, post, category)
+            for category in ['a', 'b', 'empty']
+        }
+        self.assertEqual(categorizer.matcher.scores(post), expected)
+    
+    def test_categorize_batch_matches_categorize_post(self):
+        """Batch categorization gives the same results as post by post"""
+        import copy
+        posts = self.sample_posts + [
+            {'post_id': '7', 'title': 'Benchmark review', 'content_text': 'New release notes', 'images': [{}] * 4},
+            {'post_id': '8', 'title': 'news', 'content_text': 'help with the photo gallery setup'},
+            {'post_id': '9', 'title': '', 'content_text': ''},
+        ]
+        expected_posts = copy.deepcopy(posts)
+        expected = [self.categorizer.categorize_post(post) for post in expected_posts]
+        
+        batch_posts = copy.deepcopy(posts)
+        categories = ContentCategorizer().categorize_batch(batch_posts, batch_size=4)
+        
+        self.assertEqual(categories, expected)
+        self.assertEqual(batch_posts, expected_posts)
+    
+    def test_categorize_parallel_matches_categorize_post(self):
+        """Parallel categorization writes the same results back in order"""
+        import copy
+        posts = copy.deepcopy(self.sample_posts) * 3
+        expected_posts = copy.deepcopy(posts)
+        expected = [self.categorizer.categorize_post(post) for post in expected_posts]
+        
+        categories = ContentCategorizer().categorize_parallel(posts, workers=2, chunk_size=4)
+        
+        self.assertEqual(categories, expected)
+        self.assertEqual(posts, expected_posts)
+    
+    def test_text_analyzer_matches_reference_methods(self):
+        """Single-pass analysis gives the same content type and tags as the reference methods"""
+        import random
+        rng = random.Random(7)
+        words = [
+            'Python', 'Linux', 'review', 'How', 'to', '#tag', 'a#b#c', '```', 'Ubuntu,',
+            'http://a.com/x', 'https://b.org/?q=1', 'Test!', 'news', 'photo', 'Été', 'x'
+        ]
+        for _ in range(300):
+            post = {
+                'title': ' '.join(rng.choices(words, k=rng.randint(0, 5))),
+                'content_text': ' '.join(rng.choices(words, k=rng.randint(0, 40))),
+                'content_html': rng.choice(['', '<code>x</code>']),
+                'images': [{}] * rng.randint(0, 5),
+                'videos': [{}] * rng.choice([0, 0, 1]),
+                'attachments': [{}] * rng.choice([0, 0, 1])
+            }
+            analysis = self.categorizer.analyzer.analyze(post)
+            self.assertEqual(
+                self.categorizer.analyzer.content_type(post, analysis),
+                reference_content_type(post)
+            )
+            self.assertEqual(self.categorizer.analyzer.tags(analysis), reference_tags(post))
+            expected = self.categorizer.matcher.match_counts(
+                post['title'].lower(), post['content_text'].lower()
+            )
+            self.assertEqual(analysis['matches'], expected)
+    
+    def test_category_cache_reuses_and_invalidates(self):
+        """Cached results are reused and dropped when the rules change"""
+        import copy
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_file = Path(tmp) / 'category_cache.json'
+            fingerprint = rules_fingerprint(config.CATEGORY_RULES, config.EXTRACT_TAGS)
+            
+            first = copy.deepcopy(self.sample_posts)
+            ContentCategorizer(cache=CategoryCache(cache_file, fingerprint)).categorize_posts(first, workers=1)
+            
+            # Unchanged posts come from the cache, an edited one is recomputed
+            second = copy.deepcopy(self.sample_posts)
+            second[0]['content_text'] += ' edited'
+            cache = CategoryCache(cache_file, fingerprint)
+            ContentCategorizer(cache=cache).categorize_posts(second, workers=1)
+            self.assertEqual(cache.hits, len(self.sample_posts) - 1)
+            self.assertEqual(cache.misses, 1)
+            self.assertEqual(second[1:], first[1:])
+            
+            rules = copy.deepcopy(config.CATEGORY_RULES)
+            rules['news']['keywords'].append('announcement')
+            cache = CategoryCache(cache_file, rules_fingerprint(rules, config.EXTRACT_TAGS))
+            self.assertEqual(cache.entries, {})
+    
+    def test_category_cache_survives_subset_runs(self):
+        """A run over a subset keeps the other entries; only the least recently used go past max_entries"""
+        import copy
+        import tempfile
+        with tempfile.TemporaryDirectory() as tmp:
+            cache_file = Path(tmp) / 'category_cache.json'
+            fingerprint = rules_fingerprint(config.CATEGORY_RULES, config.EXTRACT_TAGS)
+            posts = copy.deepcopy(self.sample_posts)
+            
+            ContentCategorizer(cache=CategoryCache(cache_file, fingerprint)).categorize_posts(posts, workers=1)
+            ContentCategorizer(cache=CategoryCache(cache_file, fingerprint)).categorize_posts(posts[:1], workers=1)
+            
+            cache = CategoryCache(cache_file, fingerprint)
+            ContentCategorizer(cache=cache).categorize_posts(copy.deepcopy(self.sample_posts), workers=1)
+            self.assertEqual((cache.hits, cache.misses), (len(posts), 0))
+            
+            # Over the bound, the entry read by the latest run is kept
+            with mock.patch('src.categorizer.time.time', return_value=cache.run_time + 60):
+                cache = CategoryCache(cache_file, fingerprint, max_entries=1)
+                ContentCategorizer(cache=cache).categorize_posts(copy.deepcopy(posts[1:2]), workers=1)
+            self.assertEqual(list(CategoryCache(cache_file, fingerprint).entries), [post_content_key(posts[1])])
+    
+    def test_tfidf_tags_on_a_small_archive(self):
+        """categorize_posts tags a six-post archive by TF-IDF and keeps per-post tags when no term qualifies"""
+        texts = [
+            ('Kernel update', 'This kernel update fixes the wifi driver'),
+            ('Camera review', 'This camera review covers the battery life'),
+            ('Wifi crash', 'The wifi driver crashes after the kernel update'),
+            ('Battery test', 'This battery test shows camera results'),
+            ('Ubuntu notes', 'Ubuntu kernel update notes'),
+            ('Misc', 'Random unrelated qwertyuiop text'),
+        ]
+        posts = [{'post_id': str(i), 'title': title, 'content_text': text} for i, (title, text) in enumerate(texts)]
+        unrelated = [
+            {'post_id': '10', 'title': 'One', 'content_text': 'Python scripting #automation'},
+            {'post_id': '11', 'title': 'Two', 'content_text': 'Gardening tomatoes Outdoors'},
+        ]
+        
+        with mock.patch.multiple(config, EXTRACT_TAGS=True, TAG_METHOD='tfidf'):
+            ContentCategorizer().categorize_posts(posts, workers=1)
+            ContentCategorizer().categorize_posts(unrelated, workers=1)
+            single = {'title': '', 'content_text': 'Notes about Linux'}
+            ContentCategorizer().categorize_post(single)
+        
+        self.assertEqual(set(posts[0]['tags']), {'driver', 'wifi'})
+        self.assertEqual(set(posts[1]['tags']), {'battery', 'camera'})
+        self.assertEqual(posts[4]['tags'], [])
+        self.assertEqual(set(unrelated[0]['tags']), {'automation', 'python'})
+        self.assertEqual(set(unrelated[1]['tags']), {'gardening', 'outdoors'})
+        self.assertEqual(set(single['tags']), {'linux', 'notes'})
 
 def run_tests():
     """Run tests"""
@@ -0,0 +1,121 @@
+"""
+XenForo Forum Archiver - Deduplicator Tests
+
+This file contains test scenarios for the NearDuplicateDetector class.
+"""
+
+import random
+import unittest
+from pathlib import Path
+import sys
+
+# Add project root directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.deduplicator import NearDuplicateDetector, reply_text
+
+
+WORDS = (
+    "kernel driver update battery camera screen review guide install setup "
+    "python linux ubuntu windows forum thread reply release question answer"
+).split()
+
+
+def random_text(rng: random.Random, length: int = 60) -> str:
+    """Builds a random text."""
+    return ' '.join(rng.choices(WORDS, k=length))
+
+
+class TestNearDuplicateDetector(unittest.TestCase):
+    """Test scenarios for NearDuplicateDetector"""
+    
+    def setUp(self):
+        """Run before each test"""
+        self.detector = NearDuplicateDetector(num_perm=64, bands=16, threshold=0.8)
+    
+    def test_finds_copies_and_small_edits(self):
+        """Exact copies and lightly edited copies point to the first post, short replies never match"""
+        rng = random.Random(3)
+        original = random_text(rng, 200)
+        edited = original + ' thanks'
+        unrelated = random_text(rng, 200)
+        texts = [original, unrelated, original, edited, 'up', 'UP!', '']
+        
+        duplicates = self.detector.find_duplicates(texts)
+        
+        self.assertEqual(duplicates, {2: 0, 3: 0})
+    
+    def test_signature_similarity_tracks_jaccard(self):
+        """Signature agreement estimates shingle overlap"""
+        rng = random.Random(5)
+        a = random_text(rng, 300)
+        b = random_text(rng, 300)
+        agreement = (self.detector.signature(a) == self.detector.signature(b)).mean()
+        self.assertLess(agreement, 0.2)
+        self.assertIsNone(self.detector.signature('  ... '))
+    
+    def test_batch_signatures_match_single(self):
+        """Batched signatures equal one-by-one signatures"""
+        rng = random.Random(9)
+        texts = [random_text(rng, rng.randint(0, 30)) for _ in range(50)] + ['', 'ok', '!!!']
+        matrix, counts = self.detector.signatures(texts, batch_size=7)
+        for text, signature, count in zip(texts, matrix, counts):
+            expected = self.detector.signature(text)
+            if expected is None:
+                self.assertEqual(count, 0)
+            else:
+                self.assertEqual(count, max(len(text.split()) - 2, 1))
+                self.assertTrue((signature == expected).all())
+    
+    def test_mark_duplicates(self):
+        """Duplicates get duplicate_of, the canonical post gets duplicate_count"""
+        rng = random.Random(7)
+        repeated = random_text(rng, 40)
+        posts = [
+            {'post_id': '1', 'content_text': repeated},
+            {'post_id': '2', 'content_text': random_text(rng, 40)},
+            {'post_id': '3', 'content_text': repeated.upper()},
+            {'post_id': '4', 'content_text': 'Thanks!'},
+            {'post_id': '5', 'content_text': 'thanks'},
+        ]
+        
+        self.assertEqual(self.detector.mark_duplicates(posts), 1)
+        self.assertEqual(posts[2]['duplicate_of'], '1')
+        self.assertEqual(posts[0]['duplicate_count'], 1)
+        self.assertNotIn('duplicate_of', posts[1])
+        self.assertNotIn('duplicate_of', posts[4])
+    
+    def test_quoting_replies_are_not_duplicates(self):
+        """Replies that quote a post and add their own text stay visible"""
+        rng = random.Random(11)
+        original = random_text(rng, 120)
+        
+        def quoting(reply: str) -> dict:
+            html = (
+                '<div class="bbWrapper"><blockquote class="bbCodeBlock bbCodeBlock--quote">'
+                f'<div class="bbCodeBlock-content"><div class="bbCodeBlock-expandContent">{original}</div></div>'
+                f'</blockquote>{reply}</div>'
+            )
+            return {'content_html': html, 'content_text': f'{original} {reply}', 'quotes': [{'content': original}]}
+        
+        posts = [
+            {'post_id': '1', 'content_html': f'<div>{original}</div>', 'content_text': original},
+            dict(quoting('I disagree completely'), post_id='2'),
+            dict(quoting('Totally agree'), post_id='3'),
+            # Without HTML the scraped quote texts are removed instead
+            {'post_id': '4', 'content_text': f'{original} Totally agree', 'quotes': [{'content': original}]},
+        ]
+        
+        self.assertEqual(reply_text(posts[1]).strip(), 'I disagree completely')
+        self.assertEqual(self.detector.mark_duplicates(posts), 0)
+        self.assertFalse(any('duplicate_of' in post for post in posts))
+
+
+def run_tests():
+    """Run tests"""
+    unittest.main(argv=[''], exit=False, verbosity=2)
+
+
+if __name__ == '__main__':
+    run_tests()
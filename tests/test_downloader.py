@@ -0,0 +1,347 @@
+"""
+XenForo Forum Archiver - Downloader Tests
+
+This file contains test scenarios for the MediaDownloader class.
+"""
+
+import hashlib
+import json
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+from pathlib import Path
+import sys
+
+# Add project root directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import requests
+
+from src.downloader import (
+    MediaDownloader, NegativeCache, DownloadManifest, DownloadPolicy, DownloadLimitError, ByteBudget, backoff_delay,
+    is_permanent_error
+)
+
+
+BASE_URL = 'https://forum.example.com/'
+
+
+class FakeResponse:
+    """Minimal streaming response returned by the mocked session."""
+    
+    def __init__(self, url: str, status: int = 200, body: bytes = b'data', headers: dict = None):
+        self.url = url
+        self.status_code = status
+        self.ok = status < 400
+        self.body = body
+        self.headers = {'content-length': str(len(body)), 'content-type': 'image/jpeg'}
+        self.headers.update(headers or {})
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+    
+    def raise_for_status(self):
+        if not self.ok:
+            raise requests.HTTPError(f"HTTP {self.status_code}", response=self)
+    
+    def iter_content(self, chunk_size: int = 1):
+        for start in range(0, len(self.body), chunk_size):
+            yield self.body[start:start + chunk_size]
+
+
+class TestMediaDownloader(unittest.TestCase):
+    """Test scenarios for MediaDownloader"""
+    
+    def setUp(self):
+        """Run before each test"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.output_dir = Path(self.tmp.name) / 'media'
+        self.session = mock.Mock(spec=requests.Session)
+        self.responses = {}
+        self.session.get.side_effect = self.respond
+    
+    def tearDown(self):
+        """Run after each test"""
+        self.tmp.cleanup()
+    
+    def respond(self, url: str, **kwargs) -> FakeResponse:
+        """Returns the queued response for url; lists are consumed one call at a time."""
+        response = self.responses.get(url) or FakeResponse(url, 404)
+        if isinstance(response, list):
+            response = response.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+    
+    def fetched_urls(self) -> list:
+        """URLs requested with GET, in order."""
+        return [call.args[0] for call in self.session.get.call_args_list]
+    
+    def make_downloader(self, **kwargs) -> MediaDownloader:
+        """Creates a downloader with an in-memory negative cache and manifest and no HEAD requests."""
+        kwargs.setdefault('head_precheck', False)
+        kwargs.setdefault('policy', DownloadPolicy(min_free_bytes=0))
+        return MediaDownloader(
+            self.session,
+            self.output_dir,
+            workers=1,
+            negative_cache=NegativeCache(),
+            manifest=kwargs.pop('manifest', DownloadManifest()),
+            base_url=BASE_URL,
+            **kwargs
+        )
+    
+    def test_streaming_download_writes_hashed_file(self):
+        """Chunks are streamed to disk under the byte budget and hashed on the way"""
+        url = BASE_URL + 'data/big.jpg'
+        body = bytes(range(256)) * 40
+        self.responses = {url: FakeResponse(url, body=body, headers={'content-length': ''})}
+        budget = ByteBudget(4096)
+        downloader = self.make_downloader(chunk_size=1000, byte_budget=budget)
+        
+        output_path = downloader._download_file(url, self.output_dir / 'images' / 'big.jpg')
+        
+        self.assertEqual(output_path.read_bytes(), body)
+        self.assertEqual(downloader.file_info[url], {'sha256': hashlib.sha256(body).hexdigest(), 'size': len(body)})
+        self.assertEqual(budget.in_use, 0)
+        self.assertEqual(downloader.policy.used_bytes, len(body))
+        self.assertEqual([path.name for path in (self.output_dir / 'images').iterdir()], ['big.jpg'])
+    
+    def test_oversized_stream_is_discarded(self):
+        """A file that outgrows max_file_bytes mid-stream leaves no partial file and no quota use"""
+        url = BASE_URL + 'data/huge.jpg'
+        self.responses = {url: FakeResponse(url, body=b'x' * 5000, headers={'content-length': ''})}
+        downloader = self.make_downloader(chunk_size=1000, policy=DownloadPolicy(max_file_bytes=2500, min_free_bytes=0))
+        
+        self.assertIsNone(downloader._download_file(url, self.output_dir / 'images' / 'huge.jpg'))
+        self.assertEqual(list((self.output_dir / 'images').iterdir()), [])
+        self.assertEqual(downloader.policy.used_bytes, 0)
+        self.assertEqual(self.session.get.call_count, 1)
+    
+    def test_byte_budget_blocks_until_released(self):
+        """acquire waits while the budget is full and oversized requests are clipped"""
+        budget = ByteBudget(100)
+        self.assertEqual(budget.acquire(500), 100)
+        acquired = threading.Event()
+        
+        def worker():
+            budget.release(budget.acquire(10))
+            acquired.set()
+        
+        thread = threading.Thread(target=worker)
+        thread.start()
+        self.assertFalse(acquired.wait(0.1))
+        budget.release(100)
+        self.assertTrue(acquired.wait(5))
+        thread.join()
+        self.assertEqual(budget.in_use, 0)
+        self.assertEqual(ByteBudget(0).acquire(10), 0)
+    
+    def test_policy_skips_and_defers(self):
+        """Disallowed types are skipped and large files are downloaded last"""
+        policy = DownloadPolicy(defer_bytes=100, allowed_types=['image/'], min_free_bytes=0)
+        with self.assertRaises(DownloadLimitError):
+            policy.check(10, 'text/html; charset=utf-8')
+        policy.check(10, 'image/png')
+        self.assertTrue(policy.should_defer(101))
+        self.assertFalse(policy.should_defer(None))
+        
+        urls = {name: BASE_URL + f'data/{name}.jpg' for name in ('large', 'small', 'page')}
+        self.responses = {
+            urls['large']: FakeResponse(urls['large'], body=b'x' * 500),
+            urls['small']: FakeResponse(urls['small'], body=b'x' * 10),
+            urls['page']: FakeResponse(urls['page'], headers={'content-type': 'text/html'}),
+        }
+        self.session.head.side_effect = self.respond
+        posts = [{'images': [{'src': url}]} for url in urls.values()]
+        
+        mapping = self.make_downloader(head_precheck=True, policy=policy).download_images(posts)
+        
+        self.assertEqual(sorted(mapping), sorted([urls['large'], urls['small']]))
+        self.assertEqual(self.fetched_urls(), [urls['small'], urls['large']])
+    
+    def test_pipeline_downloads_submitted_posts(self):
+        """Posts submitted while the pipeline runs are downloaded once per URL"""
+        urls = [BASE_URL + f'data/{i}.jpg' for i in range(4)]
+        self.responses = {url: FakeResponse(url, body=url.encode()) for url in urls}
+        
+        downloader = self.make_downloader()
+        downloader.start_pipeline()
+        for url in urls + urls[:2]:
+            downloader.submit_post({'images': [{'src': url}]})
+        mapping = downloader.finish_pipeline()
+        
+        self.assertEqual(mapping['images'], {url: f'media/images/{i}.jpg' for i, url in enumerate(urls)})
+        self.assertEqual(sorted(self.fetched_urls()), urls)
+        self.assertEqual((self.output_dir / 'images' / '3.jpg').read_bytes(), urls[3].encode())
+    
+    def test_retry_classification(self):
+        """Client errors are permanent except 408/425/429; 404 goes to the negative cache"""
+        def http_error(status, headers=None):
+            return requests.HTTPError(response=FakeResponse('', status, headers=headers))
+        
+        self.assertTrue(is_permanent_error(http_error(403)))
+        self.assertFalse(is_permanent_error(http_error(429)))
+        self.assertFalse(is_permanent_error(http_error(503)))
+        self.assertFalse(is_permanent_error(requests.ConnectionError()))
+        self.assertEqual(backoff_delay(0, http_error(429, {'retry-after': '7'})), 7)
+        
+        dead_url = BASE_URL + 'data/dead.jpg'
+        flaky_url = BASE_URL + 'data/flaky.jpg'
+        self.responses = {
+            dead_url: FakeResponse(dead_url, 404),
+            flaky_url: [FakeResponse(flaky_url, 503), requests.ConnectionError('reset'), FakeResponse(flaky_url)]
+        }
+        downloader = self.make_downloader()
+        with mock.patch('src.downloader.time.sleep') as sleep:
+            self.assertIsNone(downloader._download_file(dead_url, self.output_dir / 'images' / 'dead.jpg'))
+            self.assertIsNotNone(downloader._download_file(flaky_url, self.output_dir / 'images' / 'flaky.jpg'))
+        
+        self.assertEqual(self.fetched_urls(), [dead_url, flaky_url, flaky_url, flaky_url])
+        self.assertEqual(sleep.call_count, 2)
+        self.assertTrue(downloader.negative_cache.is_dead(dead_url))
+        self.assertFalse(downloader.negative_cache.is_dead(flaky_url))
+        
+        # Dead URLs are not requested again
+        self.assertIsNone(downloader._download_file(dead_url, self.output_dir / 'images' / 'dead.jpg'))
+        self.assertEqual(self.session.get.call_count, 4)
+    
+    def test_negative_cache_expires(self):
+        """Entries survive a save/load round trip until their TTL runs out"""
+        cache_file = Path(self.tmp.name) / 'negative_cache.json'
+        cache = NegativeCache(cache_file, ttl=60)
+        cache.mark_dead('https://a/old.jpg', 404)
+        cache.mark_dead('https://a/new.jpg', 410)
+        cache.entries['https://a/old.jpg']['time'] -= 120
+        cache.save()
+        
+        loaded = NegativeCache(cache_file, ttl=60)
+        self.assertEqual(list(loaded.entries), ['https://a/new.jpg'])
+        self.assertTrue(loaded.is_dead('https://a/new.jpg'))
+        self.assertFalse(loaded.is_dead('https://a/old.jpg'))
+        
+        with mock.patch('src.downloader.time.time', return_value=time.time() + 61):
+            self.assertFalse(loaded.is_dead('https://a/new.jpg'))
+        self.assertEqual(json.loads(cache_file.read_text())['https://a/new.jpg']['status'], 410)
+    
+    def test_manifest_reuses_earlier_downloads(self):
+        """Files recorded by an earlier run are reused while they exist and fetched again once deleted"""
+        url = 'https://forum.example.com/data/photo.jpg'
+        self.responses = {url: [FakeResponse(url, body=b'photo'), FakeResponse(url, body=b'photo')]}
+        posts = [{'images': [{'src': url}]}]
+        manifest_file = Path(self.tmp.name) / 'download_manifest.json'
+        
+        first = self.make_downloader(manifest=DownloadManifest(manifest_file)).download_images(posts)
+        self.assertEqual(first, {url: 'media/images/photo.jpg'})
+        self.assertEqual(self.make_downloader(manifest=DownloadManifest(manifest_file)).download_images(posts), first)
+        self.assertEqual(self.session.get.call_count, 1)
+        
+        # A replacement recorded in place of the original (e.g. WebP) is reused as well
+        webp_path = self.output_dir / 'webp' / 'photo.webp'
+        webp_path.parent.mkdir()
+        webp_path.write_bytes(b'webp')
+        (self.output_dir / 'images' / 'photo.jpg').unlink()
+        manifest = DownloadManifest(manifest_file)
+        manifest.update('images', {url: 'media/webp/photo.webp'})
+        manifest.save()
+        replaced = self.make_downloader(manifest=DownloadManifest(manifest_file)).download_images(posts)
+        self.assertEqual(replaced, {url: 'media/webp/photo.webp'})
+        self.assertEqual(self.session.get.call_count, 1)
+        
+        webp_path.unlink()
+        self.assertEqual(self.make_downloader(manifest=DownloadManifest(manifest_file)).download_images(posts), first)
+        self.assertEqual(self.session.get.call_count, 2)
+    
+    def test_youtube_thumbnail_fallback_chain(self):
+        """Missing maxres thumbnails fall back to sd and then hq"""
+        hq_url = 'https://img.youtube.com/vi/abcdefghijk/hqdefault.jpg'
+        self.responses = {hq_url: FakeResponse(hq_url)}
+        posts = [{'videos': [{'type': 'youtube', 'src': 'https://www.youtube.com/watch?v=abcdefghijk'}]}]
+        
+        downloader = self.make_downloader()
+        mapping = downloader.download_youtube_thumbnails(posts)
+        
+        self.assertEqual(mapping, {'abcdefghijk': 'media/thumbnails/youtube_abcdefghijk.jpg'})
+        self.assertEqual(self.fetched_urls(), [
+            'https://img.youtube.com/vi/abcdefghijk/maxresdefault.jpg',
+            'https://img.youtube.com/vi/abcdefghijk/sddefault.jpg',
+            hq_url
+        ])
+        self.assertTrue(downloader.negative_cache.is_dead('https://img.youtube.com/vi/abcdefghijk/maxresdefault.jpg'))
+    
+    def test_jobs_download_original_urls_under_canonical_keys(self):
+        """Proxy and ?hash= URLs are fetched as seen and mapped by canonical URL"""
+        proxy_url = BASE_URL + 'proxy.php?image=https%3A%2F%2Fcdn.example.org%2Fx.png&hash=ff'
+        attachment_url = BASE_URL + 'attachments/photo-jpg.5/?hash=abc'
+        self.responses = {proxy_url: FakeResponse(proxy_url), attachment_url: FakeResponse(attachment_url)}
+        posts = [
+            {'images': [{'src': '/proxy.php?image=https%3A%2F%2Fcdn.example.org%2Fx.png&hash=ff'}]},
+            {'images': [{'src': 'https://cdn.example.org/x.png'}, {'src': '/attachments/photo-jpg.5/?hash=abc'}]},
+        ]
+        
+        mapping = self.make_downloader().download_images(posts)
+        
+        self.assertEqual(sorted(self.fetched_urls()), sorted([proxy_url, attachment_url]))
+        self.assertEqual(mapping, {
+            'https://cdn.example.org/x.png': 'media/images/x.png',
+            BASE_URL + 'attachments/5/': 'media/images/photo.jpg',
+        })
+    
+    def test_pipeline_sends_no_head_requests(self):
+        """Only batch downloads probe with HEAD; the pipeline relies on GET headers"""
+        urls = [BASE_URL + f'data/{i}.jpg' for i in range(3)]
+        self.responses = {url: FakeResponse(url) for url in urls}
+        self.session.head.side_effect = lambda url, **kwargs: FakeResponse(url)
+        posts = [{'images': [{'src': url}]} for url in urls]
+        
+        downloader = self.make_downloader(head_precheck=True)
+        downloader.start_pipeline()
+        for post in posts:
+            downloader.submit_post(post)
+        self.assertEqual(len(downloader.finish_pipeline()['images']), 3)
+        self.session.head.assert_not_called()
+        
+        self.output_dir = Path(self.tmp.name) / 'batch'
+        self.make_downloader(head_precheck=True).download_images(posts)
+        self.assertEqual(self.session.head.call_count, 3)
+    
+    
+    def test_pipeline_defers_large_files_from_get_headers(self):
+        """Without HEAD, a large Content-Length on the GET requeues the job behind smaller files"""
+        urls = {name: BASE_URL + f'data/{name}.jpg' for name in ('large', 'small0', 'small1')}
+        self.responses = {
+            urls['large']: [FakeResponse(urls['large'], body=b'x' * 500), FakeResponse(urls['large'], body=b'x' * 500)],
+            urls['small0']: FakeResponse(urls['small0'], body=b'x' * 10),
+            urls['small1']: FakeResponse(urls['small1'], body=b'x' * 10),
+        }
+        # The worker holds the first GET until every post is queued
+        submitted = threading.Event()
+        self.session.get.side_effect = lambda url, **kwargs: submitted.wait(5) and self.respond(url)
+        
+        downloader = self.make_downloader(policy=DownloadPolicy(defer_bytes=100, min_free_bytes=0))
+        downloader.start_pipeline()
+        for url in urls.values():
+            downloader.submit_post({'images': [{'src': url}]})
+        submitted.set()
+        mapping = downloader.finish_pipeline()
+        
+        self.assertEqual(self.fetched_urls(), [urls['large'], urls['small0'], urls['small1'], urls['large']])
+        self.assertEqual(mapping['images'][urls['large']], 'media/images/large.jpg')
+        self.assertEqual((self.output_dir / 'images' / 'large.jpg').stat().st_size, 500)
+        self.assertEqual(sorted(path.name for path in (self.output_dir / 'images').iterdir()),
+                         ['large.jpg', 'small0.jpg', 'small1.jpg'])
+        self.assertEqual(downloader.policy.used_bytes, 520)
+
+def run_tests():
+    """Run tests"""
+    unittest.main(argv=[''], exit=False, verbosity=2)
+
+
+if __name__ == '__main__':
+    run_tests()
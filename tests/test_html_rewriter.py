@@ -0,0 +1,92 @@
+"""
+XenForo Forum Archiver - Content Media Rewriter Tests
+
+This file contains test scenarios for the ContentMediaRewriter class.
+"""
+
+import unittest
+from pathlib import Path
+import sys
+
+# Add project root directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import lxml.html
+
+from src.html_rewriter import MEDIA_ROOT, ContentMediaRewriter, media_root
+
+
+BASE_URL = 'https://forum.example.com/'
+
+MEDIA_MAPPINGS = {
+    'images': {
+        'https://forum.example.com/data/photo.jpg': 'downloaded_media/images/photo.jpg',
+        'https://forum.example.com/attachments/7/': 'downloaded_media/images/screenshot.png'
+    },
+    'attachments': {
+        'https://forum.example.com/attachments/9/': 'downloaded_media/attachments/report.pdf'
+    },
+    'derivatives': {
+        'https://forum.example.com/data/photo.jpg': {'width': 800, 'height': 600}
+    }
+}
+
+
+class TestContentMediaRewriter(unittest.TestCase):
+    """Test scenarios for ContentMediaRewriter"""
+    
+    def setUp(self):
+        """Run before each test"""
+        self.rewriter = ContentMediaRewriter(MEDIA_MAPPINGS, BASE_URL)
+    
+    def test_inline_media_points_to_local_copies(self):
+        """Lazy-loaded images, attachment links and full-size links are rewritten"""
+        content = (
+            'Intro <b>text</b> &amp; more'
+            '<img class="bbImage lazyload" src="data:image/gif;base64,R0lGOD" data-src="/data/photo.jpg?hash=abc">'
+            '<a href="/attachments/screenshot-png.7/"><img src="/attachments/screenshot-png.7/"></a>'
+            '<a href="/index.php?attachments/report-pdf.9/">report</a> tail'
+        )
+        rewritten = media_root(self.rewriter.rewrite(content), '../')
+        root = lxml.html.fragment_fromstring(rewritten, create_parent='div')
+        first, second = root.iter('img')
+        
+        self.assertEqual(first.get('src'), '../downloaded_media/images/photo.jpg')
+        self.assertIsNone(first.get('data-src'))
+        self.assertEqual((first.get('width'), first.get('height'), first.get('loading')), ('800', '600', 'lazy'))
+        self.assertEqual(second.get('src'), '../downloaded_media/images/screenshot.png')
+        self.assertEqual(
+            [link.get('href') for link in root.iter('a')],
+            ['../downloaded_media/images/screenshot.png', '../downloaded_media/attachments/report.pdf']
+        )
+        self.assertTrue(rewritten.startswith('Intro <b>text</b> &amp; more<img'))
+        self.assertTrue(rewritten.endswith('>report</a> tail'))
+    
+    def test_unknown_media_stays_remote(self):
+        """Unmapped images keep their URL and content without media is left alone"""
+        content = '<p><img src="https://cdn.example.org/other.png"></p>'
+        rewritten = media_root(self.rewriter.rewrite(content))
+        self.assertEqual(rewritten, '<p><img src="https://cdn.example.org/other.png" loading="lazy"></p>')
+        
+        # A marker typed into the post itself must not turn into a path
+        plain = f'<p>No media {MEDIA_ROOT}here</p>'
+        self.assertEqual(media_root(self.rewriter.rewrite(plain), '../'), '<p>No media here</p>')
+    
+    def test_rewrite_all_fills_cache_once(self):
+        """Batch rewriting matches single rewrites and parses each content once"""
+        contents = [f'<p>{i}</p><img data-src="/data/photo.jpg">' for i in range(20)] * 2
+        expected = [ContentMediaRewriter(MEDIA_MAPPINGS, BASE_URL).rewrite(content) for content in contents]
+        
+        self.rewriter.rewrite_all(contents, workers=2, chunk_size=5)
+        self.assertEqual(len(self.rewriter.cache), 20)
+        self.assertEqual([self.rewriter.rewrite(content) for content in contents], expected)
+
+
+def run_tests():
+    """Run tests"""
+    unittest.main(argv=[''], exit=False, verbosity=2)
+
+
+if __name__ == '__main__':
+    run_tests()
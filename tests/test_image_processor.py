@@ -0,0 +1,158 @@
+"""
+XenForo Forum Archiver - Image Processor Tests
+
+This file contains test scenarios for the ImageProcessor class.
+"""
+
+import random
+import tempfile
+import unittest
+from pathlib import Path
+import sys
+
+# Add project root directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from PIL import Image
+
+from src.image_processor import ImageProcessor
+
+
+class TestImageProcessor(unittest.TestCase):
+    """Test scenarios for ImageProcessor"""
+    
+    def setUp(self):
+        """Run before each test"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.tmp.name)
+        self.media_dir = self.base_dir / 'media'
+        images_dir = self.media_dir / 'images'
+        images_dir.mkdir(parents=True)
+        Image.new('RGB', (600, 400), (200, 30, 30)).save(images_dir / 'photo.jpg', quality=95)
+        Image.new('RGBA', (200, 100), (0, 0, 255, 128)).save(images_dir / 'logo.png')
+        self.image_mapping = {
+            'https://forum.example.com/data/photo.jpg': 'media/images/photo.jpg',
+            'https://forum.example.com/data/logo.png': 'media/images/logo.png'
+        }
+    
+    def tearDown(self):
+        """Run after each test"""
+        self.tmp.cleanup()
+    
+    def make_processor(self, **kwargs) -> ImageProcessor:
+        """Creates a single-worker processor with small derivative settings."""
+        kwargs.setdefault('thumbnail_size', 100)
+        kwargs.setdefault('widths', [300, 1000])
+        return ImageProcessor(self.media_dir, quality=kwargs.pop('quality', 80), workers=1, **kwargs)
+    
+    def add_noise_image(self) -> str:
+        """Adds a low-quality noise JPEG that WebP cannot shrink at high quality."""
+        noise = Image.frombytes('L', (200, 200), random.Random(1).randbytes(40000)).convert('RGB')
+        noise.save(self.media_dir / 'images' / 'noise.jpg', quality=20)
+        self.image_mapping['https://forum.example.com/data/noise.jpg'] = 'media/images/noise.jpg'
+        return 'https://forum.example.com/data/noise.jpg'
+    
+    def derivative_files(self) -> dict:
+        """Maps every derivative file to its modification time."""
+        return {
+            path.relative_to(self.base_dir).as_posix(): path.stat().st_mtime_ns
+            for path in (self.media_dir / 'derivatives').rglob('*') if path.is_file()
+        }
+    
+    def test_derivatives_follow_settings(self):
+        """Derivatives are reused for the same settings and regenerated when they change"""
+        mapping = self.make_processor().generate_derivatives(self.image_mapping)
+        
+        photo = mapping['https://forum.example.com/data/photo.jpg']
+        self.assertEqual((photo['width'], photo['height']), (600, 400))
+        self.assertEqual((photo['thumbnail']['width'], photo['thumbnail']['height']), (100, 67))
+        self.assertEqual([variant['width'] for variant in photo['variants']], [300])
+        logo = mapping['https://forum.example.com/data/logo.png']
+        self.assertTrue(logo['thumbnail']['path'].endswith('.png'))
+        self.assertEqual(logo['variants'], [])
+        
+        files = self.derivative_files()
+        self.assertEqual(sorted(files), sorted(
+            [photo['thumbnail']['path'], photo['variants'][0]['path'], logo['thumbnail']['path']]
+        ))
+        self.assertEqual(self.make_processor().generate_derivatives(self.image_mapping), mapping)
+        self.assertEqual(self.derivative_files(), files)
+        
+        for changed in ({'quality': 60}, {'thumbnail_size': 50}):
+            updated = self.make_processor(**changed).generate_derivatives(self.image_mapping)
+            thumbnail = updated['https://forum.example.com/data/photo.jpg']['thumbnail']
+            self.assertNotIn(thumbnail['path'], files)
+            self.assertTrue((self.base_dir / thumbnail['path']).exists())
+        self.assertEqual(thumbnail['width'], 50)
+    
+    def test_worker_errors_are_logged(self):
+        """A broken image is reported with its reason and left out of the mapping"""
+        (self.media_dir / 'images' / 'broken.jpg').write_bytes(b'not an image')
+        self.image_mapping['https://forum.example.com/data/broken.jpg'] = 'media/images/broken.jpg'
+        
+        with self.assertLogs('src.image_processor', level='WARNING') as logs:
+            mapping = self.make_processor().generate_derivatives(self.image_mapping)
+        
+        self.assertEqual(len(mapping), 2)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn('media/images/broken.jpg', logs.output[0])
+        self.assertIn('UnidentifiedImageError', logs.output[0])
+    
+    def test_webp_keeps_the_smaller_file(self):
+        """WebP is used only when smaller; the skip marker is per quality and method"""
+        noise_url = self.add_noise_image()
+        processor = self.make_processor(webp_quality=100, webp_method=6)
+        mapping = processor.transcode_to_webp(self.image_mapping, keep_originals=True)
+        
+        self.assertEqual(sorted(mapping), [
+            'https://forum.example.com/data/logo.png', 'https://forum.example.com/data/photo.jpg'
+        ])
+        self.assertTrue(all(path.endswith('_q100_m6.webp') for path in mapping.values()))
+        self.assertEqual((processor.webp_stats['converted'], processor.webp_stats['skipped']), (2, 1))
+        self.assertEqual(len(list((self.media_dir / 'webp').rglob('*.skip'))), 1)
+        self.assertTrue(all((self.base_dir / path).exists() for path in self.image_mapping.values()))
+        
+        processor = self.make_processor(webp_quality=100, webp_method=6)
+        processor.transcode_to_webp(self.image_mapping, keep_originals=True)
+        self.assertEqual((processor.webp_stats['created'], processor.webp_stats['skipped']), (0, 1))
+        
+        processor = self.make_processor(webp_quality=1, webp_method=6)
+        mapping = processor.transcode_to_webp(self.image_mapping, keep_originals=True)
+        self.assertIn(noise_url, mapping)
+        self.assertEqual(processor.webp_stats['created'], 3)
+    
+    def test_webp_replaces_originals(self):
+        """Without originals, converted images are deleted and the mapping points at WebP"""
+        noise_url = self.add_noise_image()
+        processor = self.make_processor(webp_quality=100, webp_method=6)
+        mapping = processor.transcode_to_webp(self.image_mapping, keep_originals=False)
+        
+        self.assertEqual(self.image_mapping[noise_url], 'media/images/noise.jpg')
+        self.assertTrue((self.media_dir / 'images' / 'noise.jpg').exists())
+        for url, webp_path in mapping.items():
+            self.assertEqual(self.image_mapping[url], webp_path)
+            self.assertTrue((self.base_dir / webp_path).exists())
+        self.assertEqual([path.name for path in (self.media_dir / 'images').iterdir()], ['noise.jpg'])
+    
+    def test_derivatives_get_webp_copies(self):
+        """Each thumbnail and width variant that shrinks gets a webp_path"""
+        processor = self.make_processor(webp_quality=50, webp_method=4)
+        mapping = processor.generate_derivatives(self.image_mapping)
+        
+        self.assertEqual(processor.transcode_derivatives_to_webp(mapping), 3)
+        photo = mapping['https://forum.example.com/data/photo.jpg']
+        for entry in [photo['thumbnail'], *photo['variants']]:
+            self.assertTrue(entry['webp_path'].endswith('_q50_m4.webp'))
+            self.assertEqual(Image.open(self.base_dir / entry['webp_path']).size,
+                             Image.open(self.base_dir / entry['path']).size)
+        self.assertEqual(processor.transcode_derivatives_to_webp(mapping), 3)
+
+
+def run_tests():
+    """Run tests"""
+    unittest.main(argv=[''], exit=False, verbosity=2)
+
+
+if __name__ == '__main__':
+    run_tests()
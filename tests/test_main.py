@@ -0,0 +1,140 @@
+"""
+XenForo Forum Archiver - Main Pipeline Tests
+
+This file contains test scenarios for the media pipeline wiring in main.py.
+"""
+
+import io
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+import sys
+
+# Add project root directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+import requests
+from PIL import Image
+
+import config
+import main
+from src.utils import RateLimiter
+from tests.test_downloader import FakeResponse
+
+
+MEDIA_URLS = [f'https://forum.example.com/data/{name}.jpg' for name in ('first', 'second', 'third')]
+
+
+class FakeScraper:
+    """Scraper stand-in that hands each post to on_post as it is parsed."""
+    
+    def __init__(self, session, forum_url, rate_limiter=None, on_post=None):
+        self.on_post = on_post
+        self.posts_data = []
+    
+    def scrape_thread(self, thread_url, delay=0, max_pages=None):
+        for i, url in enumerate(MEDIA_URLS):
+            post = {'post_id': str(i), 'images': [{'src': url}]}
+            self.posts_data.append(post)
+            if self.on_post:
+                self.on_post(post)
+        return True
+    
+    def save_to_json(self, json_file):
+        return True
+
+
+class TestMediaPipeline(unittest.TestCase):
+    """Test scenarios for start_media_pipeline, scrape_forum and download_media"""
+    
+    def setUp(self):
+        """Run before each test"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.tmp.name)
+        self.session = mock.Mock(spec=requests.Session)
+        self.session.get.side_effect = lambda url, **kwargs: FakeResponse(url, body=url.encode())
+        self.session.head.side_effect = lambda url, **kwargs: FakeResponse(url, body=url.encode())
+        self.config_patch = mock.patch.multiple(
+            config,
+            MEDIA_DIR=self.base_dir / 'media',
+            GENERATE_DERIVATIVES=False,
+            WEBP_ENABLED=False,
+            NEGATIVE_CACHE_FILE=self.base_dir / 'negative_cache.json',
+            DOWNLOAD_MANIFEST_FILE=self.base_dir / 'download_manifest.json'
+        )
+        self.config_patch.start()
+    
+    def tearDown(self):
+        """Run after each test"""
+        self.config_patch.stop()
+        self.tmp.cleanup()
+    
+    def test_scraped_posts_are_downloaded_through_the_pipeline(self):
+        """Every post the scraper parses is queued on the pipeline started before scraping"""
+        downloader = main.start_media_pipeline(self.session, RateLimiter(0))
+        with mock.patch.object(main, 'XenForoScraper', FakeScraper):
+            scraper = main.scrape_forum(self.session, self.base_dir / 'posts.json', downloader=downloader)
+        
+        self.assertEqual(scraper.on_post, downloader.submit_post)
+        mappings = main.download_media(downloader)
+        
+        self.assertEqual(mappings['images'], {url: f"media/images/{url.rsplit('/', 1)[1]}" for url in MEDIA_URLS})
+        self.assertNotIn('derivatives', mappings)
+        for url in MEDIA_URLS:
+            self.assertEqual((self.base_dir / mappings['images'][url]).read_bytes(), url.encode())
+    
+    def test_derivatives_get_webp_sources_when_both_are_enabled(self):
+        """With GENERATE_DERIVATIVES and WEBP_ENABLED, derivatives carry WebP copies too"""
+        photo = io.BytesIO()
+        Image.new('RGB', (1200, 800), (200, 30, 30)).save(photo, 'JPEG', quality=95)
+        self.session.get.side_effect = lambda url, **kwargs: FakeResponse(url, body=photo.getvalue())
+        
+        downloader = main.start_media_pipeline(self.session, RateLimiter(0))
+        downloader.submit_post({'images': [{'src': MEDIA_URLS[0]}]})
+        with mock.patch.multiple(config, GENERATE_DERIVATIVES=True, WEBP_ENABLED=True):
+            mappings = main.download_media(downloader)
+        
+        derivatives = mappings['derivatives'][MEDIA_URLS[0]]
+        self.assertIn(MEDIA_URLS[0], mappings['webp'])
+        for entry in [derivatives['thumbnail'], *derivatives['variants']]:
+            self.assertTrue((self.base_dir / entry['webp_path']).exists())
+    
+    def test_webp_replacements_are_not_downloaded_again(self):
+        """Originals deleted after WebP conversion are recorded so the next run reuses the WebP file"""
+        photo = io.BytesIO()
+        Image.new('RGB', (600, 400), (200, 30, 30)).save(photo, 'JPEG', quality=95)
+        self.session.get.side_effect = lambda url, **kwargs: FakeResponse(url, body=photo.getvalue())
+        
+        runs = []
+        with mock.patch.multiple(config, WEBP_ENABLED=True, WEBP_KEEP_ORIGINALS=False):
+            for _ in range(2):
+                downloader = main.start_media_pipeline(self.session, RateLimiter(0))
+                downloader.submit_post({'images': [{'src': MEDIA_URLS[0]}]})
+                runs.append(main.download_media(downloader))
+        
+        self.assertEqual(self.session.get.call_count, 1)
+        webp_path = runs[0]['webp'][MEDIA_URLS[0]]
+        self.assertFalse((self.base_dir / 'media' / 'images' / 'first.jpg').exists())
+        self.assertEqual(runs[1]['images'], {MEDIA_URLS[0]: webp_path})
+        self.assertEqual(runs[1]['webp'], {MEDIA_URLS[0]: webp_path})
+        self.assertTrue((self.base_dir / webp_path).exists())
+    
+    def test_scrape_without_downloader_queues_nothing(self):
+        """--no-media runs scrape without an on_post callback"""
+        with mock.patch.object(main, 'XenForoScraper', FakeScraper):
+            scraper = main.scrape_forum(self.session, self.base_dir / 'posts.json')
+        
+        self.assertIsNone(scraper.on_post)
+        self.assertEqual(len(scraper.posts_data), 3)
+        self.session.get.assert_not_called()
+
+
+def run_tests():
+    """Run tests"""
+    unittest.main(argv=[''], exit=False, verbosity=2)
+
+
+if __name__ == '__main__':
+    run_tests()
@@ -0,0 +1,76 @@
+"""
+XenForo Forum Archiver - Media Sync Tests
+
+This file contains test scenarios for the MediaSync class.
+"""
+
+import os
+import tempfile
+import unittest
+from pathlib import Path
+import sys
+
+# Add project root directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.media_sync import MediaSync
+
+
+class TestMediaSync(unittest.TestCase):
+    """Test scenarios for MediaSync"""
+    
+    def setUp(self):
+        """Run before each test"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.source = Path(self.tmp.name) / 'media'
+        self.dest = Path(self.tmp.name) / 'site' / 'media'
+        (self.source / 'images').mkdir(parents=True)
+        (self.source / 'images' / 'a.jpg').write_bytes(b'a' * 100)
+        (self.source / 'images' / 'b.jpg').write_bytes(b'b' * 200)
+        (self.source / 'video.mp4').write_bytes(b'v' * 300)
+    
+    def tearDown(self):
+        """Run after each test"""
+        self.tmp.cleanup()
+    
+    def test_copy_mode_moves_only_changed_files(self):
+        """Only new or changed files are copied and orphans are removed"""
+        stats = MediaSync(self.source, self.dest, hardlink=False).sync()
+        self.assertEqual((stats['copied'], stats['bytes_copied']), (3, 600))
+        self.assertEqual((self.dest / 'images' / 'b.jpg').read_bytes(), b'b' * 200)
+        
+        stats = MediaSync(self.source, self.dest, hardlink=False).sync()
+        self.assertEqual((stats['copied'], stats['unchanged']), (0, 3))
+        
+        # Same size, new content and mtime: detected by hash
+        (self.source / 'images' / 'a.jpg').write_bytes(b'x' * 100)
+        # Same content, new mtime: hashed once, not copied
+        os.utime(self.source / 'video.mp4', ns=(0, 10**9))
+        (self.source / 'images' / 'b.jpg').unlink()
+        (self.dest / 'images' / 'stale.jpg').write_bytes(b'old')
+        
+        stats = MediaSync(self.source, self.dest, hardlink=False).sync()
+        self.assertEqual((stats['copied'], stats['bytes_copied'], stats['unchanged']), (1, 100, 1))
+        self.assertEqual(stats['removed'], 2)
+        self.assertEqual((self.dest / 'images' / 'a.jpg').read_bytes(), b'x' * 100)
+        self.assertEqual(sorted(path.name for path in self.dest.rglob('*')), ['a.jpg', 'images', 'video.mp4'])
+        self.assertEqual((self.dest / 'video.mp4').stat().st_mtime_ns, 10**9)
+    
+    def test_hardlink_mode_moves_no_bytes(self):
+        """Files on the same filesystem are hardlinked instead of copied"""
+        stats = MediaSync(self.source, self.dest, hardlink=True).sync()
+        self.assertEqual((stats['linked'], stats['bytes_copied']), (3, 0))
+        self.assertTrue((self.dest / 'video.mp4').samefile(self.source / 'video.mp4'))
+        
+        stats = MediaSync(self.source, self.dest, hardlink=True).sync()
+        self.assertEqual((stats['linked'], stats['unchanged']), (0, 3))
+
+
+def run_tests():
+    """Run tests"""
+    unittest.main(argv=[''], exit=False, verbosity=2)
+
+
+if __name__ == '__main__':
+    run_tests()
@@ -0,0 +1,74 @@
+"""
+XenForo Forum Archiver - Search Index Tests
+
+This file contains test scenarios for the SearchIndexBuilder class.
+"""
+
+import itertools
+import unittest
+from pathlib import Path
+import sys
+
+# Add project root directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.search_index import SearchIndexBuilder, shard_name, term_page_name
+
+
+def make_builder(postings_per_file: int = 100) -> SearchIndexBuilder:
+    """Builds an index of ten posts with a common, a frequent and a rare term."""
+    builder = SearchIndexBuilder(
+        prefix_length=2, max_df_ratio=0.5, max_inline_postings=3, postings_per_file=postings_per_file
+    )
+    builder.MIN_SKIPPED_DF = 0
+    for i in range(10):
+        words = ['common']
+        if i % 2:
+            words.append('often')
+        if i == 4:
+            words.append('rare')
+        builder.add({'post_id': str(i), 'author': 'user', 'content_text': ' '.join(words)}, 'news', f'posts/{i}.html')
+    return builder
+
+
+class TestSearchIndexBuilder(unittest.TestCase):
+    """Test scenarios for SearchIndexBuilder"""
+    
+    def test_stop_terms_are_marked_not_dropped(self):
+        """Terms above max_df stay in their shard as null so the client can skip them"""
+        shards = dict(make_builder().shards())
+        self.assertIsNone(shards[shard_name('common', 2)]['common'])
+        self.assertIsNone(shards[shard_name('user', 2)]['user'])
+        self.assertEqual(shards[shard_name('rare', 2)]['rare'], [4])
+    
+    def test_long_postings_get_their_own_file(self):
+        """Lists longer than max_inline_postings are replaced by their length"""
+        builder = make_builder()
+        shards = dict(builder.shards())
+        self.assertEqual(shards[shard_name('often', 2)]['often'], 5)
+        
+        files = dict(builder.postings_files())
+        self.assertEqual(list(files), [term_page_name('often', 0)])
+        self.assertEqual(list(itertools.accumulate(files[term_page_name('often', 0)])), [1, 3, 5, 7, 9])
+    
+    def test_long_postings_are_paged(self):
+        """Term files never hold more than postings_per_file entries and each page decodes on its own"""
+        builder = SearchIndexBuilder(max_df_ratio=1.0, max_inline_postings=3, postings_per_file=4)
+        for i in range(2000):
+            builder.add({'post_id': str(i), 'author': 'user', 'content_text': 'always'}, 'news', f'posts/{i}.html')
+        
+        files = dict(builder.postings_files())
+        self.assertEqual(len(files), 2 * 500)
+        self.assertTrue(all(len(deltas) <= 4 for deltas in files.values()))
+        pages = [files[term_page_name('always', page)] for page in range(500)]
+        self.assertEqual([doc_id for page in pages for doc_id in itertools.accumulate(page)], list(range(2000)))
+
+
+def run_tests():
+    """Run tests"""
+    unittest.main(argv=[''], exit=False, verbosity=2)
+
+
+if __name__ == '__main__':
+    run_tests()
@@ -0,0 +1,351 @@
+"""
+XenForo Forum Archiver - Site Generator Tests
+
+This file contains test scenarios for the WebSiteGenerator class.
+"""
+
+import gzip
+import itertools
+import json
+import tempfile
+import unittest
+from unittest import mock
+from pathlib import Path
+import sys
+
+# Add project root directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from jinja2 import Environment, UndefinedError
+
+from src.build_manifest import BuildManifest
+from src.html_rewriter import ContentMediaRewriter
+from src.search_index import shard_name
+from src.site_generator import (
+    WebSiteGenerator, create_environment, post_page_path, render_to_file, REDIRECTS_FILE
+)
+import config
+
+
+THREAD_INFO = {'title': 'Test Thread', 'url': 'https://forum.example.com/threads/1/', 'base_url': 'https://forum.example.com/'}
+
+STATS = {
+    'total_posts': 12,
+    'category_distribution': {'news': 6, 'review': 6},
+    'content_type_distribution': {'text': 12},
+    'author_distribution': {'user0': 4, 'user1': 4, 'user2': 4},
+    'total_images': 0,
+    'total_videos': 0,
+    'total_attachments': 0
+}
+
+
+def make_categorized_posts(count: int = 12) -> dict:
+    """Builds categorized sample posts."""
+    categorized = {category: [] for category in config.CATEGORY_RULES}
+    for i in range(count):
+        category = 'news' if i % 2 else 'review'
+        categorized[category].append({
+            'post_id': str(1000 + i),
+            'author': f'user{i % 3}',
+            'date_text': '1 Ocak 2024',
+            'title': f'Post {i}',
+            'content_text': f'Content of post {i}',
+            'content_html': f'<p>Content of post {i} &amp; ünicode</p>',
+            'images': [],
+            'videos': [],
+            'attachments': [],
+            'category': category,
+            'content_type': 'text',
+            'tags': ['tag'],
+        })
+    return categorized
+
+
+class TestWebSiteGenerator(unittest.TestCase):
+    """Test scenarios for WebSiteGenerator"""
+    
+    def setUp(self):
+        """Run before each test"""
+        self.tmp = tempfile.TemporaryDirectory()
+        self.tmp_dir = Path(self.tmp.name)
+    
+    def tearDown(self):
+        """Run after each test"""
+        self.tmp.cleanup()
+    
+    def make_generator(self, name: str, categorized_posts: dict = None) -> WebSiteGenerator:
+        """Creates a generator writing into a fresh output directory."""
+        return WebSiteGenerator(
+            output_dir=self.tmp_dir / name,
+            templates_dir=config.BASE_DIR / 'templates',
+            thread_info=THREAD_INFO,
+            categorized_posts=categorized_posts or make_categorized_posts(),
+            stats=STATS
+        )
+    
+    @staticmethod
+    def read_tree(root: Path) -> dict:
+        """Reads every file under root as bytes."""
+        return {str(path.relative_to(root)): path.read_bytes() for path in root.rglob('*') if path.is_file()}
+    
+    @staticmethod
+    def page_paths(paths: list) -> list:
+        """Filters out search index files and .gz sidecars."""
+        return [path for path in paths if not path.startswith('search') and not path.endswith('.gz')]
+    
+    def test_parallel_post_pages_match_serial(self):
+        """Parallel rendering writes byte-identical post pages"""
+        original_chunk_size = config.RENDER_CHUNK_SIZE
+        config.RENDER_CHUNK_SIZE = 5
+        try:
+            serial = self.make_generator('serial')
+            serial.generate_post_pages(workers=1)
+            parallel = self.make_generator('parallel')
+            parallel.generate_post_pages(workers=2)
+        finally:
+            config.RENDER_CHUNK_SIZE = original_chunk_size
+        
+        serial_files = self.read_tree(serial.output_dir)
+        self.assertEqual(len(serial_files), 12)
+        self.assertEqual(self.read_tree(parallel.output_dir), serial_files)
+    
+    def test_incremental_build_rewrites_only_changed_pages(self):
+        """Unchanged pages are skipped, edited pages rewritten, removed pages deleted"""
+        categorized = make_categorized_posts()
+        generator = self.make_generator('site', categorized)
+        self.assertTrue(generator.generate_site(copy_media=False))
+        pages = self.page_paths(generator.manifest.changed)
+        self.assertEqual(len(pages), 16)  # CSS, index, 2 categories, 12 posts
+        
+        generator = self.make_generator('site', categorized)
+        generator.generate_site(copy_media=False)
+        self.assertEqual(generator.manifest.changed, [])
+        
+        categorized['news'][0]['content_html'] = '<p>Edited</p>'
+        removed = categorized['review'].pop()
+        generator = self.make_generator('site', categorized)
+        generator.generate_site(copy_media=False)
+        
+        pages = self.page_paths(generator.manifest.changed)
+        self.assertEqual(sorted(pages), ['index.html', 'news.html', 'posts/post_1001.html', 'review.html'])
+        self.assertEqual(self.page_paths(generator.manifest.deleted), [f"posts/post_{removed['post_id']}.html"])
+        self.assertFalse((generator.output_dir / 'posts' / f"post_{removed['post_id']}.html").exists())
+        changed_list = (generator.output_dir / '.changed_files.txt').read_text(encoding='utf-8').split()
+        self.assertEqual(sorted(changed_list), sorted(generator.manifest.changed))
+    
+    def test_unrendered_inputs_do_not_rewrite_pages(self):
+        """Thread fields and stats the templates never show leave pages untouched"""
+        categorized = make_categorized_posts()
+        generator = self.make_generator('site', categorized)
+        generator.generate_site(copy_media=False)
+        
+        generator = self.make_generator('site', categorized)
+        generator.thread_info = {**THREAD_INFO, 'total_pages': 40, 'scraped_at': '2026-01-01'}
+        generator.stats = {**STATS, 'total_posts': 13}
+        generator.generate_site(copy_media=False)
+        self.assertEqual(self.page_paths(generator.manifest.changed), ['index.html'])
+        
+        generator = self.make_generator('site', categorized)
+        generator.thread_info = {**THREAD_INFO, 'title': 'Renamed Thread'}
+        generator.generate_site(copy_media=False)
+        self.assertEqual(len(self.page_paths(generator.manifest.changed)), 15)  # every page but the CSS
+    
+    def test_category_pages_are_paginated(self):
+        """Categories are split into page files linked by prev/next"""
+        generator = self.make_generator('site')
+        generator.output_dir.mkdir(parents=True)
+        generator.generate_category_pages(page_size=4)
+        
+        first = (generator.output_dir / 'news.html').read_text(encoding='utf-8')
+        second = (generator.output_dir / 'news_page_2.html').read_text(encoding='utf-8')
+        self.assertFalse((generator.output_dir / 'news_page_3.html').exists())
+        
+        self.assertIn('Sayfa 1 / 2', first)
+        self.assertIn('href="news_page_2.html"', first)
+        self.assertIn('href="news.html"', second)
+        self.assertEqual(first.count('class="post-card"'), 4)
+        self.assertEqual(second.count('class="post-card"'), 2)
+        self.assertIn('Toplam 6 Post', second)
+    
+    def test_search_index_shards_resolve_to_posts(self):
+        """Search shards hold delta-encoded postings that point into the docs tables"""
+        generator = self.make_generator('site')
+        generator.output_dir.mkdir(parents=True)
+        generator.manifest = BuildManifest(generator.output_dir, force=True)
+        generator.generate_search_index()
+        
+        search_dir = generator.output_dir / 'search'
+        self.assertTrue((generator.output_dir / 'search.html').exists())
+        docs = json.loads((search_dir / 'docs' / '0.json').read_text(encoding='utf-8'))
+        self.assertEqual(len(docs), 12)
+        
+        shard = json.loads((search_dir / 'index' / f"{shard_name('user0', config.SEARCH_PREFIX_LENGTH)}.json").read_text(encoding='utf-8'))
+        self.assertIn('user1', shard)
+        doc_ids = list(itertools.accumulate(shard['user0']))
+        self.assertEqual(len(doc_ids), 4)
+        for doc_id in doc_ids:
+            post_id, author, category, url, snippet = docs[doc_id]
+            self.assertEqual(author, 'user0')
+            self.assertEqual(url, f'posts/post_{post_id}.html')
+    
+    def test_gzip_sidecars_follow_their_sources(self):
+        """Every text output gets a .gz sidecar that is only rewritten when its source changes"""
+        categorized = make_categorized_posts()
+        generator = self.make_generator('site', categorized)
+        generator.generate_site(copy_media=False)
+        
+        output_dir = generator.output_dir
+        for relative_path in ['index.html', 'css/style.css', 'posts/post_1000.html', 'search/docs/0.json']:
+            source = (output_dir / relative_path).read_bytes()
+            self.assertEqual(gzip.decompress((output_dir / f'{relative_path}.gz').read_bytes()), source)
+        
+        categorized['news'][0]['content_html'] = '<p>Edited</p>'
+        removed = categorized['review'].pop()
+        generator = self.make_generator('site', categorized)
+        generator.generate_site(copy_media=False)
+        
+        changed = [path for path in generator.manifest.changed if path.endswith('.gz')]
+        self.assertIn('posts/post_1001.html.gz', changed)
+        self.assertNotIn('posts/post_1000.html.gz', changed)
+        self.assertIn(f"posts/post_{removed['post_id']}.html.gz", generator.manifest.deleted)
+        self.assertFalse((output_dir / 'posts' / f"post_{removed['post_id']}.html.gz").exists())
+        self.assertEqual(
+            gzip.decompress((output_dir / 'posts' / 'post_1001.html.gz').read_bytes()),
+            (output_dir / 'posts' / 'post_1001.html').read_bytes()
+        )
+    
+    def test_render_to_file_replaces_pages_atomically(self):
+        """A failing render keeps the previous page and leaves no partial file behind"""
+        env = Environment()
+        output_file = self.tmp_dir / 'page.html'
+        render_to_file(env.from_string('{% for i in items %}<p>{{ i }}</p>{% endfor %}'), output_file, items=range(3))
+        self.assertEqual(output_file.read_text(encoding='utf-8'), '<p>0</p><p>1</p><p>2</p>')
+        
+        with self.assertRaises(UndefinedError):
+            render_to_file(env.from_string('<p>new</p>{{ missing.attribute }}'), output_file)
+        self.assertEqual(output_file.read_text(encoding='utf-8'), '<p>0</p><p>1</p><p>2</p>')
+        self.assertEqual([path.name for path in self.tmp_dir.iterdir()], ['page.html'])
+    
+    def test_bytecode_cache_follows_template_changes(self):
+        """Compiled templates are reused from disk until the template source changes"""
+        templates_dir = self.tmp_dir / 'templates'
+        templates_dir.mkdir()
+        cache_dir = self.tmp_dir / 'cache'
+        (templates_dir / 'page.html').write_text('<p>{{ value }}</p>', encoding='utf-8')
+        
+        template = create_environment(templates_dir, cache_dir).get_template('page.html')
+        self.assertEqual(template.render(value=1), '<p>1</p>')
+        cache_files = list(cache_dir.iterdir())
+        self.assertEqual(len(cache_files), 1)
+        
+        env = create_environment(templates_dir, cache_dir)
+        with mock.patch.object(env, 'compile', wraps=env.compile) as compile_mock:
+            env.get_template('page.html')
+        compile_mock.assert_not_called()
+        
+        (templates_dir / 'page.html').write_text('<b>{{ value }}</b>', encoding='utf-8')
+        template = create_environment(templates_dir, cache_dir).get_template('page.html')
+        self.assertEqual(template.render(value=2), '<b>2</b>')
+    
+    def test_inline_images_use_local_copies(self):
+        """Inline images point to the archived copy relative to each page"""
+        categorized = make_categorized_posts()
+        categorized['review'][0]['content_html'] = '<p>Photo</p><img data-src="/data/photo.jpg">'
+        generator = self.make_generator('site', categorized)
+        generator.media_mappings = {'images': {'https://forum.example.com/data/photo.jpg': 'downloaded_media/photo.jpg'}}
+        generator.content_rewriter = ContentMediaRewriter(generator.media_mappings, THREAD_INFO['base_url'])
+        generator.generate_site(copy_media=False)
+        
+        category_page = (generator.output_dir / 'review.html').read_text(encoding='utf-8')
+        post_page = (generator.output_dir / 'posts' / 'post_1000.html').read_text(encoding='utf-8')
+        self.assertIn('<img loading="lazy" src="downloaded_media/photo.jpg">', category_page)
+        self.assertIn('<img loading="lazy" src="../downloaded_media/photo.jpg">', post_page)
+    
+    def test_derivative_images_offer_webp_sources(self):
+        """Thumbnails get a WebP <source> when every derivative has a WebP copy"""
+        photo_url = 'https://forum.example.com/data/photo.jpg'
+        logo_url = 'https://forum.example.com/data/logo.png'
+        categorized = make_categorized_posts()
+        categorized['review'][0]['images'] = [{'src': photo_url, 'alt': 'photo'}, {'src': logo_url, 'alt': 'logo'}]
+        generator = self.make_generator('site', categorized)
+        generator.media_mappings = {
+            'images': {photo_url: 'media/images/photo.jpg', logo_url: 'media/images/logo.png'},
+            'webp': {photo_url: 'media/webp/photo.webp', logo_url: 'media/webp/logo.webp'},
+            'derivatives': {
+                photo_url: {
+                    'width': 1200, 'height': 800,
+                    'thumbnail': {'path': 'media/derivatives/p_thumb.jpg', 'width': 300, 'height': 200,
+                                  'webp_path': 'media/webp/p_thumb.webp'},
+                    'variants': [{'width': 800, 'path': 'media/derivatives/p_800w.jpg',
+                                  'webp_path': 'media/webp/p_800w.webp'}]
+                },
+                logo_url: {
+                    'width': 400, 'height': 100,
+                    'thumbnail': {'path': 'media/derivatives/l_thumb.png', 'width': 300, 'height': 75},
+                    'variants': []
+                }
+            }
+        }
+        generator.generate_site(copy_media=False)
+        
+        category_page = (generator.output_dir / 'review.html').read_text(encoding='utf-8')
+        post_page = (generator.output_dir / 'posts' / 'post_1000.html').read_text(encoding='utf-8')
+        self.assertIn('srcset="media/webp/p_thumb.webp 300w, media/webp/p_800w.webp 800w"', category_page)
+        self.assertIn('srcset="../media/webp/p_thumb.webp 300w, ../media/webp/p_800w.webp 800w"', post_page)
+        for page in (category_page, post_page):
+            self.assertEqual(page.count('<source type="image/webp"'), 1)
+            self.assertEqual(page.count('<picture>'), 2)
+            self.assertNotIn('media/webp/photo.webp', page)
+            self.assertIn('media/derivatives/l_thumb.png', page)
+    
+    def test_post_page_path_layouts(self):
+        """Post pages are placed by ID prefix or ID hash"""
+        self.assertEqual(post_page_path('123456', 'flat', 2), 'posts/post_123456.html')
+        self.assertEqual(post_page_path('123456', 'range', 2), 'posts/12/34/post_123456.html')
+        self.assertEqual(post_page_path(42, 'range', 2), 'posts/00/42/post_42.html')
+        self.assertRegex(post_page_path('123456', 'hash', 3), r'^posts(/[0-9a-f]{2}){3}/post_123456\.html$')
+        self.assertRegex(post_page_path('abc', 'range', 1), r'^posts/[0-9a-f]{2}/post_abc\.html$')
+        with self.assertRaises(ValueError):
+            post_page_path('1', 'tree', 2)
+    
+    def test_sharded_layout_moves_pages_and_links(self):
+        """Switching to a sharded layout moves pages, updates links and writes redirects"""
+        categorized = make_categorized_posts()
+        self.make_generator('site', categorized).generate_site(copy_media=False)
+        
+        original_layout = config.POST_LAYOUT
+        config.POST_LAYOUT = 'range'
+        try:
+            generator = self.make_generator('site', categorized)
+            generator.generate_site(copy_media=False)
+        finally:
+            config.POST_LAYOUT = original_layout
+        
+        output_dir = generator.output_dir
+        self.assertEqual(list((output_dir / 'posts').glob('*.html')), [])
+        self.assertEqual(sorted(path.name for path in (output_dir / 'posts').iterdir()), ['10'])
+        self.assertIn('posts/post_1000.html', generator.manifest.deleted)
+        
+        post_page = (output_dir / 'posts' / '10' / '00' / 'post_1000.html').read_text(encoding='utf-8')
+        self.assertIn('href="../../../css/style.css"', post_page)
+        self.assertIn('href="../../../review.html"', post_page)
+        self.assertIn('href="posts/10/00/post_1000.html"', (output_dir / 'review.html').read_text(encoding='utf-8'))
+        self.assertIn('href="posts/10/01/post_1001.html"', (output_dir / 'index.html').read_text(encoding='utf-8'))
+        
+        docs = json.loads((output_dir / 'search' / 'docs' / '0.json').read_text(encoding='utf-8'))
+        self.assertTrue(all(row[3] == post_page_path(row[0], 'range', 2) for row in docs))
+        
+        redirects = (output_dir / REDIRECTS_FILE).read_text(encoding='utf-8').splitlines()
+        self.assertEqual(len(redirects), 12)
+        self.assertIn('/posts/post_1000.html /posts/10/00/post_1000.html 301', redirects)
+
+
+def run_tests():
+    """Run tests"""
+    unittest.main(argv=[''], exit=False, verbosity=2)
+
+
+if __name__ == '__main__':
+    run_tests()
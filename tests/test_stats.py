@@ -0,0 +1,118 @@
+"""
+XenForo Forum Archiver - Statistics Tests
+
+This file contains test scenarios for the streaming statistics classes.
+"""
+
+import random
+import unittest
+from collections import Counter
+from pathlib import Path
+import sys
+
+# Add project root directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.stats import HeavyHitters, StatsAccumulator
+
+
+def make_authors(count: int, seed: int = 1) -> list:
+    """Builds a skewed author stream: a few heavy posters and a long tail."""
+    rng = random.Random(seed)
+    return [
+        f"heavy{rng.randrange(5)}" if rng.random() < 0.5 else f"user{rng.randrange(5000)}"
+        for _ in range(count)
+    ]
+
+
+class TestHeavyHitters(unittest.TestCase):
+    """Test scenarios for HeavyHitters"""
+    
+    def test_exact_when_small(self):
+        """Counts are exact while the number of distinct items is small"""
+        authors = make_authors(200)
+        counter = HeavyHitters(capacity=1000)
+        for author in authors:
+            counter.add(author)
+        
+        self.assertTrue(counter.exact)
+        self.assertEqual(counter.most_common(5), Counter(authors).most_common(5))
+    
+    def test_bounded_error(self):
+        """Heavy hitters are kept and undercounted by at most total / (capacity + 1)"""
+        authors = make_authors(20000)
+        exact = Counter(authors)
+        counter = HeavyHitters(capacity=50)
+        for author in authors:
+            counter.add(author)
+        
+        self.assertFalse(counter.exact)
+        self.assertLessEqual(len(counter.counts), 100)
+        bound = len(authors) / 51
+        for author, count in exact.most_common(5):
+            self.assertLessEqual(count - counter.counts[author], bound)
+            self.assertLessEqual(counter.counts[author], count)
+        self.assertEqual(
+            {author for author, _ in counter.most_common(5)},
+            {author for author, _ in exact.most_common(5)}
+        )
+    
+    def test_merge(self):
+        """Merged counters keep the heavy hitters of both streams"""
+        authors = make_authors(20000)
+        left, right = HeavyHitters(capacity=50), HeavyHitters(capacity=50)
+        for author in authors[:10000]:
+            left.add(author)
+        for author in authors[10000:]:
+            right.add(author)
+        left.merge(right)
+        
+        self.assertEqual(left.total, len(authors))
+        self.assertEqual(
+            {author for author, _ in left.most_common(5)},
+            {author for author, _ in Counter(authors).most_common(5)}
+        )
+
+
+class TestStatsAccumulator(unittest.TestCase):
+    """Test scenarios for StatsAccumulator"""
+    
+    def test_merge_matches_single_pass(self):
+        """Chunked accumulators merge into the same statistics as one pass"""
+        posts = [
+            {
+                'category': random.Random(i).choice(['news', 'review', 'other']),
+                'content_type': 'image' if i % 3 else 'text',
+                'author': f"user{i % 7}",
+                'images': [{}] * (i % 4),
+                'videos': [{}] * (i % 2),
+            }
+            for i in range(100)
+        ]
+        single = StatsAccumulator(['news', 'review', 'guide', 'other'])
+        for post in posts:
+            single.add(post)
+        
+        merged = StatsAccumulator(['news', 'review', 'guide', 'other'])
+        for start in range(0, len(posts), 30):
+            chunk = StatsAccumulator()
+            for post in posts[start:start + 30]:
+                chunk.add(post)
+            merged.merge(chunk)
+        
+        self.assertEqual(merged.to_dict(), single.to_dict())
+        stats = single.to_dict()
+        self.assertEqual(stats['total_posts'], 100)
+        self.assertEqual(stats['category_distribution']['guide'], 0)
+        self.assertEqual(stats['total_images'], sum(i % 4 for i in range(100)))
+        self.assertEqual(stats['author_distribution']['user0'], 15)
+
+
+def run_tests():
+    """Run tests"""
+    unittest.main(argv=[''], exit=False, verbosity=2)
+
+
+if __name__ == '__main__':
+    run_tests()
@@ -0,0 +1,80 @@
+"""
+XenForo Forum Archiver - Tag Extractor Tests
+
+This file contains test scenarios for the TfidfTagExtractor class.
+"""
+
+import unittest
+from collections import Counter
+from pathlib import Path
+import sys
+
+# Add project root directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.tag_extractor import TfidfTagExtractor, _count_chunk, prune_vocabulary, tokenize
+
+
+TEXTS = [
+    'This kernel update fixes the wifi driver',
+    'This camera review covers the battery life',
+    'The wifi driver crashes after the kernel update',
+    'This battery test shows camera results',
+    'Ubuntu kernel update notes',
+    'Random unrelated qwertyuiop text',
+]
+
+
+class TestTfidfTagExtractor(unittest.TestCase):
+    """Test scenarios for TfidfTagExtractor"""
+    
+    def test_tokenize(self):
+        """Tokens are lowercased words of at least three letters"""
+        self.assertEqual(tokenize('Hi, Python3 is_great ÇOK güzel!'), ['python', 'great', 'çok', 'güzel'])
+    
+    def test_tags_skip_common_and_unique_terms(self):
+        """Shared topic words become tags, stop words and one-off words do not"""
+        tags = TfidfTagExtractor(tags_per_post=3, max_df_ratio=0.4).fit_transform(TEXTS)
+        
+        self.assertEqual(set(tags[0]), {'driver', 'wifi'})
+        self.assertEqual(set(tags[1]), {'battery', 'camera'})
+        self.assertEqual(tags[5], [])
+        for post_tags in tags:
+            self.assertNotIn('this', post_tags)
+            self.assertNotIn('the', post_tags)
+    
+    def test_max_df_never_drops_below_min_df(self):
+        """With the defaults, a six-post archive still keeps terms found in two posts"""
+        extractor = TfidfTagExtractor(min_df=2, max_df_ratio=0.25)
+        tags = extractor.fit_transform(TEXTS)
+        
+        self.assertEqual(set(extractor.idf), {'battery', 'camera', 'driver', 'wifi'})
+        self.assertEqual(set(tags[2]), {'driver', 'wifi'})
+    
+    def test_chunked_counts_match_serial(self):
+        """Merging per-chunk counts gives the same vocabulary as one pass"""
+        serial = TfidfTagExtractor()
+        serial.fit(TEXTS)
+        
+        chunked = TfidfTagExtractor()
+        for start in range(0, len(TEXTS), 2):
+            chunked.update(*_count_chunk((TEXTS[start:start + 2], chunked.max_vocab)))
+        
+        self.assertEqual(chunked.document_count, serial.document_count)
+        self.assertEqual(chunked.frequencies, serial.frequencies)
+    
+    def test_vocabulary_is_bounded(self):
+        """Pruning keeps only the most frequent terms"""
+        _, frequencies = _count_chunk((TEXTS, 3))
+        self.assertLessEqual(len(frequencies), 3)
+        self.assertEqual(prune_vocabulary(Counter(a=3, b=1, c=2), 2), Counter(a=3, c=2))
+
+
+def run_tests():
+    """Run tests"""
+    unittest.main(argv=[''], exit=False, verbosity=2)
+
+
+if __name__ == '__main__':
+    run_tests()
@@ -0,0 +1,80 @@
+"""
+XenForo Forum Archiver - Utils Tests
+
+This file contains test scenarios for the helper functions in src.utils.
+"""
+
+import unittest
+from pathlib import Path
+import sys
+
+# Add project root directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.utils import canonicalize_media_url, attachment_filename
+
+
+BASE_URL = 'https://forum.example.com/'
+
+
+class TestCanonicalizeMediaUrl(unittest.TestCase):
+    """Test scenarios for canonicalize_media_url"""
+    
+    def test_attachment_variants_collapse(self):
+        """Relative, absolute, slug, hash and trailing slash variants are equal"""
+        variants = [
+            '/attachments/photo-jpg.123/',
+            'https://forum.example.com/attachments/photo-jpg.123',
+            'https://Forum.Example.com:443/attachments/123/?hash=abc',
+            'https://forum.example.com/index.php?attachments/photo-jpg.123/',
+        ]
+        canonical = {canonicalize_media_url(url, BASE_URL) for url in variants}
+        self.assertEqual(canonical, {'https://forum.example.com/attachments/123/'})
+    
+    def test_attachment_keeps_install_prefix(self):
+        """Forums installed under a sub-path keep their prefix"""
+        url = 'https://forum.example.com/community/attachments/a-png.5/'
+        self.assertEqual(
+            canonicalize_media_url(url, BASE_URL),
+            'https://forum.example.com/community/attachments/5/'
+        )
+    
+    def test_proxy_unwrapped(self):
+        """Image proxy URLs resolve to the proxied image"""
+        url = '/proxy.php?image=https%3A%2F%2Fi.imgur.com%2Fx.png&hash=ff'
+        self.assertEqual(canonicalize_media_url(url, BASE_URL), 'https://i.imgur.com/x.png')
+    
+    def test_query_normalized(self):
+        """Query parameters are sorted and the fragment is dropped"""
+        self.assertEqual(
+            canonicalize_media_url('https://x.com/a.jpg?b=2&a=1#f'),
+            'https://x.com/a.jpg?a=1&b=2'
+        )
+    
+    def test_volatile_params_dropped_only_on_forum(self):
+        """The forum's hash parameter is dropped, other hosts keep theirs"""
+        self.assertEqual(
+            canonicalize_media_url('/data/photo.jpg?hash=abc&v=2', BASE_URL),
+            'https://forum.example.com/data/photo.jpg?v=2'
+        )
+        self.assertEqual(
+            canonicalize_media_url('https://cdn.example.org/a.jpg?hash=z', BASE_URL),
+            'https://cdn.example.org/a.jpg?hash=z'
+        )
+        self.assertEqual(canonicalize_media_url('https://x.com/a.jpg?hash=z'), 'https://x.com/a.jpg?hash=z')
+    
+    def test_attachment_filename(self):
+        """XenForo slugs are turned back into file names"""
+        self.assertEqual(attachment_filename('/attachments/ekran-goruntusu-png.42/'), 'ekran-goruntusu.png')
+        self.assertEqual(attachment_filename('/attachments/42/'), 'attachment_42')
+        self.assertIsNone(attachment_filename('https://i.imgur.com/x.png'))
+
+
+def run_tests():
+    """Run tests"""
+    unittest.main(argv=[''], exit=False, verbosity=2)
+
+
+if __name__ == '__main__':
+    run_tests()